@@ -0,0 +1,133 @@
+"""
+Agregados do Dashboard, calculados uma vez por versão dos dados.
+
+`AgregadosDashboard` concentra o que antes era refeito a cada rerun do
+Dashboard (filtro de saídas por regex, máscara de obras vendidas, filtro por
+"Obra Vinculada", ordenação do acumulado e groupby de categorias). A troca de
+escopo vira consulta: a primeira visita a um escopo monta a visão e as
+seguintes reaproveitam o resultado.
+"""
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+ESCOPO_TODAS = "Visão Geral (Todas as Obras)"
+
+# Valores de "Tipo" que contam como custo
+PADRAO_SAIDA = "Saída|Despesa"
+
+
+def _eh_saida(tipo: pd.Series) -> pd.Series:
+    """Máscara de saídas; em coluna categórica o regex roda só sobre as categorias."""
+    if isinstance(tipo.dtype, pd.CategoricalDtype):
+        cats = tipo.cat.categories
+        return tipo.isin(cats[cats.astype(str).str.contains(PADRAO_SAIDA, case=False, regex=True)])
+    return tipo.astype(str).str.contains(PADRAO_SAIDA, case=False, na=False)
+
+
+class AgregadosDashboard:
+    """
+    Agregados imutáveis de um par (df_obras, df_fin).
+
+    Atributos:
+        saidas: Lançamentos de saída/despesa (ordem original da aba)
+        por_obra_categoria_mes: Soma de Valor por obra x categoria x mês
+        vgv_total, vgv_vendidas: VGV de todas as obras / das vendidas
+        custos_total, custos_vendidas: Custos de todas as obras / das vendidas
+        obras_vendidas: Clientes com Status "Vendida"
+    """
+
+    def __init__(self, df_obras: pd.DataFrame, df_fin: pd.DataFrame):
+        if df_fin.empty or "Tipo" not in df_fin.columns:
+            saidas = df_fin.iloc[0:0]
+        else:
+            saidas = df_fin[_eh_saida(df_fin["Tipo"])]
+        self.saidas = saidas
+        obra = saidas["Obra Vinculada"] if "Obra Vinculada" in saidas.columns else pd.Series("", index=saidas.index)
+
+        # Posições de cada obra em `saidas`: filtrar um escopo vira take() em vez de varrer a coluna
+        self._posicoes: Dict[str, np.ndarray] = {
+            str(k): v for k, v in obra.groupby(obra, sort=False, observed=True).indices.items()
+        }
+
+        if saidas.empty:
+            self.por_obra_categoria_mes = pd.DataFrame(columns=["Obra Vinculada", "Categoria", "Mês", "Valor"])
+        else:
+            mes = saidas["Data_DT"].dt.to_period("M") if "Data_DT" in saidas.columns else None
+            self.por_obra_categoria_mes = (
+                saidas.assign(**{"Obra Vinculada": obra, "Mês": mes})
+                .groupby(["Obra Vinculada", "Categoria", "Mês"], dropna=False, sort=True, observed=True)["Valor"]
+                .sum()
+                .reset_index()
+            )
+
+        # Totais e obras vendidas (Lucro/ROI do portfólio)
+        if not df_obras.empty and "Status" in df_obras.columns:
+            vendida = df_obras["Status"].astype(str).str.strip().str.lower() == "vendida"
+        else:
+            vendida = pd.Series(False, index=df_obras.index)
+        self.obras_vendidas: List[str] = (
+            df_obras.loc[vendida, "Cliente"].astype(str).str.strip().tolist() if not df_obras.empty else []
+        )
+        self.vgv_total = float(df_obras["Valor Total"].sum()) if not df_obras.empty else 0.0
+        self.vgv_vendidas = float(df_obras.loc[vendida, "Valor Total"].sum()) if not df_obras.empty else 0.0
+
+        custo_obra = self.por_obra_categoria_mes.groupby("Obra Vinculada", observed=True)["Valor"].sum()
+        self.custos_total = float(saidas["Valor"].sum()) if not saidas.empty else 0.0
+        self.custos_vendidas = float(custo_obra[custo_obra.index.isin(self.obras_vendidas)].sum())
+
+        self._lock = threading.Lock()
+        self._escopos: Dict[str, Dict[str, Any]] = {}
+
+    def escopo(self, nome: str) -> Dict[str, Any]:
+        """
+        Visão de um escopo (uma obra ou ESCOPO_TODAS), montada na primeira consulta.
+
+        Args:
+            nome: Cliente da obra ou ESCOPO_TODAS
+
+        Returns:
+            Dict com "lancamentos" (saídas do escopo), "custos", "categorias"
+            (Categoria, Valor), "evolucao" (Data_DT, Acumulado) e "periodo"
+            ("De dd/mm/aaaa até dd/mm/aaaa"). Os DataFrames são compartilhados:
+            não altere in-place.
+        """
+        with self._lock:
+            visao = self._escopos.get(nome)
+        if visao is None:
+            visao = self._montar_escopo(nome)
+            with self._lock:
+                visao = self._escopos.setdefault(nome, visao)
+        return visao
+
+    def _montar_escopo(self, nome: str) -> Dict[str, Any]:
+        if nome == ESCOPO_TODAS:
+            lanc = self.saidas
+            base_cat = self.por_obra_categoria_mes
+        else:
+            lanc = self.saidas.take(self._posicoes.get(str(nome), np.empty(0, dtype=np.intp)))
+            base_cat = self.por_obra_categoria_mes[self.por_obra_categoria_mes["Obra Vinculada"] == str(nome)]
+
+        categorias = base_cat.groupby("Categoria", as_index=False, observed=True)["Valor"].sum()
+
+        if lanc.empty:
+            evolucao = pd.DataFrame(columns=["Data_DT", "Acumulado"])
+            periodo = "Período indisponível"
+        else:
+            ordenado = lanc.sort_values("Data_DT", kind="stable")
+            evolucao = pd.DataFrame({"Data_DT": ordenado["Data_DT"], "Acumulado": ordenado["Valor"].cumsum()})
+            dmin, dmax = lanc["Data_DT"].min(), lanc["Data_DT"].max()
+            if pd.notna(dmin) and pd.notna(dmax):
+                periodo = f"De {dmin.strftime('%d/%m/%Y')} até {dmax.strftime('%d/%m/%Y')}"
+            else:
+                periodo = "Período indisponível"
+
+        return {
+            "lancamentos": lanc,
+            "custos": float(lanc["Valor"].sum()) if not lanc.empty else 0.0,
+            "categorias": categorias,
+            "evolucao": evolucao,
+            "periodo": periodo,
+        }
@@ -0,0 +1,74 @@
+"""
+Cota do Sheets: espera das leituras interativas durante uma gravação em lote.
+
+Uma thread grava em lote (fila de gravação) enquanto outras simulam sessões
+abrindo páginas. Compara o balde com prioridades (limite_api.BaldeTokens) com
+um balde de prioridade única, em que o lote disputa cada token de igual para
+igual. Taxas em escala de tempo reduzida (padrão 10x a cota real).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_cota.py
+    python benchmarks/bench_cota.py --lote 120 --sessoes 4 --escala 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from limite_api import (  # noqa: E402
+    COTA_CHAMADAS_MINUTO, COTA_RAJADA, COTA_RESERVA_INTERATIVA,
+    PRIORIDADE_INTERATIVA, PRIORIDADE_LOTE, BaldeTokens,
+)
+
+
+def simular(prioridades: bool, n_lote: int, n_sessoes: int, escala: float) -> list:
+    """Espera (s, em tempo real da cota) de cada chamada interativa."""
+    balde = BaldeTokens(COTA_CHAMADAS_MINUTO * escala, COTA_RAJADA, COTA_RESERVA_INTERATIVA if prioridades else 0)
+    prioridade_lote = PRIORIDADE_LOTE if prioridades else PRIORIDADE_INTERATIVA
+    esperas = []
+    fim = threading.Event()
+
+    def lote():
+        for _ in range(n_lote):
+            balde.adquirir(prioridade_lote)
+        fim.set()
+
+    def sessao():
+        time.sleep(0.05)
+        while not fim.is_set():
+            # Um rerun a cada ~10 s: 2 leituras (sincronização incremental das duas abas)
+            for _ in range(2):
+                esperas.append(balde.adquirir(PRIORIDADE_INTERATIVA) * escala)
+            time.sleep(10.0 / escala)
+
+    threads = [threading.Thread(target=lote)] + [threading.Thread(target=sessao) for _ in range(n_sessoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return esperas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=80, help="Chamadas da gravação em lote")
+    parser.add_argument("--sessoes", type=int, default=3)
+    parser.add_argument("--escala", type=float, default=10.0, help="Aceleração do tempo da cota")
+    args = parser.parse_args()
+
+    print(f"Lote de {args.lote} chamadas, {args.sessoes} sessões, cota {COTA_CHAMADAS_MINUTO}/min")
+    print(f"{'balde':>18} {'leituras':>9} {'espera média (s)':>17} {'p95 (s)':>8} {'máx (s)':>8}")
+    for nome, prioridades in (("prioridade única", False), ("com prioridades", True)):
+        esperas = sorted(simular(prioridades, args.lote, args.sessoes, args.escala))
+        p95 = esperas[int(0.95 * (len(esperas) - 1))] if esperas else 0.0
+        media = statistics.mean(esperas) if esperas else 0.0
+        print(f"{nome:>18} {len(esperas):>9} {media:>17.2f} {p95:>8.2f} {max(esperas, default=0):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Partida a frio e reruns do app: tempo total, tempo gasto em imports e
+dependências pesadas carregadas por página.
+
+Cada página (login, Dashboard, Financeiro, Obras) roda em um subprocesso
+novo com `python -X importtime`, pelo AppTest do Streamlit, sobre uma base
+SQLite sintética (sintetico.carteira). O subprocesso mede:
+
+- a primeira execução do script (partida a frio: inclui importar o app);
+- os imports feitos durante ela (soma do "self" do -X importtime);
+- a mediana de --reruns execuções seguintes (rerun na mesma sessão);
+- quais dependências pesadas (DEPENDENCIAS) ficaram em sys.modules.
+
+O option_menu não renderiza no AppTest: o módulo é importado normalmente
+(o custo entra na conta) e a função é trocada pela página escolhida.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_importacao.py
+    python benchmarks/bench_importacao.py --raiz /tmp/versao_anterior --reruns 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PAGINAS = ["login", "Dashboard", "Financeiro", "Obras"]
+DEPENDENCIAS = [
+    "pandas", "gspread", "oauth2client", "requests", "streamlit_option_menu", "plotly.express", "reportlab",
+]
+LINHA_MENU = "from streamlit_option_menu import option_menu"
+MARCA_INICIO, MARCA_FIM = "@@bench_inicio", "@@bench_fim"
+
+
+def _script(raiz: str, pagina: str, destino: str) -> str:
+    """Cópia do app.py com o option_menu fixo na página (o import real é mantido)."""
+    with open(os.path.join(raiz, "app.py"), encoding="utf-8") as f:
+        fonte = f.read()
+    if LINHA_MENU not in fonte:
+        raise SystemExit(f"{raiz}/app.py não importa o option_menu como esperado")
+    menu = "Dashboard" if pagina == "login" else pagina
+    fonte = fonte.replace(LINHA_MENU, f"{LINHA_MENU}\noption_menu = lambda **k: {menu!r}", 1)
+    caminho = os.path.join(destino, "app_bench.py")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(fonte)
+    return caminho
+
+
+def medir(raiz: str, pagina: str, base: str, reruns: int) -> None:
+    """Roda a página no AppTest e imprime o resultado em JSON (roda no subprocesso)."""
+    sys.path.insert(0, raiz)
+    from streamlit.testing.v1 import AppTest
+
+    destino = os.path.dirname(base)
+    at = AppTest.from_file(_script(raiz, pagina, destino), default_timeout=300)
+    at.secrets["password"] = "bench"
+    at.secrets["storage"] = {"engine": "sqlite", "path": base, "fila": os.path.join(destino, "fila.db")}
+    at.secrets["instrumentacao"] = {"log": os.path.join(destino, "metricas.jsonl")}
+    at.session_state["auth"] = pagina != "login"
+
+    antes = set(sys.modules)
+    print(MARCA_INICIO, file=sys.stderr, flush=True)
+    t0 = time.perf_counter()
+    at.run()
+    frio = time.perf_counter() - t0
+    print(MARCA_FIM, file=sys.stderr, flush=True)
+    carregados = set(sys.modules) - antes
+
+    tempos = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        tempos.append(time.perf_counter() - t0)
+
+    print(json.dumps({
+        "frio_s": frio,
+        "rerun_s": statistics.median(tempos) if tempos else None,
+        "modulos_novos": len(carregados),
+        "dependencias": [d for d in DEPENDENCIAS if d in sys.modules],
+        "erros": [str(e.value) for e in at.exception][:3],
+    }))
+
+
+def tempo_imports(stderr: str) -> float:
+    """Soma (s) do "self" do -X importtime entre as marcas de início e fim."""
+    total_us, dentro = 0, False
+    for linha in stderr.splitlines():
+        if linha.startswith(MARCA_INICIO):
+            dentro = True
+        elif linha.startswith(MARCA_FIM):
+            break
+        elif dentro and linha.startswith("import time:"):
+            campos = linha.split("|")
+            if campos[0].split(":")[1].strip().isdigit():
+                total_us += int(campos[0].split(":")[1])
+    return total_us / 1e6
+
+
+def criar_base(caminho: str, linhas: int) -> None:
+    """Base SQLite com uma carteira sintética."""
+    from sintetico import carteira
+    from storage import SQLiteRepositorio
+
+    SQLiteRepositorio(caminho).importar(*carteira(linhas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raiz", default=RAIZ, help="Árvore do app a medir (padrão: este repositório)")
+    parser.add_argument("--paginas", nargs="+", default=PAGINAS, choices=PAGINAS)
+    parser.add_argument("--linhas", type=int, default=5000, help="Lançamentos da base sintética")
+    parser.add_argument("--reruns", type=int, default=5, help="Reruns medidos após a partida a frio")
+    parser.add_argument("--_filho", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._filho:
+        pagina, base, raiz = args._filho
+        medir(raiz, pagina, base, args.reruns)
+        return
+
+    raiz = os.path.abspath(args.raiz)
+    print(f"{raiz}: {args.linhas} lançamentos, mediana de {args.reruns} reruns\n")
+    print(f"{'página':<11} {'frio (ms)':>10} {'imports (ms)':>13} {'rerun (ms)':>11}  dependências carregadas")
+    for pagina in args.paginas:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = os.path.join(tmp, "base.db")
+            criar_base(base, args.linhas)
+            out = subprocess.run(
+                [sys.executable, "-X", "importtime", __file__, "--reruns", str(args.reruns), "--_filho", pagina, base, raiz],
+                capture_output=True, text=True, cwd=tmp,
+            )
+        if out.returncode != 0:
+            print(f"{pagina:<11} falhou: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        rerun = f"{r['rerun_s'] * 1000:>11.0f}" if r["rerun_s"] is not None else f"{'—':>11}"
+        erros = f"  ERRO: {r['erros']}" if r["erros"] else ""
+        print(
+            f"{pagina:<11} {r['frio_s'] * 1000:>10.0f} {tempo_imports(out.stderr) * 1000:>13.0f} {rerun}  "
+            f"{', '.join(r['dependencias'])}{erros}"
+        )
+
+
+if __name__ == "__main__":
+    main()
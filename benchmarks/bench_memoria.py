@@ -0,0 +1,93 @@
+"""
+Memória e custo de filtro do Financeiro: strings object x schema compacto.
+
+Gera um Financeiro bruto (como vem do repositório), normaliza do jeito antigo
+(`astype(str).str.strip()` em cada coluna de texto, ID int64) e com
+esquema.normalizar_financeiro (categóricas, ID int32), e compara a memória
+(`memory_usage(deep=True)`) por coluna e o tempo do filtro "Filtrar por Obra".
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_memoria.py
+    python benchmarks/bench_memoria.py --linhas 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from esquema import normalizar_financeiro  # noqa: E402
+from formatacao import parse_moeda_series  # noqa: E402
+
+OBRAS = [f"Residencial {i:02d}" for i in range(40)]
+
+
+def financeiro_bruto(n: int) -> pd.DataFrame:
+    """Registros como chegam da planilha (texto com espaços, números misturados)."""
+    rng = np.random.default_rng(42)
+    datas = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 1000, n), unit="D")
+    return pd.DataFrame({
+        "ID": rng.permutation(np.arange(1, n + 1) * 7919 % 1_000_000_000),
+        "Data": datas.strftime("%Y-%m-%d"),
+        "Tipo": rng.choice(["Saída (Despesa)", "Entrada", " Saída (Despesa) "], n, p=[0.85, 0.1, 0.05]),
+        "Categoria": rng.choice(["Material", "Mão de Obra", "Serviços", "Administrativo", "Impostos", "Outros"], n),
+        "Descrição": [f"Compra lote {i}" for i in range(n)],
+        "Valor": rng.uniform(10, 50_000, n).round(2),
+        "Obra Vinculada": rng.choice(OBRAS + [o + " " for o in OBRAS[:5]], n),
+        "Fornecedor": rng.choice(["", "Fornecedor A", "Depósito B ", "Loja C"], n),
+        "Forma Pagamento": rng.choice(["Pix", "Boleto", "Cartão de Crédito", "Dinheiro"], n),
+    })
+
+
+def normalizar_antigo(df_f: pd.DataFrame) -> pd.DataFrame:
+    """Tratamento anterior de fetch_data_from_google (strings por linha, ID int64)."""
+    df_f = df_f.copy()
+    df_f["ID"] = pd.to_numeric(df_f["ID"], errors="coerce").fillna(0).astype(int)
+    df_f["Valor"] = parse_moeda_series(df_f["Valor"])
+    df_f["Data_DT"] = pd.to_datetime(df_f["Data"], errors="coerce")
+    for col in ["Obra Vinculada", "Categoria", "Fornecedor", "Forma Pagamento"]:
+        df_f[col] = df_f[col].astype(str).str.strip()
+    return df_f
+
+
+def melhor_tempo(fn, repeticoes: int = 5) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    bruto = financeiro_bruto(args.linhas)
+    antigo = normalizar_antigo(bruto)
+    novo = normalizar_financeiro(bruto)
+
+    mem_antigo = antigo.memory_usage(deep=True, index=False)
+    mem_novo = novo.memory_usage(deep=True, index=False)
+    print(f"Financeiro com {args.linhas} linhas (pandas {pd.__version__})")
+    print(f"{'coluna':>16} {'antes':>14} {'MB':>7} {'depois':>14} {'MB':>7}")
+    for col in novo.columns:
+        print(f"{col:>16} {str(antigo[col].dtype):>14} {mem_antigo[col] / 2**20:>7.2f} "
+              f"{str(novo[col].dtype):>14} {mem_novo[col] / 2**20:>7.2f}")
+    print(f"{'TOTAL':>16} {'':>14} {mem_antigo.sum() / 2**20:>7.2f} {'':>14} {mem_novo.sum() / 2**20:>7.2f}")
+
+    alvo = OBRAS[3]
+    t_antigo = melhor_tempo(lambda: antigo[antigo["Obra Vinculada"].astype(str).str.strip() == alvo])
+    t_novo = melhor_tempo(lambda: novo[novo["Obra Vinculada"] == alvo])
+    assert len(antigo[antigo["Obra Vinculada"] == alvo]) == len(novo[novo["Obra Vinculada"] == alvo])
+    print(f"\nFiltro por obra: {t_antigo * 1000:.1f} ms -> {t_novo * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
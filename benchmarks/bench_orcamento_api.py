@@ -0,0 +1,207 @@
+"""
+Orçamento de chamadas à API do Sheets por cenário de gravação, sem rede.
+
+Roda o SheetsRepositorio (e a fila de gravação) sobre o emulador em processo
+(emulador_sheets.PlanilhaEmulada), com latência por requisição e 429
+injetados, e confere para cada cenário:
+
+- quantas requisições foram feitas, contra o orçamento (ORCAMENTOS);
+- o tempo de parede com a latência configurada;
+- se a planilha ficou como deveria (cada inclusão gravada uma única vez,
+  exclusões e edições aplicadas, renomeação propagada).
+
+Termina com código 1 se algum cenário estourar o orçamento ou errar os dados.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_orcamento_api.py
+    python benchmarks/bench_orcamento_api.py --linhas 20000 --latencia 0.4 --jitter 0.3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from emulador_sheets import PlanilhaEmulada  # noqa: E402
+from fila_escrita import OP_LANCAMENTO, FilaEscrita  # noqa: E402
+from sintetico import carteira  # noqa: E402
+from storage import FIN_COLS, OBRAS_COLS, SheetsRepositorio  # noqa: E402
+
+# Requisições máximas por cenário (um cenário acima disto é regressão)
+ORCAMENTOS = {
+    "login (schema + carga completa)": 3,
+    "rerun sem alterações": 1,
+    "schema em outra sessão": 0,
+    "novo lançamento": 1,
+    "nova obra": 1,
+    "fila: 20 lançamentos": 1,
+    "Financeiro: 10 edições + 3 exclusões": 3,
+    "Obras: 5 edições + 1 renomeação": 3,
+    "rerun após gravações": 2,
+    "8 sessões recarregando juntas": 1,
+    "fila: 5 lançamentos com 429": 3,
+}
+
+ID_NOVOS = 900_000_000
+
+
+def _lancamento(idv: int) -> List:
+    return [idv, "2024-06-01", "Saída (Despesa)", "Material", f"Novo {idv}", 150.0, "", "", "Pix"]
+
+
+def cenarios(repo: SheetsRepositorio, planilha: PlanilhaEmulada, fila: FilaEscrita) -> List[Tuple[str, Callable[[], None], Callable[[], bool]]]:
+    """(nome, ação, conferência dos dados) de cada cenário, na ordem em que rodam."""
+    ctx: Dict = {}
+
+    def ler() -> SheetsRepositorio:
+        """Repositório só para conferir (não mexe na marca d'água do repositório medido)."""
+        return SheetsRepositorio(planilha)
+
+    def login():
+        repo.garantir_schema()
+        ctx["obras"], ctx["fin"] = repo.carregar_tudo()
+
+    def rerun():
+        ctx["obras"], ctx["fin"] = repo.carregar_tudo()
+
+    def reruns_simultaneos():
+        resultados = []
+        threads = [threading.Thread(target=lambda: resultados.append(repo.carregar_tudo())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ctx["simultaneos"] = resultados
+
+    def ids_fin() -> List[str]:
+        return [str(v) for v in ler().carregar_financeiro()["ID"]]
+
+    def editar_financeiro():
+        ids = ctx["fin"]["ID"].tolist()
+        ctx["editados"] = ids[100:110]
+        ctx["excluidos"] = [ids[5], ids[6], ids[len(ids) // 2]]
+        atualizacoes = {}
+        for idv in ctx["editados"]:
+            registro = {h: "" for h in FIN_COLS}
+            registro.update(ID=idv, Data="2024-01-01", Tipo="Saída (Despesa)", Categoria="Material", Valor=1234.5)
+            atualizacoes[idv] = registro
+        repo.salvar_financeiro(atualizacoes, ctx["excluidos"])
+
+    def conferir_financeiro() -> bool:
+        df = ler().carregar_financeiro()
+        valores = df.set_index("ID").loc[ctx["editados"], "Valor"]
+        return (valores == 1234.5).all() and not df["ID"].isin(ctx["excluidos"]).any()
+
+    def editar_obras():
+        obras = ctx["obras"]
+        atualizacoes = {}
+        for _, linha in obras.head(5).iterrows():
+            registro = {c: linha[c] for c in OBRAS_COLS}
+            registro["Prazo"] = "36 meses"
+            atualizacoes[linha["ID"]] = registro
+        antigo = str(obras.iloc[0]["Cliente"]).strip()
+        atualizacoes[obras.iloc[0]["ID"]]["Cliente"] = f"{antigo} II"
+        ctx["renome"] = (antigo, f"{antigo} II")
+        ctx["renomeados"] = repo.salvar_obras(atualizacoes, {antigo: f"{antigo} II"})
+
+    def conferir_obras() -> bool:
+        antigo, novo = ctx["renome"]
+        leitor = ler()
+        vinculadas = leitor.carregar_financeiro()["Obra Vinculada"].astype(str).str.strip()
+        obras = leitor.carregar_obras()
+        return (
+            ctx["renomeados"] > 0
+            and (vinculadas == novo).sum() == ctx["renomeados"]
+            and not (vinculadas == antigo).any()
+            and (obras.head(5)["Prazo"] == "36 meses").all()
+        )
+
+    def fila_lote(ids: List[int]) -> Callable[[], None]:
+        def executar():
+            for idv in ids:
+                fila.enfileirar(OP_LANCAMENTO, _lancamento(idv))
+            while True:
+                espera = fila.processar()
+                if espera is None:
+                    return
+                time.sleep(espera)
+        return executar
+
+    def fila_com_429():
+        planilha.falhar(1)
+        fila_lote(list(range(ID_NOVOS + 100, ID_NOVOS + 105)))()
+
+    def gravados_uma_vez(ids: List[int]) -> Callable[[], bool]:
+        def conferir():
+            todos = ids_fin()
+            return all(todos.count(str(i)) == 1 for i in ids)
+        return conferir
+
+    return [
+        ("login (schema + carga completa)", login, lambda: len(ctx["fin"]) > 0),
+        ("rerun sem alterações", rerun, lambda: True),
+        ("schema em outra sessão", lambda: SheetsRepositorio(planilha).garantir_schema(), lambda: True),
+        ("novo lançamento", lambda: repo.adicionar_lancamento(_lancamento(ID_NOVOS)), gravados_uma_vez([ID_NOVOS])),
+        ("nova obra", lambda: repo.adicionar_obra([ID_NOVOS, "Obra Nova", "", "Planejamento", 1e6, "2024-06-01", "", 100, 200, 3, 7e5]),
+         lambda: str(ID_NOVOS) in [str(v) for v in ler().carregar_obras()["ID"]]),
+        ("fila: 20 lançamentos", fila_lote(list(range(ID_NOVOS + 1, ID_NOVOS + 21))),
+         gravados_uma_vez(list(range(ID_NOVOS + 1, ID_NOVOS + 21)))),
+        ("Financeiro: 10 edições + 3 exclusões", editar_financeiro, conferir_financeiro),
+        ("Obras: 5 edições + 1 renomeação", editar_obras, conferir_obras),
+        ("rerun após gravações", rerun, lambda: True),
+        ("8 sessões recarregando juntas", reruns_simultaneos,
+         lambda: len(ctx["simultaneos"]) == 8 and all(fin.equals(ctx["fin"]) for _, fin in ctx["simultaneos"])),
+        ("fila: 5 lançamentos com 429", fila_com_429, gravados_uma_vez(list(range(ID_NOVOS + 100, ID_NOVOS + 105)))),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=5000, help="Lançamentos na aba Financeiro")
+    parser.add_argument("--latencia", type=float, default=0.2, help="Latência fixa por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latência extra aleatória por requisição (s)")
+    args = parser.parse_args()
+
+    obras, financeiro = carteira(args.linhas)
+    planilha = PlanilhaEmulada({"Obras": obras, "Financeiro": financeiro}, latencia_s=args.latencia, jitter_s=args.jitter, seed=1)
+    repo = SheetsRepositorio(planilha)
+
+    falhou = False
+    with tempfile.TemporaryDirectory() as tmp:
+        fila = FilaEscrita(os.path.join(tmp, "fila.db"), repo, iniciar=False)
+        print(f"{args.linhas} lançamentos, latência {args.latencia}s + até {args.jitter}s por requisição\n")
+        print(f"{'cenário':<38} {'chamadas':>8} {'orçamento':>9} {'tempo (s)':>9} {'dados':>6}  requisições")
+        for nome, acao, conferir in cenarios(repo, planilha, fila):
+            n0 = len(planilha.chamadas)
+            t0 = time.perf_counter()
+            acao()
+            tempo = time.perf_counter() - t0
+            contagem = planilha.contagem(desde=n0)
+            chamadas = sum(contagem.values())
+
+            # A conferência lê a planilha sem latência e fora da contagem
+            latencia, jitter = planilha.latencia_s, planilha.jitter_s
+            planilha.latencia_s = planilha.jitter_s = 0.0
+            dados_ok = conferir()
+            del planilha.chamadas[n0 + chamadas:]
+            planilha.latencia_s, planilha.jitter_s = latencia, jitter
+
+            estourou = chamadas > ORCAMENTOS[nome]
+            falhou |= estourou or not dados_ok
+            detalhe = ", ".join(f"{m}={n}" for m, n in sorted(contagem.items()))
+            print(
+                f"{nome:<38} {chamadas:>8} {ORCAMENTOS[nome]:>9} {tempo:>9.2f} {'ok' if dados_ok else 'ERRO':>6}  "
+                f"{detalhe}{'  <-- ESTOUROU' if estourou else ''}"
+            )
+
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
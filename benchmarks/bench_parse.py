@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: parse_moeda_series (vetorizado) x .apply(safe_float).
+
+Gera colunas com a mistura de formatos que chega da planilha ("R$ 1.234,56",
+floats, inteiros, vazios e lixo), confere que os dois caminhos dão o mesmo
+resultado e mede o melhor de N execuções de cada um.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_parse.py
+    python benchmarks/bench_parse.py --linhas 100000 1000000 --repeticoes 5
+"""
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from formatacao import parse_moeda_series, safe_float  # noqa: E402
+
+
+def coluna_valores(n: int, seed: int = 42) -> pd.Series:
+    """Coluna "Valor" bagunçada: 50% números, 35% "R$ x.xxx,xx", 10% vazios, 5% lixo."""
+    rng = np.random.default_rng(seed)
+    valores = rng.uniform(1, 250_000, n).round(2)
+    tipo = rng.choice(4, n, p=[0.50, 0.35, 0.10, 0.05])
+
+    col = pd.Series(valores, dtype=object)
+    brl = tipo == 1
+    col[brl] = [f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valores[brl]]
+    col[tipo == 2] = ""
+    col[tipo == 3] = rng.choice(["-", "n/d", "a combinar", "1_000"], int((tipo == 3).sum()))
+    return col
+
+
+def colunas_teste(n: int) -> dict:
+    """Três perfis: mistura da planilha, só texto (tudo "R$ ...") e só números."""
+    misto = coluna_valores(n)
+    texto = misto.map(lambda x: x if isinstance(x, str) else f"{x:.2f}".replace(".", ","))
+    numeros = pd.Series(np.random.default_rng(7).uniform(1, 250_000, n).round(2), dtype=object)
+    return {"misto": misto, "texto": texto, "numeros": numeros}
+
+
+def melhor_tempo(fn, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>9} {'perfil':>8} {'apply(safe_float)':>18} {'vetorizado':>11} {'ganho':>7}")
+    for n in args.linhas:
+        for perfil, col in colunas_teste(n).items():
+            esperado = col.apply(safe_float)
+            obtido = parse_moeda_series(col)
+            assert np.allclose(esperado, obtido, equal_nan=True), f"resultados divergentes ({perfil})"
+
+            t_apply = melhor_tempo(lambda: col.apply(safe_float), args.repeticoes)
+            t_vet = melhor_tempo(lambda: parse_moeda_series(col), args.repeticoes)
+            print(f"{n:>9} {perfil:>8} {t_apply * 1000:>15.1f} ms {t_vet * 1000:>8.1f} ms {t_apply / t_vet:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Primeira sessão após reiniciar o processo: carga do repositório x cópia em disco.
+
+Simula duas partidas do processo sobre o SheetsRepositorio no emulador com
+latência. Na primeira não há cópia: a primeira sessão espera a carga das
+duas abas e a thread grava o snapshot em disco (ArquivoSnapshot). Na
+segunda, a primeira sessão recebe a cópia lida por memory-map e a thread
+revalida contra o repositório em segundo plano. Mede:
+
+- a espera da primeira sessão em cada partida;
+- quanto tempo a segunda partida serviu a cópia até publicar a releitura;
+- o tamanho da cópia em disco e o tempo de gravá-la (feito pela thread).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_partida.py
+    python benchmarks/bench_partida.py --linhas 20000 --latencia 0.4
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from emulador_sheets import PlanilhaEmulada  # noqa: E402
+from esquema import normalizar_financeiro, normalizar_obras  # noqa: E402
+from sintetico import carteira  # noqa: E402
+from snapshot_dados import ArquivoSnapshot, SnapshotDados  # noqa: E402
+from storage import SheetsRepositorio  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=5000, help="Lançamentos na aba Financeiro")
+    parser.add_argument("--latencia", type=float, default=0.3, help="Latência fixa por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latência extra aleatória por requisição (s)")
+    args = parser.parse_args()
+
+    obras, financeiro = carteira(args.linhas)
+    diretorio = tempfile.mkdtemp(prefix="bench_partida_")
+
+    def partida() -> SnapshotDados:
+        """Processo novo: repositório, snapshot e thread novos; só o diretório persiste."""
+        planilha = PlanilhaEmulada({"Obras": obras, "Financeiro": financeiro}, latencia_s=args.latencia, jitter_s=args.jitter)
+        repo = SheetsRepositorio(planilha)
+
+        def carregar(abas, completo):
+            bruto_o, bruto_f = repo.carregar_tudo(forcar_completo=completo)
+            return normalizar_obras(bruto_o), normalizar_financeiro(bruto_f)
+
+        return SnapshotDados(carregar, ttl_s=300, arquivo=ArquivoSnapshot(diretorio))
+
+    fria = partida()
+    t0 = time.perf_counter()
+    _, df_o, df_f = fria.obter()
+    espera_fria = time.perf_counter() - t0
+    fria.parar(timeout=30)
+    t0 = time.perf_counter()
+    fria.arquivo.salvar(0, df_o, df_f, time.time())  # Mesma gravação da thread, cronometrada
+    gravacao = time.perf_counter() - t0
+    tamanho = sum(os.path.getsize(os.path.join(diretorio, n)) for n in os.listdir(diretorio))
+
+    quente = partida()
+    t0 = time.perf_counter()
+    quente.obter()
+    espera_quente = time.perf_counter() - t0
+    while quente.status()["atualizando"]:
+        time.sleep(0.01)
+    revalidacao = time.perf_counter() - t0
+    quente.parar(timeout=5)
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+    print(f"{args.linhas} lançamentos, latência {args.latencia}s + até {args.jitter}s\n")
+    print(f"primeira sessão, sem cópia (ms)    {espera_fria * 1000:.0f}")
+    print(f"primeira sessão, com cópia (ms)    {espera_quente * 1000:.1f}")
+    print(f"cópia servida até revalidar (ms)   {revalidacao * 1000:.0f}")
+    print(f"gravação da cópia (ms)             {gravacao * 1000:.1f} ({tamanho / 1e6:.1f} MB em disco)")
+
+
+if __name__ == "__main__":
+    main()
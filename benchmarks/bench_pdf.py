@@ -0,0 +1,83 @@
+"""
+Benchmark do motor PDF: tempo de renderização e pico de memória (RSS).
+
+Compara o extrato clássico (uma única Table) com o modo de relatório grande
+(blocos de uma página) para 1k, 10k e 100k lançamentos. Cada medição roda em
+um subprocesso separado para que o pico de RSS seja só daquele relatório.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_pdf.py
+    python benchmarks/bench_pdf.py --linhas 1000 10000 --modos grande
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def _lancamentos(n: int):
+    """DataFrame sintético no formato do extrato (Data, Categoria, Descrição, Valor)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    cats = ["Material", "Mão de Obra", "Serviços", "Administrativo", "Impostos", "Outros"]
+    datas = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D")
+    return pd.DataFrame({
+        "Data": datas.strftime("%Y-%m-%d"),
+        "Categoria": rng.choice(cats, n),
+        "Descrição": [f"Compra de insumos lote {i} - fornecedor {i % 97}" for i in range(n)],
+        "Valor": rng.uniform(10, 50_000, n).round(2),
+    }).sort_values("Data", ascending=False)
+
+
+def medir(n: int, modo: str) -> None:
+    """Renderiza um relatório e imprime 'segundos kb_pico bytes_pdf' (roda no subprocesso)."""
+    from relatorio_pdf import gerar_pdf_empresarial
+
+    df = _lancamentos(n)
+    df_cat = df.groupby("Categoria", as_index=False)["Valor"].sum()
+    custos = float(df["Valor"].sum())
+
+    t0 = time.perf_counter()
+    pdf = gerar_pdf_empresarial(
+        "Obra Benchmark", "De 01/01/2024 até 31/12/2025", custos * 1.3, custos,
+        custos * 0.3, 30.0, df_cat, df, modo_grande=(modo == "grande")
+    )
+    dt = time.perf_counter() - t0
+    pico_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{dt:.3f} {pico_kb} {len(pdf)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--modos", nargs="+", default=["classico", "grande"], choices=["classico", "grande"])
+    parser.add_argument("--_filho", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._filho:
+        medir(int(args._filho[0]), args._filho[1])
+        return
+
+    print(f"{'linhas':>8} {'modo':>9} {'tempo (s)':>10} {'pico RSS (MB)':>14} {'PDF (MB)':>9}")
+    for n in args.linhas:
+        for modo in args.modos:
+            out = subprocess.run(
+                [sys.executable, __file__, "--_filho", str(n), modo],
+                capture_output=True, text=True, cwd=RAIZ
+            )
+            if out.returncode != 0:
+                print(f"{n:>8} {modo:>9} falhou: {out.stderr.strip().splitlines()[-1:]}")
+                continue
+            dt, pico_kb, tam = out.stdout.split()
+            print(f"{n:>8} {modo:>9} {float(dt):>10.2f} {int(pico_kb) / 1024:>14.1f} {int(tam) / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Leituras do Sheets com várias réplicas do app atrás de um balanceador.
+
+Simula réplicas (um SnapshotDados e um SheetsRepositorio cada, como
+processos separados) sobre a mesma planilha emulada, com uma sessão dando
+rerun em cada uma e lançamentos gravados por réplicas alternadas. Compara:
+
+- independentes: cada réplica só conhece as próprias escritas e relê o
+  Sheets no seu TTL;
+- compartilhadas: versão comum (VersaoCompartilhada) e cópia em disco num
+  diretório comum; uma réplica relê e as demais adotam a cópia.
+
+Mede as requisições de leitura à planilha e quantas réplicas terminam com o
+último lançamento (as independentes só o veem após o próprio TTL).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_replicas.py
+    python benchmarks/bench_replicas.py --replicas 8 --ttl 4 --duracao 20
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from emulador_sheets import PlanilhaEmulada  # noqa: E402
+from esquema import normalizar_financeiro, normalizar_obras  # noqa: E402
+from sintetico import carteira  # noqa: E402
+from snapshot_dados import ArquivoSnapshot, SnapshotDados  # noqa: E402
+from storage import SheetsRepositorio  # noqa: E402
+from versao_compartilhada import VersaoCompartilhada  # noqa: E402
+
+ID_NOVOS = 900_000_000
+
+
+class AcessoReplica:
+    """A planilha comum vista por uma réplica (id próprio: o voo_unico não junta leituras de réplicas diferentes)."""
+
+    def __init__(self, planilha: PlanilhaEmulada, n: int):
+        self._planilha = planilha
+        self.id = f"{planilha.id}-replica{n}"
+
+    def __getattr__(self, nome: str):
+        return getattr(self._planilha, nome)
+
+
+def simular(args: argparse.Namespace, compartilhar: bool) -> Tuple[int, int, float]:
+    """
+    Roda a simulação num dos modos.
+
+    Returns:
+        Tupla (leituras da planilha, réplicas com o último lançamento, duração)
+    """
+    obras, financeiro = carteira(args.linhas)
+    planilha = PlanilhaEmulada({"Obras": obras, "Financeiro": financeiro}, latencia_s=args.latencia, jitter_s=args.jitter)
+    diretorio = tempfile.mkdtemp(prefix="bench_replicas_")
+    replicas: List[Tuple[SheetsRepositorio, SnapshotDados]] = []
+    for n in range(args.replicas):
+        repo = SheetsRepositorio(AcessoReplica(planilha, n))
+
+        def carregar(abas, completo, repo=repo):
+            """Como nucleo.fetch_data_from_google: as duas abas juntas ou só as alteradas."""
+            if abas is None:
+                bruto_o, bruto_f = repo.carregar_tudo(forcar_completo=completo)
+                return normalizar_obras(bruto_o), normalizar_financeiro(bruto_f)
+            tabelas = repo.carregar_abas(tuple(abas), forcar_completo=completo)
+            return (
+                normalizar_obras(tabelas["Obras"]) if "Obras" in tabelas else None,
+                normalizar_financeiro(tabelas["Financeiro"]) if "Financeiro" in tabelas else None,
+            )
+
+        replicas.append((repo, SnapshotDados(
+            carregar,
+            args.ttl,
+            antecedencia_s=min(1.0, args.ttl / 2),
+            arquivo=ArquivoSnapshot(diretorio) if compartilhar else None,
+            compartilhado=VersaoCompartilhada(os.path.join(diretorio, "versao.db")) if compartilhar else None,
+        )))
+    # Primeira réplica sobe antes (grava a cópia); as demais partem dela
+    replicas[0][1].obter()
+    time.sleep(0.5)
+    n0 = len(planilha.chamadas)
+    t0 = time.monotonic()
+    fim = t0 + args.duracao
+
+    def sessao(dados: SnapshotDados) -> None:
+        versao = None
+        while time.monotonic() < fim:
+            pedida = None if versao is None or versao < (dados.publicada or 0) else versao
+            versao, _, _ = dados.obter(pedida)
+            time.sleep(args.intervalo)
+
+    threads = [threading.Thread(target=sessao, args=(dados,)) for _, dados in replicas]
+    for t in threads:
+        t.start()
+    gravados = 0
+    while time.monotonic() + args.gravacoes < fim:
+        time.sleep(args.gravacoes)
+        repo, dados = replicas[gravados % len(replicas)]
+        repo.adicionar_lancamento([ID_NOVOS + gravados, "2024-06-01", "Saída (Despesa)", "Material", "Novo", 150.0, "", "", "Pix"])
+        dados.nova_versao(["Financeiro"])
+        gravados += 1
+    for t in threads:
+        t.join()
+    duracao = time.monotonic() - t0
+    leituras = sum(n for metodo, n in planilha.contagem(n0).items() if "get" in metodo)
+    ultimo = str(ID_NOVOS + gravados - 1)
+    em_dia = 0
+    for _, dados in replicas:
+        _, _, df_f = dados.obter()
+        em_dia += ultimo in set(df_f["ID"].astype(str))
+        dados.parar(timeout=5)
+    shutil.rmtree(diretorio, ignore_errors=True)
+    return leituras, em_dia, duracao
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=2000, help="Lançamentos na aba Financeiro")
+    parser.add_argument("--latencia", type=float, default=0.2, help="Latência fixa por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latência extra aleatória por requisição (s)")
+    parser.add_argument("--replicas", type=int, default=4, help="Processos do app simulados")
+    parser.add_argument("--intervalo", type=float, default=0.2, help="Intervalo entre reruns de uma sessão (s)")
+    parser.add_argument("--gravacoes", type=float, default=2.0, help="Intervalo entre lançamentos (s)")
+    parser.add_argument("--ttl", type=float, default=5.0, help="TTL do snapshot (s)")
+    parser.add_argument("--duracao", type=float, default=15.0, help="Duração da simulação (s)")
+    args = parser.parse_args()
+
+    print(
+        f"{args.replicas} réplicas, {args.linhas} lançamentos, latência {args.latencia}s + até {args.jitter}s, "
+        f"TTL {args.ttl}s, lançamento a cada {args.gravacoes}s\n"
+    )
+    print(f"{'modo':<16}{'leituras':>10}{'por minuto':>12}{'réplicas com o último lançamento':>36}")
+    for nome, compartilhar in (("independentes", False), ("compartilhadas", True)):
+        leituras, em_dia, duracao = simular(args, compartilhar)
+        print(f"{nome:<16}{leituras:>10}{leituras * 60 / duracao:>12.0f}{f'{em_dia}/{args.replicas}':>36}")
+
+
+if __name__ == "__main__":
+    main()
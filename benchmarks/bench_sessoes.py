@@ -0,0 +1,99 @@
+"""
+Memória por sessão: cópias por sessão x snapshot compartilhado.
+
+Simula N sessões abrindo a página Financeiro sobre a mesma tabela. No modelo
+antigo cada sessão recebia sua cópia do st.cache_data (pickle) e tirava mais
+cópias (df_saida_all, df_show, df_view, df_to_edit); no novo todas referenciam
+o mesmo snapshot e só o que a página realmente altera é alocado (copy-on-write).
+Mede com tracemalloc a memória retida após abrir todas as sessões.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_sessoes.py
+    python benchmarks/bench_sessoes.py --linhas 50000 --sessoes 1 10 30
+"""
+import argparse
+import os
+import pickle
+import sys
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+COLS_EDITOR = ["ID", "Data", "Tipo", "Forma Pagamento", "Obra Vinculada", "Categoria", "Fornecedor", "Descrição", "Valor"]
+
+
+def financeiro(n: int) -> pd.DataFrame:
+    """Financeiro sintético já tratado (como sai de fetch_data_from_google)."""
+    rng = np.random.default_rng(42)
+    datas = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D")
+    df = pd.DataFrame({
+        "ID": np.arange(1, n + 1),
+        "Data": datas.strftime("%Y-%m-%d"),
+        "Tipo": rng.choice(["Saída (Despesa)", "Entrada"], n, p=[0.9, 0.1]),
+        "Categoria": rng.choice(["Material", "Mão de Obra", "Serviços", "Impostos"], n),
+        "Descrição": [f"Lançamento {i}" for i in range(n)],
+        "Valor": rng.uniform(10, 50_000, n).round(2),
+        "Obra Vinculada": rng.choice([f"Obra {i}" for i in range(30)], n),
+        "Fornecedor": rng.choice(["", "Fornecedor A", "Fornecedor B"], n),
+        "Forma Pagamento": rng.choice(["Pix", "Boleto", "Cartão"], n),
+    })
+    df["Data_DT"] = pd.to_datetime(df["Data"])
+    return df
+
+
+def sessao_antiga(cache_pickle: bytes) -> list:
+    """Uma sessão no modelo antigo: cópia do cache + cópias das páginas."""
+    df_fin = pickle.loads(cache_pickle)
+    df_saida_all = df_fin[df_fin["Tipo"].str.contains("Saída|Despesa", case=False, na=False)].copy()
+    df_show = df_saida_all.copy()
+    df_view = df_fin.copy()
+    df_to_edit = df_view[COLS_EDITOR].copy()
+    df_to_edit["Valor"] = pd.to_numeric(df_to_edit["Valor"], errors="coerce").fillna(0.0)
+    return [df_fin, df_saida_all, df_show, df_view, df_to_edit]
+
+
+def sessao_snapshot(snapshot: pd.DataFrame) -> list:
+    """Uma sessão no modelo novo: referência ao snapshot e seleções sem cópia."""
+    df_view = snapshot
+    df_to_edit = df_view.reindex(columns=COLS_EDITOR, fill_value="")
+    df_to_edit["Valor"] = pd.to_numeric(df_to_edit["Valor"], errors="coerce").fillna(0.0)
+    return [df_view, df_to_edit]
+
+
+def retido_mb(fn, n_sessoes: int) -> float:
+    """Memória retida (MB) após abrir n_sessoes com fn()."""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessoes = [fn() for _ in range(n_sessoes)]
+    atual = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessoes
+    return (atual - base) / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=20_000)
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 10, 30])
+    args = parser.parse_args()
+
+    df = financeiro(args.linhas)
+    cache_pickle = pickle.dumps(df)
+
+    print(f"Financeiro: {args.linhas} linhas, {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
+    print(f"{'sessões':>8} {'antigo (MB)':>12} {'snapshot (MB)':>14} {'MB/sessão antigo':>17} {'MB/sessão snapshot':>19}")
+    for n in args.sessoes:
+        antigo = retido_mb(lambda: sessao_antiga(cache_pickle), n)
+        novo = retido_mb(lambda: sessao_snapshot(df), n)
+        print(f"{n:>8} {antigo:>12.1f} {novo:>14.1f} {antigo / n:>17.2f} {novo / n:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
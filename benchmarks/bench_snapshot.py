@@ -0,0 +1,111 @@
+"""
+Espera dos reruns pelo snapshot de dados com atualização em segundo plano.
+
+Simula sessões dando rerun (SnapshotDados.obter) sobre o SheetsRepositorio
+no emulador com latência, enquanto gravações avançam a versão e o snapshot
+vence (TTL curto). Mede por rerun:
+
+- a espera em obter() (só a primeira carga do processo deveria esperar);
+- a idade do snapshot servido e quantos reruns receberam dados anteriores a
+  uma gravação (servidos enquanto a thread recarregava);
+- quantas cargas a thread fez (após uma gravação no Financeiro, só ele é relido).
+
+Para comparação, "carga" é o tempo de uma carga das duas abas: era o que
+cada rerun após uma gravação ou expiração esperava com o cache bloqueante.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_snapshot.py
+    python benchmarks/bench_snapshot.py --linhas 20000 --latencia 0.4 --duracao 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from emulador_sheets import PlanilhaEmulada  # noqa: E402
+from esquema import normalizar_financeiro, normalizar_obras  # noqa: E402
+from sintetico import carteira  # noqa: E402
+from snapshot_dados import SnapshotDados  # noqa: E402
+from storage import SheetsRepositorio  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=5000, help="Lançamentos na aba Financeiro")
+    parser.add_argument("--latencia", type=float, default=0.3, help="Latência fixa por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latência extra aleatória por requisição (s)")
+    parser.add_argument("--sessoes", type=int, default=4, help="Sessões dando rerun em paralelo")
+    parser.add_argument("--intervalo", type=float, default=0.1, help="Intervalo entre reruns de uma sessão (s)")
+    parser.add_argument("--gravacoes", type=float, default=3.0, help="Intervalo entre gravações (s)")
+    parser.add_argument("--ttl", type=float, default=5.0, help="TTL do snapshot (s)")
+    parser.add_argument("--duracao", type=float, default=15.0, help="Duração da simulação (s)")
+    args = parser.parse_args()
+
+    obras, financeiro = carteira(args.linhas)
+    planilha = PlanilhaEmulada({"Obras": obras, "Financeiro": financeiro}, latencia_s=args.latencia, jitter_s=args.jitter, seed=1)
+    repo = SheetsRepositorio(planilha)
+    cargas = []
+
+    def carregar(abas, completo):
+        """Como nucleo.fetch_data_from_google: as duas abas juntas ou só as alteradas."""
+        t0 = time.perf_counter()
+        if abas is None:
+            bruto_o, bruto_f = repo.carregar_tudo(forcar_completo=completo)
+            tabelas = normalizar_obras(bruto_o), normalizar_financeiro(bruto_f)
+        else:
+            tabelas = None, normalizar_financeiro(repo.carregar_abas(("Financeiro",), forcar_completo=completo)["Financeiro"])
+        cargas.append(time.perf_counter() - t0)
+        return tabelas
+
+    dados = SnapshotDados(carregar, args.ttl, antecedencia_s=min(1.0, args.ttl / 2))
+    esperas, idades, defasados = [], [], []
+    lock = threading.Lock()
+    fim = time.monotonic() + args.duracao
+
+    def sessao() -> None:
+        versao = None
+        while time.monotonic() < fim:
+            pedida = None if versao is None or versao < (dados.publicada or 0) else versao  # Sessão recarrega
+            t0 = time.perf_counter()
+            versao, _, _ = dados.obter(pedida)
+            espera = time.perf_counter() - t0
+            status = dados.status()
+            with lock:
+                esperas.append(espera)
+                idades.append(status["idade_s"] or 0.0)
+                defasados.append(versao < status["versao"])
+            time.sleep(args.intervalo)
+
+    threads = [threading.Thread(target=sessao) for _ in range(args.sessoes)]
+    for t in threads:
+        t.start()
+    while time.monotonic() < fim:
+        time.sleep(args.gravacoes)
+        dados.nova_versao(["Financeiro"])  # Lançamento gravado pela fila
+    for t in threads:
+        t.join()
+    dados.parar(timeout=5)
+
+    esperas_ms = sorted(e * 1000 for e in esperas)
+    lentos = sum(e > 50 for e in esperas_ms)
+    print(
+        f"{args.linhas} lançamentos, latência {args.latencia}s + até {args.jitter}s, TTL {args.ttl}s, "
+        f"{args.sessoes} sessões, gravação a cada {args.gravacoes}s\n"
+    )
+    print(f"reruns                       {len(esperas_ms)}")
+    print(f"espera p50 / p99 / máx (ms)  {statistics.median(esperas_ms):.2f} / "
+          f"{esperas_ms[int(len(esperas_ms) * 0.99)]:.2f} / {esperas_ms[-1]:.0f}")
+    print(f"reruns esperando > 50 ms     {lentos} (primeira carga do processo)")
+    print(f"carga (ms)                   {statistics.median(cargas) * 1000:.0f} mediana, {len(cargas)} cargas")
+    print(f"idade servida p50 / máx (s)  {statistics.median(idades):.1f} / {max(idades):.1f}")
+    print(f"reruns com dados defasados   {sum(defasados)} ({sum(defasados) / len(defasados):.0%}, enquanto a thread recarregava)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Gerador de carteiras sintéticas no formato bruto do repositório.
+
+Produz (obras, financeiro) como sai de carregar_obras()/carregar_financeiro()
+antes de esquema.normalizar_*: colunas object com a bagunça real da planilha
+- "Valor" misturando floats, inteiros, "R$ 1.234,56", "1234,56", células em
+branco e lixo; textos com espaços nas pontas; Fornecedor, Forma Pagamento e
+Data às vezes vazios. Categorias e formas de pagamento vêm de esquema.CATS e
+esquema.PAGAMENTOS. Determinístico para um mesmo seed.
+
+Uso como módulo (a partir de benchmarks/):
+    from sintetico import carteira
+    df_obras, df_fin = carteira(100_000)
+"""
+import os
+import sys
+from typing import Optional, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from esquema import CATS, PAGAMENTOS, STATUS_OBRA  # noqa: E402
+from formatacao import fmt_moeda_series  # noqa: E402
+from storage import FIN_COLS, OBRAS_COLS  # noqa: E402
+
+LIXO = ["-", "n/d", "a combinar", "1_000", "?"]
+
+
+def _valores_baguncados(rng: np.random.Generator, valores: np.ndarray) -> np.ndarray:
+    """Coluna monetária: 45% float, 10% int, 30% "R$ x.xxx,xx", 5% "x,xx", 7% vazio, 3% lixo."""
+    n = len(valores)
+    tipo = rng.choice(6, n, p=[0.45, 0.10, 0.30, 0.05, 0.07, 0.03])
+    col = valores.astype(object)
+    inteiro = tipo == 1
+    col[inteiro] = np.round(valores[inteiro]).astype(np.int64)
+    brl = tipo == 2
+    if brl.any():
+        col[brl] = fmt_moeda_series(pd.Series(valores[brl])).to_numpy()
+    virgula = tipo == 3
+    if virgula.any():
+        col[virgula] = np.char.replace(np.char.mod("%.2f", valores[virgula]), ".", ",").astype(object)
+    col[tipo == 4] = ""
+    col[tipo == 5] = rng.choice(LIXO, int((tipo == 5).sum()))
+    return col
+
+
+def _com_espacos(rng: np.random.Generator, valores: np.ndarray, fracao: float = 0.05) -> np.ndarray:
+    """Acrescenta espaços nas pontas de uma fração dos textos (como digitado na planilha)."""
+    col = valores.astype(object)
+    sujos = rng.random(len(col)) < fracao
+    if sujos.any():
+        col[sujos] = np.char.add(np.char.add(" ", col[sujos].astype(str)), " ").astype(object)
+    return col
+
+
+def _vazios(rng: np.random.Generator, valores: np.ndarray, fracao: float) -> np.ndarray:
+    col = valores.astype(object)
+    col[rng.random(len(col)) < fracao] = ""
+    return col
+
+
+def obras(n: int, seed: int = 42) -> pd.DataFrame:
+    """Aba Obras bruta com n obras (Cliente único por obra)."""
+    rng = np.random.default_rng(seed)
+    vgv = rng.uniform(200_000, 5_000_000, n).round(2)
+    inicio = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 1000, n), unit="D")
+    df = pd.DataFrame({
+        "ID": np.arange(1, n + 1),
+        "Cliente": _com_espacos(rng, np.array([f"Residencial {i:06d}" for i in range(n)], dtype=object)),
+        "Endereço": np.array([f"Rua {i % 500}, {i % 2000}" for i in range(n)], dtype=object),
+        "Status": _com_espacos(rng, rng.choice(STATUS_OBRA, n)),
+        "Valor Total": _valores_baguncados(rng, vgv),
+        "Data Início": inicio.strftime("%Y-%m-%d"),
+        "Prazo": _vazios(rng, rng.choice(["12 meses", "18 meses", "24 meses", "Dez/2026"], n), 0.2),
+        "Area Construida": rng.integers(60, 400, n),
+        "Area Terreno": rng.integers(120, 900, n),
+        "Quartos": rng.integers(1, 6, n),
+        "Custo Previsto": _valores_baguncados(rng, (vgv * rng.uniform(0.5, 0.8, n)).round(2)),
+    })
+    return df[OBRAS_COLS]
+
+
+def financeiro(n: int, clientes: np.ndarray, seed: int = 43) -> pd.DataFrame:
+    """Aba Financeiro bruta com n lançamentos distribuídos entre as obras de `clientes`."""
+    rng = np.random.default_rng(seed)
+    datas = (pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 1095, n), unit="D")).strftime("%Y-%m-%d")
+    # Distribuição desigual entre obras (poucas obras concentram a maior parte dos lançamentos)
+    pesos = rng.pareto(1.5, len(clientes)) + 1
+    obra = clientes[rng.choice(len(clientes), n, p=pesos / pesos.sum())]
+    df = pd.DataFrame({
+        "ID": 100_000_000 + np.arange(n),
+        "Data": _vazios(rng, np.asarray(datas, dtype=object), 0.01),
+        "Tipo": rng.choice(["Saída (Despesa)", "Entrada"], n, p=[0.9, 0.1]),
+        "Categoria": _com_espacos(rng, rng.choice(CATS, n)),
+        "Descrição": np.char.add("Lançamento ", np.arange(n).astype(str)).astype(object),
+        "Valor": _valores_baguncados(rng, rng.lognormal(7, 1.5, n).round(2)),
+        "Obra Vinculada": _com_espacos(rng, _vazios(rng, obra, 0.01)),
+        "Fornecedor": _vazios(rng, rng.choice([f"Fornecedor {i}" for i in range(300)], n), 0.3),
+        "Forma Pagamento": _vazios(rng, rng.choice(PAGAMENTOS, n), 0.1),
+    })
+    return df[FIN_COLS]
+
+
+def carteira(n_lancamentos: int, n_obras: Optional[int] = None, seed: int = 42) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Carteira sintética bruta.
+
+    Args:
+        n_lancamentos: Linhas do Financeiro
+        n_obras: Obras (padrão: uma a cada 2.000 lançamentos, entre 5 e 500)
+        seed: Semente do gerador
+
+    Returns:
+        Tupla (df_obras, df_fin) no formato de carregar_obras()/carregar_financeiro()
+    """
+    if n_obras is None:
+        n_obras = min(500, max(5, n_lancamentos // 2000))
+    df_o = obras(n_obras, seed)
+    clientes = df_o["Cliente"].astype(str).str.strip().to_numpy(dtype=object)
+    return df_o, financeiro(n_lancamentos, clientes, seed + 1)
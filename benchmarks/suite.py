@@ -0,0 +1,229 @@
+"""
+Suíte de benchmarks dos caminhos quentes sobre carteiras sintéticas.
+
+Para cada tamanho (lançamentos do Financeiro) gera uma carteira com
+sintetico.carteira() e mede, separadamente, o melhor de N execuções de:
+
+    carga_parse         normalizar_obras + normalizar_financeiro (dados brutos da planilha)
+    dashboard           AgregadosDashboard + escopo consolidado + escopo de uma obra
+    financeiro_filtro   filtro por obra e categoria + preparar_edicao_financeiro
+    financeiro_diff     normalizar_comparacao (original e editado) + equals + diff_financeiro
+                        (tabela inteira, 1% das linhas editadas, 0,1% marcadas para excluir)
+    obras_diff          preparar_edicao_obras + diff_obras (Obras com o mesmo número de
+                        linhas, 50 editadas, 5 renomeadas)
+    pdf                 gerar_pdf_empresarial do portfólio (até --pdf-max linhas)
+
+Os resultados vão para um JSON (versão do código, ambiente e segundos por
+caminho/tamanho). Com --comparar, confronta com um JSON anterior e termina
+com código 1 se algum caminho ficou mais lento que a tolerância.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/suite.py
+    python benchmarks/suite.py --linhas 1000 10000 --caminhos dashboard financeiro_diff
+    python benchmarks/suite.py --saida novo.json --comparar benchmarks/resultados/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+from agregados import AgregadosDashboard, ESCOPO_TODAS  # noqa: E402
+from edicao import (  # noqa: E402
+    diff_financeiro, diff_obras, normalizar_comparacao,
+    preparar_edicao_financeiro, preparar_edicao_obras,
+)
+from esquema import normalizar_financeiro, normalizar_obras  # noqa: E402
+from sintetico import carteira, obras  # noqa: E402
+
+CAMINHOS = ["carga_parse", "dashboard", "financeiro_filtro", "financeiro_diff", "obras_diff", "pdf"]
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+PDF_MAX_PADRAO = 10_000  # O extrato completo no PDF passa de 20 s com 100k linhas
+RUIDO_MIN_S = 0.010  # Diferenças abaixo disto não contam como regressão
+
+
+def melhor_tempo(fn: Callable[[], object], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def editar_financeiro(df_to_edit: pd.DataFrame, seed: int = 7) -> pd.DataFrame:
+    """Simula o retorno do data_editor: 1% das linhas com Valor alterado, 0,1% marcadas para excluir."""
+    rng = np.random.default_rng(seed)
+    editado = df_to_edit.copy()
+    n = len(editado)
+    alterar = rng.choice(n, max(1, n // 100), replace=False)
+    editado.iloc[alterar, editado.columns.get_loc("Valor")] += 1.0
+    excluir = rng.choice(n, max(1, n // 1000), replace=False)
+    editado.iloc[excluir, editado.columns.get_loc("Excluir")] = True
+    return editado
+
+
+def editar_obras(df_to_edit: pd.DataFrame, seed: int = 7) -> pd.DataFrame:
+    """Simula uma sessão de edição de Obras: 50 linhas alteradas, 5 delas renomeadas."""
+    rng = np.random.default_rng(seed)
+    editado = df_to_edit.copy()
+    linhas = rng.choice(len(editado), min(50, len(editado)), replace=False)
+    editado.iloc[linhas, editado.columns.get_loc("Custo Previsto")] += 1000.0
+    col_cliente = editado.columns.get_loc("Cliente")
+    for i in linhas[:5]:
+        editado.iloc[i, col_cliente] = f"{editado.iloc[i, col_cliente]} (renomeada)"
+    return editado
+
+
+def medir_tamanho(n: int, caminhos: List[str], repeticoes: int, pdf_max: int) -> Dict[str, Optional[float]]:
+    """Segundos (melhor de `repeticoes`) de cada caminho para uma carteira de n lançamentos."""
+    bruto_o, bruto_f = carteira(n)
+    df_o, df_f = normalizar_obras(bruto_o), normalizar_financeiro(bruto_f)
+    obra = str(df_f["Obra Vinculada"].mode().iloc[0])
+    tempos: Dict[str, Optional[float]] = {}
+
+    if "carga_parse" in caminhos:
+        tempos["carga_parse"] = melhor_tempo(lambda: (normalizar_obras(bruto_o), normalizar_financeiro(bruto_f)), repeticoes)
+
+    if "dashboard" in caminhos:
+        def _dashboard():
+            agregados = AgregadosDashboard(df_o, df_f)
+            agregados.escopo(ESCOPO_TODAS)
+            agregados.escopo(obra)
+        tempos["dashboard"] = melhor_tempo(_dashboard, repeticoes)
+
+    if "financeiro_filtro" in caminhos:
+        def _filtro():
+            df_view = df_f[df_f["Obra Vinculada"] == obra]
+            df_view = df_view[df_view["Categoria"] == "Material"]
+            preparar_edicao_financeiro(df_view)
+        tempos["financeiro_filtro"] = melhor_tempo(_filtro, repeticoes)
+
+    if "financeiro_diff" in caminhos:
+        base = preparar_edicao_financeiro(df_f)
+        editado = editar_financeiro(base)
+
+        def _diff():
+            base_cmp = normalizar_comparacao(base)
+            edit_cmp = normalizar_comparacao(editado)
+            if not edit_cmp.equals(base_cmp):
+                diff_financeiro(editado, base_cmp, edit_cmp)
+        tempos["financeiro_diff"] = melhor_tempo(_diff, repeticoes)
+
+    if "obras_diff" in caminhos:
+        carteira_obras = normalizar_obras(obras(n))
+        original = preparar_edicao_obras(carteira_obras)
+        editado_obras = editar_obras(original)
+        tempos["obras_diff"] = melhor_tempo(
+            lambda: diff_obras(carteira_obras, preparar_edicao_obras(carteira_obras), editado_obras), repeticoes
+        )
+
+    if "pdf" in caminhos:
+        if n > pdf_max:
+            tempos["pdf"] = None
+        else:
+            from relatorio_pdf import gerar_pdf_empresarial
+
+            visao = AgregadosDashboard(df_o, df_f).escopo(ESCOPO_TODAS)
+            extrato = visao["lancamentos"].reindex(columns=["Data", "Categoria", "Descrição", "Valor"]).sort_values("Data", ascending=False)
+            custos = visao["custos"]
+            tempos["pdf"] = melhor_tempo(lambda: gerar_pdf_empresarial(
+                ESCOPO_TODAS, visao["periodo"], custos * 1.3, custos, custos * 0.3, 30.0, visao["categorias"], extrato
+            ), 1 if n >= 100_000 else repeticoes)
+    return tempos
+
+
+def versao_codigo() -> str:
+    """Commit atual (com "+" se houver alterações não commitadas)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+        sujo = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+        return f"{commit}+" if sujo else commit or "desconhecida"
+    except OSError:
+        return "desconhecida"
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> bool:
+    """Imprime a razão atual/base por caminho e tamanho; True se houve regressão."""
+    anteriores = {(r["caminho"], r["linhas"]): r["segundos"] for r in base["resultados"]}
+    regressao = False
+    print(f"\nComparação com {base.get('versao', '?')} (tolerância {tolerancia:.0%})")
+    print(f"{'caminho':>18} {'linhas':>9} {'base (s)':>9} {'atual (s)':>10} {'razão':>7}")
+    for r in atual["resultados"]:
+        antes = anteriores.get((r["caminho"], r["linhas"]))
+        if antes is None or r["segundos"] is None:
+            continue
+        razao = r["segundos"] / antes if antes else float("inf")
+        pior = razao > 1 + tolerancia and r["segundos"] - antes > RUIDO_MIN_S
+        regressao |= pior
+        marca = "  <-- REGRESSÃO" if pior else ""
+        print(f"{r['caminho']:>18} {r['linhas']:>9} {antes:>9.4f} {r['segundos']:>10.4f} {razao:>6.2f}x{marca}")
+    return regressao
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--caminhos", nargs="+", default=CAMINHOS, choices=CAMINHOS)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Melhor de N (1 para tamanhos >= 1M)")
+    parser.add_argument("--pdf-max", type=int, default=PDF_MAX_PADRAO, help="Maior tamanho em que o PDF é renderizado")
+    parser.add_argument("--saida", help="Arquivo JSON (padrão: benchmarks/resultados/suite-<versão>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Aumento relativo aceito antes de acusar regressão")
+    args = parser.parse_args()
+
+    versao = versao_codigo()
+    resultado = {
+        "versao": versao,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "resultados": [],
+    }
+
+    print(f"{'linhas':>9} " + " ".join(f"{c:>17}" for c in args.caminhos))
+    for n in args.linhas:
+        repeticoes = 1 if n >= 1_000_000 else args.repeticoes
+        tempos = medir_tamanho(n, args.caminhos, repeticoes, args.pdf_max)
+        for caminho in args.caminhos:
+            resultado["resultados"].append({
+                "caminho": caminho, "linhas": n, "segundos": tempos.get(caminho), "repeticoes": repeticoes,
+            })
+        print(f"{n:>9} " + " ".join(
+            f"{tempos[c] * 1000:>14.1f} ms" if tempos.get(c) is not None else f"{'—':>17}" for c in args.caminhos
+        ))
+
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"suite-{versao.rstrip('+')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if comparar(resultado, base, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
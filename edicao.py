@@ -0,0 +1,169 @@
+"""
+Tabelas editáveis (st.data_editor) das páginas Financeiro e Obras.
+
+Preparação do DataFrame mostrado no editor, normalização para detectar
+alterações e montagem das gravações (só linhas alteradas). Fica fora do
+app.py para ser importável pelos benchmarks sem subir o Streamlit.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from esquema import para_edicao
+from formatacao import safe_float
+from storage import FIN_COLS, OBRAS_COLS
+
+COLS_EDICAO_FINANCEIRO = ["ID", "Data", "Tipo", "Forma Pagamento", "Obra Vinculada", "Categoria", "Fornecedor", "Descrição", "Valor"]
+COLS_EDICAO_OBRAS = ["ID", "Cliente", "Status", "Prazo", "Valor Total", "Custo Previsto", "Area Construida", "Area Terreno", "Quartos"]
+
+_COLS_TEXTO_FINANCEIRO = ["Tipo", "Forma Pagamento", "Obra Vinculada", "Categoria", "Fornecedor", "Descrição"]
+_COLS_NUM_OBRAS = ["Valor Total", "Custo Previsto", "Area Construida", "Area Terreno", "Quartos", "ID"]
+
+
+# ==============================================================================
+# FINANCEIRO
+# ==============================================================================
+def preparar_edicao_financeiro(df_view: pd.DataFrame) -> pd.DataFrame:
+    """
+    Lançamentos filtrados no formato do editor (com a coluna "Excluir").
+
+    Args:
+        df_view: Recorte do snapshot do Financeiro (não é alterado)
+
+    Returns:
+        DataFrame com COLS_EDICAO_FINANCEIRO, Data como date e "Excluir" = False
+    """
+    df_to_edit = para_edicao(df_view.reindex(columns=COLS_EDICAO_FINANCEIRO, fill_value=""))
+
+    df_to_edit["ID"] = pd.to_numeric(df_to_edit["ID"], errors="coerce").fillna(0).astype(int)
+    df_to_edit["Data"] = pd.to_datetime(df_to_edit["Data"], errors="coerce").dt.date
+    df_to_edit["Valor"] = pd.to_numeric(df_to_edit["Valor"], errors="coerce").fillna(0.0)
+
+    df_to_edit.insert(1, "Excluir", False)
+    return df_to_edit
+
+
+def normalizar_comparacao(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza DataFrame para comparação (Melhoria 5: Type hint)."""
+    d = df.copy(deep=False)  # Copy-on-write: só as colunas reatribuídas são novas
+    d["Data"] = d["Data"].astype(str)
+    d["Valor"] = pd.to_numeric(d["Valor"], errors="coerce").fillna(0.0).astype(float)
+    for c in _COLS_TEXTO_FINANCEIRO:
+        if c not in d.columns:
+            d[c] = ""
+        d[c] = d[c].astype(str).fillna("").str.strip()
+    d["Excluir"] = d["Excluir"].astype(bool)
+    d["ID"] = pd.to_numeric(d["ID"], errors="coerce").fillna(0).astype(int)
+    return d
+
+
+def diff_financeiro(
+    editado: pd.DataFrame,
+    base_cmp: pd.DataFrame,
+    edit_cmp: pd.DataFrame
+) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+    """
+    Gravações do editor do Financeiro: só as linhas alteradas e as marcadas para excluir.
+
+    Args:
+        editado: Retorno do st.data_editor
+        base_cmp: normalizar_comparacao() da tabela original
+        edit_cmp: normalizar_comparacao() da tabela editada
+
+    Returns:
+        Tupla (atualizacoes {ID: registro com FIN_COLS}, IDs a excluir)
+    """
+    ids_del = [int(idv) for idv in editado.loc[editado["Excluir"] == True, "ID"]]
+
+    linhas_alteradas = edit_cmp.ne(base_cmp).any(axis=1)
+    df_upd = editado[(editado["Excluir"] == False) & linhas_alteradas]
+
+    atualizacoes = {}
+    for _, rr in df_upd.iterrows():
+        idv = int(rr["ID"])
+
+        def _val(h):
+            if h == "ID":
+                return idv
+            if h == "Data":
+                v = rr.get("Data", "")
+                if v is None or v is pd.NaT:
+                    return ""  # Data em branco na planilha
+                if isinstance(v, (date, datetime)):
+                    return v.strftime("%Y-%m-%d")
+                return str(v)[:10]
+            if h == "Valor":
+                return float(safe_float(rr.get("Valor", 0)))
+            v = rr.get(h, "")
+            if v is None or (isinstance(v, float) and pd.isna(v)):
+                return ""
+            return str(v).strip()
+
+        atualizacoes[idv] = {h: _val(h) for h in FIN_COLS}
+    return atualizacoes, ids_del
+
+
+# ==============================================================================
+# OBRAS
+# ==============================================================================
+def preparar_edicao_obras(df_obras: pd.DataFrame) -> pd.DataFrame:
+    """Carteira de obras no formato do editor (numéricos sem NaN, texto sem None)."""
+    valid_cols = [c for c in COLS_EDICAO_OBRAS if c in df_obras.columns]
+    df_to_edit = para_edicao(df_obras[valid_cols]).reset_index(drop=True)
+    for c in df_to_edit.columns:
+        if c in _COLS_NUM_OBRAS:
+            df_to_edit[c] = pd.to_numeric(df_to_edit[c], errors='coerce').fillna(0)
+        else:
+            df_to_edit[c] = df_to_edit[c].fillna("")
+    return df_to_edit
+
+
+def diff_obras(
+    df_obras: pd.DataFrame,
+    original: pd.DataFrame,
+    editado: pd.DataFrame
+) -> Tuple[Dict[Any, Dict[str, Any]], Dict[str, str]]:
+    """
+    Gravações do editor de Obras: linhas alteradas e renomeações de obra.
+
+    Args:
+        df_obras: Snapshot de Obras (fornece as colunas fora do editor)
+        original: Tabela entregue ao editor (preparar_edicao_obras)
+        editado: Retorno do st.data_editor
+
+    Returns:
+        Tupla (atualizacoes {ID: registro com OBRAS_COLS}, renomes {antigo: novo})
+    """
+    # Só as linhas efetivamente editadas são gravadas
+    linhas_mudaram = editado.ne(original).any(axis=1)
+    df_alt = editado[linhas_mudaram]
+
+    atualizacoes = {}
+    renomes = {}
+
+    for _, row in df_alt.iterrows():
+        id_obra = row["ID"]
+        original_row = df_obras[df_obras["ID"] == id_obra].iloc[0]
+        old_name = str(original_row["Cliente"]).strip()
+        new_name = str(row["Cliente"]).strip()
+        if old_name != new_name and old_name != "":
+            renomes[old_name] = new_name
+
+        registro = {}
+        for col in OBRAS_COLS:
+            if col in row:
+                val = row[col]
+            else:
+                val = original_row[col]
+
+            if isinstance(val, (pd.Timestamp, date, datetime)):
+                val = val.strftime("%Y-%m-%d")
+            elif pd.isna(val):
+                val = ""
+            elif hasattr(val, "item"):
+                val = val.item()  # numpy -> tipo nativo (serializável em JSON)
+            registro[col] = val
+
+        atualizacoes[id_obra] = registro
+    return atualizacoes, renomes
@@ -0,0 +1,659 @@
+"""
+Emulador do Google Sheets em processo, para testes e benchmarks sem rede.
+
+Substitui os objetos Spreadsheet/Worksheet do gspread devolvidos por
+get_conn(), com os mesmos métodos e formatos de retorno usados pelo app:
+get_all_values, get_all_records, row_values, col_values, find, findall,
+batch_get, append_row(s), update, update_cell(s), batch_update,
+insert_cols e delete_rows na aba; worksheet, values_batch_get,
+values_batch_update e batch_update na planilha.
+
+Cada método conta como as requisições HTTP que o gspread faria (insert_cols
+são duas) e cada requisição:
+
+- espera a latência configurada (base + jitter uniforme);
+- pode falhar com APIError 429 (ou outro status) por probabilidade, por
+  falhas programadas (falhar()) ou por estouro da cota por minuto emulada,
+  sem alterar nada na planilha;
+- fica registrada em `chamadas` (método, aba, faixa, duração, status);
+- com limitar=True, passa pelo limite_api (balde e contabilidade), como
+  as requisições do HTTPClientLimitado.
+
+Os valores ficam com o tipo com que foram gravados; com USER_ENTERED, texto
+numérico vira número e "AAAA-MM-DD" vira célula de data (datetime.date
+também pode vir nos dados iniciais). As leituras devolvem texto formatado
+(padrão do gspread, datas como M/D/AAAA) ou, com
+valueRenderOption=UNFORMATTED_VALUE, os valores crus, com datas como número
+de série (dateTimeRenderOption=SERIAL_NUMBER, o padrão da API).
+
+Uso:
+    planilha = PlanilhaEmulada({"Obras": df_obras, "Financeiro": df_fin}, latencia_s=0.3)
+    repo = SheetsRepositorio(planilha)
+    n0 = len(planilha.chamadas)
+    repo.salvar_financeiro(atualizacoes, exclusoes)
+    planilha.contagem(desde=n0)   # {"batch_get": 1, "batch_update": 1, ...}
+"""
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import requests
+from gspread.cell import Cell
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise, numericise_all, rowcol_to_a1
+from gspread.worksheet import ValueRange
+
+import limite_api
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PARÂMETROS
+# ==============================================================================
+EMULADOR_JANELA_COTA_S = 60.0   # Janela da cota por minuto emulada
+_SEM_LIMITE = 10 ** 7           # Fim de faixa aberta ("A2:A", "1:1")
+
+_planilhas = itertools.count(1)
+
+_DATA_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_EPOCA_SERIAL = datetime(1899, 12, 30)
+
+_MENSAGENS_ERRO = {
+    429: ("RESOURCE_EXHAUSTED", "Quota exceeded for quota metric 'Requests per minute per user' (emulador)"),
+    500: ("INTERNAL", "Internal error encountered (emulador)"),
+    503: ("UNAVAILABLE", "The service is currently unavailable (emulador)"),
+}
+
+
+class ChamadaEmulada:
+    """Uma requisição feita ao emulador."""
+
+    __slots__ = ("metodo", "tipo", "aba", "faixa", "inicio", "duracao_s", "status")
+
+    def __init__(self, metodo: str, tipo: str, aba: str, faixa: str):
+        self.metodo = metodo
+        self.tipo = tipo
+        self.aba = aba
+        self.faixa = faixa
+        self.inicio = time.time()
+        self.duracao_s = 0.0
+        self.status = 200
+
+    def __repr__(self) -> str:
+        alvo = f"{self.aba}!{self.faixa}" if self.faixa else self.aba
+        return f"<{self.metodo} {alvo} {self.status} {self.duracao_s * 1000:.0f}ms>"
+
+
+def erro_api(status: int, retry_after_s: Optional[float] = None) -> APIError:
+    """APIError do gspread com a resposta HTTP que o Google devolveria."""
+    codigo, mensagem = _MENSAGENS_ERRO.get(status, ("UNKNOWN", f"Erro {status} (emulador)"))
+    resposta = requests.Response()
+    resposta.status_code = status
+    resposta._content = json.dumps({"error": {"code": status, "message": mensagem, "status": codigo}}).encode()
+    if retry_after_s is not None:
+        resposta.headers["Retry-After"] = str(retry_after_s)
+    return APIError(resposta)
+
+
+def _letra(col: int) -> str:
+    """Letra A1 da coluna (1-based)."""
+    return rowcol_to_a1(1, col)[:-1]
+
+
+def _formatar(valor: Any) -> str:
+    """Valor como o Sheets o exibe (FORMATTED_VALUE, locale en_US)."""
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "TRUE" if valor else "FALSE"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, datetime):
+        return f"{valor.month}/{valor.day}/{valor.year} {valor:%H:%M:%S}"
+    if isinstance(valor, date):
+        return f"{valor.month}/{valor.day}/{valor.year}"
+    return str(valor)
+
+
+def _cru(valor: Any, serial: bool) -> Any:
+    """Valor como UNFORMATTED_VALUE devolve (datas em número de série, ou formatadas com FORMATTED_STRING)."""
+    if valor is None:
+        return ""
+    if isinstance(valor, date):
+        if not serial:
+            return _formatar(valor)
+        if not isinstance(valor, datetime):
+            return (valor - _EPOCA_SERIAL.date()).days
+        return (valor - _EPOCA_SERIAL).total_seconds() / 86400
+    return valor
+
+
+def _modo_leitura(value_render_option: Any = None, date_time_render_option: Any = None) -> Tuple[bool, bool]:
+    """(formatado, datas em número de série) a partir das opções de leitura (str ou enum do gspread)."""
+    opcao = str(getattr(value_render_option, "value", value_render_option) or "FORMATTED_VALUE")
+    datas = str(getattr(date_time_render_option, "value", date_time_render_option) or "SERIAL_NUMBER")
+    return opcao != "UNFORMATTED_VALUE", datas == "SERIAL_NUMBER"
+
+
+def _entrada_usuario(valor: Any) -> Any:
+    """Texto digitado (USER_ENTERED): número vira número, "AAAA-MM-DD" vira data."""
+    if not isinstance(valor, str):
+        return valor
+    if _DATA_ISO.match(valor):
+        try:
+            return date.fromisoformat(valor)
+        except ValueError:
+            return valor
+    return numericise(valor)
+
+
+def _separar_aba(faixa: str) -> Tuple[Optional[str], str]:
+    """ "'Obras'!A1:K2" -> ("Obras", "A1:K2"); sem "!" -> (None, faixa)."""
+    if "!" not in faixa:
+        return None, faixa
+    aba, resto = faixa.rsplit("!", 1)
+    if aba.startswith("'") and aba.endswith("'"):
+        aba = aba[1:-1].replace("''", "'")
+    return aba, resto
+
+
+def _grade(faixa: str) -> Tuple[int, int, int, int]:
+    """Faixa A1 -> (linha_ini, linha_fim, col_ini, col_fim), 0-based e fim exclusivo."""
+    if not faixa:
+        return 0, _SEM_LIMITE, 0, _SEM_LIMITE
+    g = a1_range_to_grid_range(faixa)
+    return (
+        g.get("startRowIndex", 0), g.get("endRowIndex", _SEM_LIMITE),
+        g.get("startColumnIndex", 0), g.get("endColumnIndex", _SEM_LIMITE),
+    )
+
+
+def _linhas_de(dados: Union[pd.DataFrame, Sequence[Sequence[Any]]]) -> List[List[Any]]:
+    """Cabeçalho + linhas a partir de um DataFrame ou de uma lista de linhas."""
+    if isinstance(dados, pd.DataFrame):
+        valores = dados.astype(object).where(dados.notna(), "").values.tolist()
+        return [list(dados.columns)] + valores
+    return [list(linha) for linha in dados]
+
+
+# ==============================================================================
+# PLANILHA
+# ==============================================================================
+class PlanilhaEmulada:
+    """
+    Spreadsheet do gspread emulado em memória.
+
+    Os parâmetros de injeção (latencia_s, jitter_s, prob_429, cota_por_minuto,
+    retry_after_s, limitar) são atributos públicos e podem ser trocados a
+    qualquer momento (ex.: carregar sem latência e medir só as gravações).
+    """
+
+    def __init__(
+        self,
+        abas: Optional[Dict[str, Union[pd.DataFrame, Sequence[Sequence[Any]]]]] = None,
+        latencia_s: float = 0.0,
+        jitter_s: float = 0.0,
+        prob_429: float = 0.0,
+        cota_por_minuto: Optional[int] = None,
+        retry_after_s: Optional[float] = None,
+        limitar: bool = False,
+        seed: Optional[int] = None,
+        titulo: str = "GestorObras_DB",
+    ):
+        """
+        Args:
+            abas: {nome: DataFrame ou lista de linhas (com cabeçalho)}
+            latencia_s: Latência fixa de cada requisição
+            jitter_s: Latência extra aleatória (uniforme entre 0 e jitter_s)
+            prob_429: Probabilidade de cada requisição falhar com 429
+            cota_por_minuto: Requisições aceitas por janela de 60 s (None = sem cota)
+            retry_after_s: Valor do cabeçalho Retry-After nas falhas (None = ausente)
+            limitar: Passa cada requisição pelo limite_api (balde e contabilidade)
+            seed: Semente do jitter e dos 429 aleatórios
+            titulo: Título da planilha
+        """
+        self.title = titulo
+        self.id = f"emulador-{next(_planilhas)}"  # Único por instância, como o id de uma planilha real
+        self.latencia_s = latencia_s
+        self.jitter_s = jitter_s
+        self.prob_429 = prob_429
+        self.cota_por_minuto = cota_por_minuto
+        self.retry_after_s = retry_after_s
+        self.limitar = limitar
+        self.chamadas: List[ChamadaEmulada] = []
+
+        self._lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._falhas: deque = deque()
+        self._janela: deque = deque()
+        self._abas: Dict[str, AbaEmulada] = {}
+        for nome, dados in (abas or {}).items():
+            self._criar_aba(nome, _linhas_de(dados))
+
+    # --- Injeção e registro -------------------------------------------------
+    def falhar(self, n: int = 1, status: int = 429) -> None:
+        """Faz as próximas n requisições falharem com o status informado."""
+        with self._lock:
+            self._falhas.extend([status] * n)
+
+    def contagem(self, desde: int = 0) -> Dict[str, int]:
+        """
+        Requisições por método.
+
+        Args:
+            desde: Índice em `chamadas` a partir do qual contar (len(chamadas) antes do cenário)
+        """
+        with self._lock:
+            return dict(Counter(c.metodo for c in self.chamadas[desde:]))
+
+    def zerar_chamadas(self) -> None:
+        with self._lock:
+            self.chamadas.clear()
+            self._janela.clear()
+
+    def _status_injetado(self) -> int:
+        with self._lock:
+            if self._falhas:
+                return self._falhas.popleft()
+            if self.cota_por_minuto:
+                agora = time.monotonic()
+                while self._janela and agora - self._janela[0] >= EMULADOR_JANELA_COTA_S:
+                    self._janela.popleft()
+                if len(self._janela) >= self.cota_por_minuto:
+                    return 429
+                self._janela.append(agora)
+            if self.prob_429 and self._rng.random() < self.prob_429:
+                return 429
+        return 200
+
+    def _chamar(self, metodo: str, tipo: str, aba: str, faixa: str, executar: Callable[[], Any]) -> Any:
+        """Uma requisição: latência, falha injetada, registro e execução atômica."""
+        if self.limitar:
+            return limite_api.chamada_limitada(tipo, lambda: self._executar(metodo, tipo, aba, faixa, executar))
+        return self._executar(metodo, tipo, aba, faixa, executar)
+
+    def _executar(self, metodo: str, tipo: str, aba: str, faixa: str, executar: Callable[[], Any]) -> Any:
+        chamada = ChamadaEmulada(metodo, tipo, aba, faixa)
+        t0 = time.perf_counter()
+        try:
+            atraso = self.latencia_s + (self._rng.uniform(0, self.jitter_s) if self.jitter_s else 0.0)
+            if atraso > 0:
+                time.sleep(atraso)
+            status = self._status_injetado()
+            if status != 200:
+                chamada.status = status
+                logger.debug(f"Emulador: {metodo} em '{aba}' falhou com {status} (injetado)")
+                raise erro_api(status, self.retry_after_s)
+            with self._lock:
+                return executar()
+        finally:
+            chamada.duracao_s = time.perf_counter() - t0
+            with self._lock:
+                self.chamadas.append(chamada)
+
+    # --- Abas -----------------------------------------------------------------
+    def _criar_aba(self, titulo: str, linhas: List[List[Any]]) -> "AbaEmulada":
+        aba = AbaEmulada(self, titulo, len(self._abas), linhas)
+        self._abas[titulo] = aba
+        return aba
+
+    def _aba(self, titulo: Optional[str]) -> "AbaEmulada":
+        if titulo is None:
+            return next(iter(self._abas.values()))
+        if titulo not in self._abas:
+            raise WorksheetNotFound(titulo)
+        return self._abas[titulo]
+
+    def worksheet(self, title: str) -> "AbaEmulada":
+        return self._chamar("worksheet", "get", title, "", lambda: self._aba(title))
+
+    def worksheets(self) -> List["AbaEmulada"]:
+        return self._chamar("worksheets", "get", "", "", lambda: list(self._abas.values()))
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, index: Optional[int] = None) -> "AbaEmulada":
+        return self._chamar("add_worksheet", "batchUpdate", title, "", lambda: self._criar_aba(title, []))
+
+    # --- Valores da planilha ----------------------------------------------------
+    def _aba_e_faixa(self, faixa: str) -> Tuple["AbaEmulada", str]:
+        """Faixa no escopo da planilha: "'Aba'!A1:B2" ou só o nome da aba."""
+        nome, resto = _separar_aba(faixa)
+        if nome is None:
+            nome, resto = (faixa.strip("'"), "") if faixa.strip("'") in self._abas else (None, faixa)
+        return self._aba(nome), resto
+
+    def values_batch_get(self, ranges: List[str], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        formatado, serial = _modo_leitura((params or {}).get("valueRenderOption"), (params or {}).get("dateTimeRenderOption"))
+
+        def executar():
+            faixas = []
+            for faixa in ranges:
+                aba, resto = self._aba_e_faixa(faixa)
+                valores = aba._ler(resto, formatado, serial)
+                item = {"range": f"'{aba.title}'!{resto}" if resto else f"'{aba.title}'", "majorDimension": "ROWS"}
+                if valores:
+                    item["values"] = valores
+                faixas.append(item)
+            return {"spreadsheetId": self.id, "valueRanges": faixas}
+
+        return self._chamar("values_batch_get", "values:batchGet", "", ",".join(ranges), executar)
+
+    def values_append(self, range: str, params: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+        usuario = params.get("valueInputOption", "RAW") == "USER_ENTERED"
+        aba, _ = self._aba_e_faixa(range)
+        return self._chamar(
+            "values_append", "values:append", aba.title, range, lambda: aba._anexar(body.get("values", []), usuario)
+        )
+
+    def values_batch_update(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        usuario = body.get("valueInputOption", "RAW") == "USER_ENTERED"
+
+        def executar():
+            celulas = 0
+            for item in body.get("data", []):
+                aba, resto = self._aba_e_faixa(item["range"])
+                celulas += aba._gravar(resto, item["values"], usuario)
+            return {"spreadsheetId": self.id, "totalUpdatedCells": celulas}
+
+        return self._chamar("values_batch_update", "values:batchUpdate", "", "", executar)
+
+    def batch_update(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Suporta deleteDimension, insertDimension, appendDimension e updateCells."""
+        def executar():
+            for req in body.get("requests", []):
+                tipo, args = next(iter(req.items()))
+                if tipo in ("deleteDimension", "insertDimension"):
+                    faixa = args["range"]
+                    aba = self._aba_por_id(faixa["sheetId"])
+                    ini, fim = faixa["startIndex"], faixa["endIndex"]
+                    if tipo == "deleteDimension":
+                        aba._excluir(faixa["dimension"], ini, fim)
+                    else:
+                        aba._inserir(faixa["dimension"], ini, fim)
+                elif tipo == "appendDimension":
+                    self._aba_por_id(args["sheetId"])  # A grade cresce sob demanda ao gravar
+                elif tipo == "updateCells":
+                    inicio = args["start"]
+                    aba = self._aba_por_id(inicio["sheetId"])
+                    valores = [
+                        [next(iter(c.get("userEnteredValue", {"stringValue": ""}).values())) for c in linha.get("values", [])]
+                        for linha in args.get("rows", [])
+                    ]
+                    aba._gravar(f"{_letra(inicio.get('columnIndex', 0) + 1)}{inicio.get('rowIndex', 0) + 1}", valores)
+                else:
+                    raise NotImplementedError(f"Requisição não suportada pelo emulador: {tipo}")
+            return {"spreadsheetId": self.id, "replies": [{} for _ in body.get("requests", [])]}
+
+        return self._chamar("batch_update", "batchUpdate", "", "", executar)
+
+    def _aba_por_id(self, sheet_id: int) -> "AbaEmulada":
+        return next(a for a in self._abas.values() if a.id == sheet_id)
+
+
+# ==============================================================================
+# ABA
+# ==============================================================================
+class AbaEmulada:
+    """Worksheet do gspread emulado (os dados vivem na PlanilhaEmulada)."""
+
+    def __init__(self, planilha: PlanilhaEmulada, titulo: str, sheet_id: int, linhas: List[List[Any]]):
+        self.spreadsheet = planilha
+        self.spreadsheet_id = planilha.id
+        self.title = titulo
+        self.id = sheet_id
+        self._linhas = linhas
+
+    def __repr__(self) -> str:
+        return f"<AbaEmulada {self.title!r} id:{self.id}>"
+
+    @property
+    def row_count(self) -> int:
+        return len(self._linhas)
+
+    @property
+    def col_count(self) -> int:
+        return max((len(r) for r in self._linhas), default=0)
+
+    def _chamar(self, metodo: str, tipo: str, faixa: str, executar: Callable[[], Any]) -> Any:
+        return self.spreadsheet._chamar(metodo, tipo, self.title, faixa, executar)
+
+    # --- Acesso às células (sempre sob o lock da planilha) ------------------------
+    def _ler(self, faixa: str, formatado: bool = True, serial: bool = True) -> List[List[Any]]:
+        """Valores da faixa como a API devolve (sem células e linhas vazias no fim)."""
+        r0, r1, c0, c1 = _grade(_separar_aba(faixa)[1])
+        saida = []
+        for linha in self._linhas[r0:r1]:
+            valores = [_formatar(v) if formatado else _cru(v, serial) for v in linha[c0:c1]]
+            while valores and valores[-1] == "":
+                valores.pop()
+            saida.append(valores)
+        while saida and not saida[-1]:
+            saida.pop()
+        return saida
+
+    def _gravar(self, faixa: str, valores: Sequence[Sequence[Any]], usuario: bool = False) -> int:
+        """Grava a matriz a partir do canto superior esquerdo da faixa; retorna as células gravadas."""
+        r0, _, c0, _ = _grade(_separar_aba(faixa)[1])
+        celulas = 0
+        for i, linha in enumerate(valores):
+            while len(self._linhas) <= r0 + i:
+                self._linhas.append([])
+            destino = self._linhas[r0 + i]
+            if len(destino) < c0 + len(linha):
+                destino.extend([""] * (c0 + len(linha) - len(destino)))
+            for j, v in enumerate(linha):
+                destino[c0 + j] = _entrada_usuario(v) if usuario else v
+                celulas += 1
+        return celulas
+
+    def _anexar(self, values: Sequence[Sequence[Any]], usuario: bool) -> Dict[str, Any]:
+        """Grava após a última linha preenchida e responde como o values:append."""
+        inicio = self._ultima_linha() + 1
+        del self._linhas[inicio - 1:]
+        celulas = self._gravar(f"A{inicio}", values, usuario)
+        largura = max((len(v) for v in values), default=1)
+        fim = inicio + len(values) - 1
+        faixa = f"'{self.title}'!A{inicio}:{_letra(largura)}{fim}"
+        return {
+            "spreadsheetId": self.spreadsheet_id,
+            "tableRange": f"'{self.title}'!A1:{_letra(max(largura, self.col_count))}{inicio - 1}",
+            "updates": {"updatedRange": faixa, "updatedRows": len(values), "updatedCells": celulas},
+        }
+
+    def _ultima_linha(self) -> int:
+        """Última linha (1-based) com algum conteúdo."""
+        n = len(self._linhas)
+        while n and not any(v not in ("", None) for v in self._linhas[n - 1]):
+            n -= 1
+        return n
+
+    def _excluir(self, dimensao: str, ini: int, fim: int) -> None:
+        if dimensao == "ROWS":
+            del self._linhas[ini:fim]
+        else:
+            for linha in self._linhas:
+                del linha[ini:fim]
+
+    def _inserir(self, dimensao: str, ini: int, fim: int) -> None:
+        if dimensao == "ROWS":
+            self._linhas[ini:ini] = [[] for _ in range(fim - ini)]
+        else:
+            for linha in self._linhas:
+                if len(linha) > ini:
+                    linha[ini:ini] = [""] * (fim - ini)
+
+    def _todas(self, formatado: bool = True, serial: bool = True) -> List[List[Any]]:
+        """Aba inteira retangular (como get_all_values)."""
+        valores = self._ler("", formatado, serial)
+        largura = max((len(r) for r in valores), default=0)
+        return [r + [""] * (largura - len(r)) for r in valores]
+
+    # --- Leitura -----------------------------------------------------------------
+    def get_all_values(
+        self, value_render_option: Any = None, date_time_render_option: Any = None, **kwargs: Any
+    ) -> List[List[Any]]:
+        modo = _modo_leitura(value_render_option, date_time_render_option)
+        return self._chamar("get_all_values", "values.get", "", lambda: self._todas(*modo))
+
+    def get_values(
+        self, range_name: Optional[str] = None, value_render_option: Any = None,
+        date_time_render_option: Any = None, **kwargs: Any
+    ) -> List[List[Any]]:
+        if range_name is None:
+            return self.get_all_values(value_render_option, date_time_render_option)
+        modo = _modo_leitura(value_render_option, date_time_render_option)
+        return self._chamar("get_values", "values.get", range_name, lambda: self._ler(range_name, *modo))
+
+    def get_all_records(
+        self,
+        head: int = 1,
+        default_blank: Any = "",
+        numericise_ignore: Sequence[Union[str, int]] = (),
+        empty2zero: bool = False,
+        **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        def executar():
+            todas = self._todas()
+            if len(todas) < head:
+                return []
+            cabecalho = todas[head - 1]
+            ignorar = list(range(1, len(cabecalho) + 1)) if "all" in numericise_ignore else list(numericise_ignore)
+            return [
+                dict(zip(cabecalho, numericise_all(r, empty2zero=empty2zero, default_blank=default_blank, ignore=ignorar)))
+                for r in todas[head:]
+            ]
+
+        return self._chamar("get_all_records", "values.get", "", executar)
+
+    def row_values(self, row: int, **kwargs: Any) -> List[str]:
+        def executar():
+            valores = self._ler(f"{row}:{row}")
+            return valores[0] if valores else []
+
+        return self._chamar("row_values", "values.get", f"{row}:{row}", executar)
+
+    def col_values(self, col: int, **kwargs: Any) -> List[str]:
+        def executar():
+            coluna = [_formatar(r[col - 1]) if len(r) >= col else "" for r in self._linhas]
+            while coluna and coluna[-1] == "":
+                coluna.pop()
+            return coluna
+
+        return self._chamar("col_values", "values.get", f"C{col}", executar)
+
+    def batch_get(
+        self, ranges: List[str], value_render_option: Any = None, date_time_render_option: Any = None, **kwargs: Any
+    ) -> List[ValueRange]:
+        formatado, serial = _modo_leitura(value_render_option, date_time_render_option)
+
+        def executar():
+            return [
+                ValueRange.from_json({
+                    "range": f"'{self.title}'!{faixa}", "majorDimension": "ROWS", "values": self._ler(faixa, formatado, serial),
+                })
+                for faixa in ranges
+            ]
+
+        return self._chamar("batch_get", "values:batchGet", ",".join(ranges), executar)
+
+    def _procurar(self, query: Union[str, re.Pattern], in_row: Optional[int], in_column: Optional[int], case_sensitive: bool) -> List[Cell]:
+        achadas = []
+        for i, linha in enumerate(self._todas(), start=1):
+            if in_row is not None and i != in_row:
+                continue
+            for j, valor in enumerate(linha, start=1):
+                if in_column is not None and j != in_column:
+                    continue
+                if isinstance(query, re.Pattern):
+                    ok = query.search(valor) is not None
+                elif case_sensitive:
+                    ok = valor == query
+                else:
+                    ok = valor.casefold() == query.casefold()
+                if ok:
+                    achadas.append(Cell(i, j, valor))
+        return achadas
+
+    def find(self, query: Union[str, re.Pattern], in_row: Optional[int] = None, in_column: Optional[int] = None, case_sensitive: bool = True) -> Optional[Cell]:
+        achadas = self._chamar("find", "values.get", "", lambda: self._procurar(query, in_row, in_column, case_sensitive))
+        return achadas[0] if achadas else None
+
+    def findall(self, query: Union[str, re.Pattern], in_row: Optional[int] = None, in_column: Optional[int] = None, case_sensitive: bool = True) -> List[Cell]:
+        return self._chamar("findall", "values.get", "", lambda: self._procurar(query, in_row, in_column, case_sensitive))
+
+    # --- Escrita -----------------------------------------------------------------
+    def append_rows(self, values: Sequence[Sequence[Any]], value_input_option: Any = "RAW", **kwargs: Any) -> Dict[str, Any]:
+        usuario = str(getattr(value_input_option, "value", value_input_option)) == "USER_ENTERED"
+        return self._chamar("append_rows", "values:append", "", lambda: self._anexar(values, usuario))
+
+    def append_row(self, values: Sequence[Any], value_input_option: Any = "RAW", **kwargs: Any) -> Dict[str, Any]:
+        return self.append_rows([values], value_input_option=value_input_option)
+
+    def update(
+        self,
+        values: Any = None,
+        range_name: Optional[str] = None,
+        raw: bool = True,
+        value_input_option: Any = None,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        if isinstance(values, str) and isinstance(range_name, (list, tuple)):
+            values, range_name = range_name, values  # Ordem antiga dos argumentos (como o gspread aceita)
+        if not isinstance(values, (list, tuple)) or (values and not isinstance(values[0], (list, tuple))):
+            values = [[values]] if not isinstance(values, (list, tuple)) else [list(values)]
+        faixa = range_name or "A1"
+        opcao = getattr(value_input_option, "value", value_input_option)
+        usuario = opcao == "USER_ENTERED" if opcao else not raw
+
+        def executar():
+            celulas = self._gravar(faixa, values, usuario)
+            return {"spreadsheetId": self.spreadsheet_id, "updatedRange": f"'{self.title}'!{faixa}", "updatedCells": celulas}
+
+        return self._chamar("update", "values.put", faixa, executar)
+
+    def update_cell(self, row: int, col: int, value: Any) -> Dict[str, Any]:
+        faixa = f"{_letra(col)}{row}"
+        return self._chamar("update_cell", "values.put", faixa, lambda: {"updatedCells": self._gravar(faixa, [[value]], True)})
+
+    def update_cells(self, cell_list: List[Cell], value_input_option: Any = "RAW") -> Dict[str, Any]:
+        usuario = str(getattr(value_input_option, "value", value_input_option)) == "USER_ENTERED"
+
+        def executar():
+            for c in cell_list:
+                self._gravar(f"{_letra(c.col)}{c.row}", [[c.value]], usuario)
+            return {"updatedCells": len(cell_list)}
+
+        return self._chamar("update_cells", "values.put", "", executar)
+
+    def batch_update(self, data: List[Dict[str, Any]], raw: bool = True, value_input_option: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        opcao = getattr(value_input_option, "value", value_input_option)
+        usuario = opcao == "USER_ENTERED" if opcao else not raw
+
+        def executar():
+            celulas = sum(self._gravar(item["range"], item["values"], usuario) for item in data)
+            return {"spreadsheetId": self.spreadsheet_id, "totalUpdatedCells": celulas}
+
+        return self._chamar("batch_update", "values:batchUpdate", "", executar)
+
+    def insert_cols(self, values: Sequence[Sequence[Any]], col: int = 1, value_input_option: Any = "RAW", **kwargs: Any) -> Dict[str, Any]:
+        """Duas requisições, como no gspread: insertDimension e values:append das colunas."""
+        self._chamar("insert_cols", "batchUpdate", "", lambda: self._inserir("COLUMNS", col - 1, col - 1 + len(values)))
+        usuario = str(getattr(value_input_option, "value", value_input_option)) == "USER_ENTERED"
+        linhas = [list(t) for t in zip(*values)] if values else []
+        faixa = f"{_letra(col)}1"
+        return self._chamar("insert_cols", "values:append", faixa, lambda: {"updatedCells": self._gravar(faixa, linhas, usuario)})
+
+    def delete_rows(self, start_index: int, end_index: Optional[int] = None) -> Dict[str, Any]:
+        fim = end_index if end_index is not None else start_index
+        return self._chamar(
+            "delete_rows", "batchUpdate", f"{start_index}:{fim}",
+            lambda: self._excluir("ROWS", start_index - 1, fim) or {"replies": [{}]},
+        )
+
@@ -0,0 +1,146 @@
+"""
+Schema em memória das tabelas Obras e Financeiro.
+
+Aplicado uma única vez na carga (fetch_data_from_google): colunas de domínio
+pequeno viram categóricas já sem espaços nas pontas, IDs são reduzidos para
+int32 e Valor fica em float64. Filtros por obra/categoria passam a comparar
+códigos inteiros, sem `astype(str).str.strip()` a cada rerun.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from formatacao import parse_moeda_series
+from storage import FIN_COLS, OBRAS_COLS
+
+# Valores de domínio (Melhoria 4: centralizados; usados nos selects e nos benchmarks)
+STATUS_OBRA = ["Projeto", "Fundação", "Alvenaria", "Acabamento", "Concluída", "Vendida"]
+
+CATS = [
+    "Material",
+    "Mão de Obra",
+    "Serviços",
+    "Administrativo",
+    "Impostos",
+    "Emolumentos Cartorários",
+    "Outros"
+]
+
+PAGAMENTOS = [
+    "PIX",
+    "Cartão de Crédito",
+    "Cartão de Débito",
+    "Dinheiro",
+    "Transferência",
+    "Boleto",
+    "Cheque",
+    "Outro"
+]
+
+# Colunas de domínio pequeno guardadas como category (valores já "strip")
+FIN_CATEGORICAS = ["Tipo", "Categoria", "Forma Pagamento", "Obra Vinculada"]
+OBRAS_CATEGORICAS = ["Status"]
+
+# Texto livre: só normalizado (strip), mantido como string
+FIN_TEXTO = ["Fornecedor"]
+OBRAS_TEXTO = ["Cliente"]
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _categorica(serie: pd.Series) -> pd.Series:
+    """Converte para category com os valores sem espaços nas pontas (vazio/NaN -> "")."""
+    cat = serie.astype(object).where(serie.notna(), "").astype(str).astype("category")
+    # strip só nas categorias distintas, não em cada linha
+    limpas = cat.cat.categories.str.strip()
+    if limpas.is_unique:
+        return cat.cat.rename_categories(limpas)
+    return cat.astype(str).str.strip().astype("category")
+
+
+def _ids(serie: pd.Series) -> pd.Series:
+    """IDs como int32 (0 para ausente/inválido); int64 se algum não couber."""
+    ids = pd.to_numeric(serie, errors="coerce").fillna(0).astype(np.int64)
+    if ids.empty or (ids.min() >= _INT32.min and ids.max() <= _INT32.max):
+        return ids.astype(np.int32)
+    return ids
+
+
+def _data_iso(serie: pd.Series) -> np.ndarray:
+    """Datas (datetime64) como texto "AAAA-MM-DD", o formato gravado pelo app (NaT -> "")."""
+    texto = np.datetime_as_string(serie.to_numpy(dtype="datetime64[ns]"), unit="D").astype(object)
+    texto[serie.isna().to_numpy()] = ""
+    return texto
+
+
+def _completar(df: pd.DataFrame, colunas: List[str]) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=colunas)
+    faltando = [c for c in colunas if c not in df.columns]
+    return df.assign(**{c: None for c in faltando}) if faltando else df
+
+
+def normalizar_financeiro(df_f: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica o schema do Financeiro a um DataFrame bruto do repositório.
+
+    Args:
+        df_f: Registros brutos (equivalentes a get_all_records(); na leitura
+            tipada do Sheets, Data já vem como datetime64)
+
+    Returns:
+        DataFrame com todas as FIN_COLS, Valor float64, ID int32, Data_DT e
+        as colunas de FIN_CATEGORICAS como category
+    """
+    df_f = _completar(df_f, FIN_COLS)
+    if pd.api.types.is_datetime64_any_dtype(df_f["Data"]):
+        data_dt, data = df_f["Data"], _data_iso(df_f["Data"])  # Sem parse de texto
+    else:
+        data_dt, data = pd.to_datetime(df_f["Data"], errors="coerce"), df_f["Data"]
+    df_f = df_f.assign(
+        ID=_ids(df_f["ID"]),
+        Valor=parse_moeda_series(df_f["Valor"]),
+        Data=data,
+        Data_DT=data_dt,
+    )
+    for col in FIN_CATEGORICAS:
+        df_f[col] = _categorica(df_f[col])
+    for col in FIN_TEXTO:
+        df_f[col] = df_f[col].astype(str).str.strip()
+    return df_f
+
+
+def normalizar_obras(df_o: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica o schema de Obras a um DataFrame bruto do repositório.
+
+    Args:
+        df_o: Registros brutos (equivalentes a get_all_records())
+
+    Returns:
+        DataFrame com todas as OBRAS_COLS, valores em float64 e Status category
+    """
+    df_o = _completar(df_o, OBRAS_COLS)
+    if pd.api.types.is_datetime64_any_dtype(df_o["Data Início"]):
+        df_o = df_o.assign(**{"Data Início": _data_iso(df_o["Data Início"])})
+    df_o = df_o.assign(**{
+        "Valor Total": parse_moeda_series(df_o["Valor Total"]),
+        "Custo Previsto": parse_moeda_series(df_o["Custo Previsto"]),
+    })
+    for col in OBRAS_CATEGORICAS:
+        df_o[col] = _categorica(df_o[col])
+    for col in OBRAS_TEXTO:
+        df_o[col] = df_o[col].astype(str).str.strip()
+    return df_o
+
+
+def para_edicao(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas categóricas de volta para texto (object).
+
+    O st.data_editor só aceita, numa coluna category, valores que já são
+    categorias; a tabela editável precisa aceitar qualquer opção do select.
+    """
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return df.astype({c: object for c in cats}) if cats else df
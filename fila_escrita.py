@@ -0,0 +1,431 @@
+"""
+Fila de gravação (write-behind) com diário local em SQLite.
+
+Os formulários e os botões SALVAR só registram a operação no diário e voltam
+na hora; uma thread do processo envia as operações ao repositório em ordem
+(FIFO), agrupando as consecutivas do mesmo tipo numa única requisição.
+
+- Falha transitória (429, 5xx, timeout, conexão): a operação fica no diário e
+  é reenviada com backoff exponencial com jitter (respeitando Retry-After);
+- Falha permanente: a operação é mantida com estado "erro" para nova tentativa
+  manual (reenfileirar_erros), nunca descartada;
+- Queda do processo no meio do envio: a operação continua no diário e é
+  reenviada; inclusões já gravadas são filtradas por ID (ids_existentes).
+"""
+import json
+import logging
+import random
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from limite_api import PRIORIDADE_LOTE, operacao
+from storage import Repositorio, _chave_id
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PARÂMETROS DA FILA
+# ==============================================================================
+FILA_BACKOFF_BASE_S = 1.0       # Espera da 1ª nova tentativa (dobra a cada falha)
+FILA_BACKOFF_MAX_S = 120.0      # Teto da espera entre tentativas
+FILA_LOTE_MAX = 200             # Operações agrupadas numa única requisição
+FILA_RESERVA_S = 300.0          # Operação em envio fica reservada por este tempo (queda do processo)
+FILA_VERIFICAR_S = 5.0          # Fila vazia: verifica o diário (gravações de outros processos)
+
+# Operações aceitas -> aba de destino
+OP_LANCAMENTO = "lancamento"    # payload: valores da linha (FIN_COLS)
+OP_OBRA = "obra"                # payload: valores da linha (OBRAS_COLS)
+OP_FINANCEIRO = "financeiro"    # payload: {"atualizacoes": [[id, registro]], "exclusoes": [id]}
+OP_OBRAS = "obras"              # payload: {"atualizacoes": [[id, registro]], "renomes": {antigo: novo}}
+
+_ABA_INCLUSAO = {OP_LANCAMENTO: "Financeiro", OP_OBRA: "Obras"}
+_OPS = (OP_LANCAMENTO, OP_OBRA, OP_FINANCEIRO, OP_OBRAS)
+
+_STATUS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+
+def erro_transitorio(exc: BaseException) -> bool:
+    """
+    Indica se a falha tende a passar sozinha (vale tentar de novo).
+
+    Args:
+        exc: Exceção levantada pelo repositório
+
+    Returns:
+        True para cota excedida (429), erros 5xx, timeout, conexão e banco ocupado
+    """
+    resposta = getattr(exc, "response", None)
+    status = getattr(resposta, "status_code", None)
+    if status is not None:
+        return status in _STATUS_TRANSITORIOS
+    if isinstance(exc, sqlite3.OperationalError):
+        # Só banco ocupado passa sozinho; tabela/coluna ausente, E/S ou banco
+        # somente leitura são permanentes
+        mensagem = str(exc).lower()
+        return "database is locked" in mensagem or "database is busy" in mensagem
+    transitorios: Tuple[type, ...] = (ConnectionError, TimeoutError)
+    requests = sys.modules.get("requests")  # Só há erro do requests se o gspread já o importou
+    if requests is not None:
+        transitorios += (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    return isinstance(exc, transitorios)
+
+
+def _retry_after(exc: BaseException) -> float:
+    """Segundos pedidos pelo servidor no cabeçalho Retry-After (0 se ausente)."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("Retry-After", 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def espera_backoff(tentativas: int, minimo: float = 0.0) -> float:
+    """
+    Espera antes da próxima tentativa: backoff exponencial com "full jitter".
+
+    Args:
+        tentativas: Tentativas já feitas (1 na primeira falha)
+        minimo: Piso da espera (ex.: Retry-After do servidor)
+
+    Returns:
+        Segundos a aguardar
+    """
+    teto = min(FILA_BACKOFF_MAX_S, FILA_BACKOFF_BASE_S * 2 ** max(0, tentativas - 1))
+    return max(minimo, random.uniform(0, teto))
+
+
+def _json_padrao(valor: Any) -> Any:
+    """Serializa tipos numpy/pandas e datas no payload do diário."""
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()[:10]
+    if hasattr(valor, "item"):
+        return valor.item()
+    raise TypeError(f"Tipo não serializável na fila: {type(valor).__name__}")
+
+
+# ==============================================================================
+# AGRUPAMENTO DE OPERAÇÕES
+# ==============================================================================
+def _compor_renomes(atual: Dict[str, str], novos: Dict[str, str]) -> Dict[str, str]:
+    """Renomeações aplicadas em sequência (atual, depois novos) como um único mapa."""
+    composto = {antigo: novos.get(novo, novo) for antigo, novo in atual.items()}
+    for antigo, novo in novos.items():
+        composto.setdefault(antigo, novo)
+    return {a: n for a, n in composto.items() if a != n}
+
+
+def abas_alteradas(op: str, payload: Any) -> List[str]:
+    """
+    Abas que um payload agrupado altera (para recarregar só elas).
+
+    Args:
+        op: Tipo da operação
+        payload: Payload agrupado (agrupar)
+
+    Returns:
+        Nomes das abas
+    """
+    if op in _ABA_INCLUSAO:
+        return [_ABA_INCLUSAO[op]]
+    if op == OP_FINANCEIRO:
+        return ["Financeiro"]
+    return ["Obras", "Financeiro"] if payload.get("renomes") else ["Obras"]
+
+
+def agrupar(op: str, payloads: List[Any]) -> Any:
+    """
+    Junta operações consecutivas do mesmo tipo num único payload.
+
+    Inclusões viram uma lista de linhas; edições da mesma linha ficam com a
+    última versão; exclusões são unidas (e descartam edições do mesmo ID);
+    renomeações de obra são compostas na ordem em que foram feitas.
+
+    Args:
+        op: Tipo das operações (OP_*)
+        payloads: Payloads na ordem do diário
+
+    Returns:
+        Payload agrupado (lista de linhas para inclusões, dict para edições)
+    """
+    if op in _ABA_INCLUSAO:
+        return list(payloads)
+
+    atualizacoes: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+    if op == OP_FINANCEIRO:
+        exclusoes: Dict[str, Any] = {}
+        for p in payloads:
+            for idv, registro in p.get("atualizacoes", []):
+                if _chave_id(idv) not in exclusoes:
+                    atualizacoes[_chave_id(idv)] = (idv, registro)
+            for idv in p.get("exclusoes", []):
+                exclusoes[_chave_id(idv)] = idv
+                atualizacoes.pop(_chave_id(idv), None)
+        return {"atualizacoes": dict(atualizacoes.values()), "exclusoes": list(exclusoes.values())}
+
+    renomes: Dict[str, str] = {}
+    for p in payloads:
+        for idv, registro in p.get("atualizacoes", []):
+            atualizacoes[_chave_id(idv)] = (idv, registro)
+        renomes = _compor_renomes(renomes, p.get("renomes", {}))
+    return {"atualizacoes": dict(atualizacoes.values()), "renomes": renomes}
+
+
+# ==============================================================================
+# FILA
+# ==============================================================================
+class FilaEscrita:
+    """
+    Fila de gravação durável de um processo, com uma thread de envio.
+
+    O diário pode ser compartilhado por vários processos: cada lote é reservado
+    (FILA_RESERVA_S) antes do envio, então só um processo envia cada operação.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        repo: Repositorio,
+        ao_gravar: Optional[Callable[[List[str]], Any]] = None,
+        iniciar: bool = True,
+    ):
+        """
+        Args:
+            caminho: Arquivo SQLite do diário (criado se não existir)
+            repo: Repositório de destino
+            ao_gravar: Chamado com as abas alteradas após cada lote gravado (ex.: avançar a versão dos dados)
+            iniciar: Se True, inicia a thread de envio
+        """
+        self.caminho = caminho
+        self.repo = repo
+        self.ao_gravar = ao_gravar
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._isolar = False  # Após falha permanente de um lote, envia uma operação por vez
+        self.ultima_gravacao: Optional[float] = None
+        self.ultimo_erro: Optional[str] = None
+        self._criar_schema()
+        self._thread: Optional[threading.Thread] = None
+        if iniciar:
+            self.iniciar()
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+        try:
+            yield con
+        finally:
+            con.close()
+
+    def _criar_schema(self) -> None:
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS fila ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, payload TEXT NOT NULL, "
+                "criado_em REAL NOT NULL, tentativas INTEGER NOT NULL DEFAULT 0, "
+                "proxima_em REAL NOT NULL DEFAULT 0, estado TEXT NOT NULL DEFAULT 'pendente', erro TEXT)"
+            )
+
+    # --------------------------------------------------------------------------
+    # API pública
+    # --------------------------------------------------------------------------
+    def enfileirar(self, op: str, payload: Any) -> int:
+        """
+        Registra uma operação no diário (gravado em disco antes de retornar).
+
+        Args:
+            op: Tipo da operação (OP_LANCAMENTO, OP_OBRA, OP_FINANCEIRO, OP_OBRAS)
+            payload: Valores da linha ou dict de edições (ver OP_*)
+
+        Returns:
+            Número de sequência da operação (para concluida())
+        """
+        if op not in _OPS:
+            raise ValueError(f"Operação desconhecida: {op}")
+        if op in (OP_FINANCEIRO, OP_OBRAS):
+            # Chaves int viram str em JSON: as edições vão como pares [id, registro]
+            payload = dict(payload, atualizacoes=list(payload.get("atualizacoes", {}).items()))
+        texto = json.dumps(payload, default=_json_padrao, ensure_ascii=False)
+        with self._conectar() as con:
+            seq = con.execute(
+                "INSERT INTO fila (op, payload, criado_em) VALUES (?, ?, ?)", (op, texto, time.time())
+            ).lastrowid
+        self._acordar.set()
+        return seq
+
+    def concluida(self, seq: int) -> bool:
+        """True se a operação já foi gravada no repositório."""
+        with self._conectar() as con:
+            return con.execute("SELECT 1 FROM fila WHERE seq = ?", (seq,)).fetchone() is None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Resumo da fila para a interface.
+
+        Returns:
+            Dict com "pendentes", "erros", "proxima_em" (epoch da próxima
+            tentativa, None se nada aguardando), "ultima_gravacao" e "ultimo_erro"
+        """
+        with self._conectar() as con:
+            contagem = dict(con.execute("SELECT estado, COUNT(*) FROM fila GROUP BY estado").fetchall())
+            proxima = con.execute("SELECT MIN(proxima_em) FROM fila WHERE estado = 'pendente'").fetchone()[0]
+        return {
+            "pendentes": contagem.get("pendente", 0),
+            "erros": contagem.get("erro", 0),
+            "proxima_em": proxima,
+            "ultima_gravacao": self.ultima_gravacao,
+            "ultimo_erro": self.ultimo_erro,
+        }
+
+    def reenfileirar_erros(self) -> int:
+        """
+        Devolve à fila as operações paradas por falha permanente.
+
+        Returns:
+            Quantidade de operações reenfileiradas
+        """
+        with self._conectar() as con:
+            n = con.execute(
+                "UPDATE fila SET estado = 'pendente', proxima_em = 0, erro = NULL WHERE estado = 'erro'"
+            ).rowcount
+        if n:
+            self._acordar.set()
+        return n
+
+    def iniciar(self) -> None:
+        """Inicia a thread de envio (reenvia o que ficou no diário de execuções anteriores)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._laco, name="fila-escrita", daemon=True)
+            self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None) -> None:
+        """Encerra a thread de envio (o diário mantém o que não foi enviado)."""
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # --------------------------------------------------------------------------
+    # Envio
+    # --------------------------------------------------------------------------
+    def _laco(self) -> None:
+        while not self._parar.is_set():
+            try:
+                espera = self.processar()
+            except Exception as e:  # Diário inacessível: tenta de novo mais tarde
+                logger.error(f"Fila de gravação: falha no diário: {e}")
+                espera = FILA_BACKOFF_MAX_S
+            self._acordar.wait(FILA_VERIFICAR_S if espera is None else min(espera, FILA_VERIFICAR_S))
+            self._acordar.clear()
+
+    def _reservar(self) -> Tuple[List[Tuple[int, str, str, int]], Optional[float]]:
+        """
+        Reserva o próximo lote: operações consecutivas do mesmo tipo a partir da mais antiga.
+
+        Returns:
+            (lote, espera): lote vazio e segundos até a próxima tentativa quando
+            a operação mais antiga ainda está em backoff (None se a fila está vazia)
+        """
+        agora = time.time()
+        limite = 1 if self._isolar else FILA_LOTE_MAX
+        with self._conectar() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                linhas = con.execute(
+                    "SELECT seq, op, payload, tentativas, proxima_em FROM fila "
+                    "WHERE estado = 'pendente' ORDER BY seq LIMIT ?", (limite,)
+                ).fetchall()
+                if not linhas:
+                    return [], None
+                # FIFO: enquanto a mais antiga aguarda o backoff, nada passa à frente dela
+                if linhas[0][4] > agora:
+                    return [], linhas[0][4] - agora
+                lote = []
+                for seq, op, payload, tentativas, _ in linhas:
+                    if op != linhas[0][1]:
+                        break
+                    lote.append((seq, op, payload, tentativas + 1))
+                con.executemany(
+                    "UPDATE fila SET tentativas = tentativas + 1, proxima_em = ? WHERE seq = ?",
+                    [(agora + FILA_RESERVA_S, seq) for seq, *_ in lote],
+                )
+            finally:
+                con.execute("COMMIT")
+        return lote, 0.0
+
+    def processar(self) -> Optional[float]:
+        """
+        Envia um lote da fila (a thread chama em laço; útil também em testes).
+
+        Returns:
+            Segundos até haver algo a enviar (0 para continuar já; None se vazia)
+        """
+        lote, espera = self._reservar()
+        if not lote:
+            return espera
+
+        op = lote[0][1]
+        seqs = [seq for seq, *_ in lote]
+        tentativas = max(t for *_, t in lote)
+        try:
+            payload = agrupar(op, [json.loads(p) for _, _, p, _ in lote])
+            # Gravação em segundo plano: cede a cota do Sheets às leituras interativas
+            with operacao(prioridade=PRIORIDADE_LOTE):
+                self._enviar(op, payload, reenvio=tentativas > 1)
+        except Exception as e:
+            self.ultimo_erro = f"{type(e).__name__}: {e}"
+            if erro_transitorio(e):
+                espera = espera_backoff(tentativas, _retry_after(e))
+                logger.warning(f"Fila de gravação: {len(seqs)} operação(ões) adiadas {espera:.1f}s ({e})")
+                with self._conectar() as con:
+                    con.executemany(
+                        "UPDATE fila SET proxima_em = ?, erro = ? WHERE seq = ?",
+                        [(time.time() + espera, self.ultimo_erro, s) for s in seqs],
+                    )
+                return espera
+            if len(seqs) > 1:
+                # Descobre qual operação do lote falha, uma por vez
+                self._isolar = True
+                with self._conectar() as con:
+                    con.executemany("UPDATE fila SET proxima_em = 0 WHERE seq = ?", [(s,) for s in seqs])
+                return 0.0
+            logger.error(f"Fila de gravação: operação {seqs[0]} ({op}) parada por erro: {e}")
+            with self._conectar() as con:
+                con.execute("UPDATE fila SET estado = 'erro', erro = ? WHERE seq = ?", (self.ultimo_erro, seqs[0]))
+            return 0.0
+
+        self._isolar = False
+        # Versão avançada antes de a operação sair do diário: quem vê concluida()
+        # já encontra a versão nova (pedida ao snapshot) ao recarregar
+        if self.ao_gravar is not None:
+            self.ao_gravar(abas_alteradas(op, payload))
+        with self._conectar() as con:
+            con.executemany("DELETE FROM fila WHERE seq = ?", [(s,) for s in seqs])
+        self.ultima_gravacao = time.time()
+        self.ultimo_erro = None
+        return 0.0
+
+    def _enviar(self, op: str, payload: Any, reenvio: bool) -> None:
+        """Aplica um payload agrupado no repositório."""
+        if op in _ABA_INCLUSAO:
+            aba = _ABA_INCLUSAO[op]
+            if reenvio:
+                # Uma tentativa anterior pode ter gravado antes de falhar (ex.: timeout)
+                gravados = self.repo.ids_existentes(aba, [linha[0] for linha in payload])
+                payload = [linha for linha in payload if _chave_id(linha[0]) not in gravados]
+            if not payload:
+                return
+            if op == OP_LANCAMENTO:
+                self.repo.adicionar_lancamentos(payload)
+            else:
+                self.repo.adicionar_obras(payload)
+        elif op == OP_FINANCEIRO:
+            self.repo.salvar_financeiro(payload["atualizacoes"], payload["exclusoes"])
+        else:
+            self.repo.salvar_obras(payload["atualizacoes"], payload["renomes"])
@@ -0,0 +1,211 @@
+"""
+Formatação e conversão de valores monetários (R$) usadas pelo app e pelo PDF.
+"""
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+# Número decimal simples (após remover "R$", espaços e separador de milhar)
+_RE_NUMERO = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+def fmt_moeda(valor: Union[float, int, str, None], simbolo: str = "R$") -> str:
+    """
+    Formata valor numérico para moeda brasileira (R$) (Melhoria 5, 10).
+
+    Implementação robusta sem dependência de locale do sistema.
+    Suporta valores negativos e formata corretamente milhares e decimais.
+
+    Args:
+        valor: Valor a ser formatado
+        simbolo: Símbolo da moeda (padrão: "R$")
+
+    Returns:
+        String formatada como moeda brasileira
+
+    Examples:
+        >>> fmt_moeda(1234.56)
+        'R$ 1.234,56'
+        >>> fmt_moeda(-1000)
+        'R$ -1.000,00'
+        >>> fmt_moeda(None)
+        'R$ 0,00'
+    """
+    if pd.isna(valor) or valor == "" or valor is None:
+        return f"{simbolo} 0,00"
+
+    try:
+        val = float(valor)
+
+        # Trata valores negativos
+        negativo = val < 0
+        val = abs(val)
+
+        # Formata com separadores (arredonda em centavos para "vai um" correto: 0,999 -> 1,00)
+        parte_inteira, parte_decimal = divmod(int(round(val * 100)), 100)
+
+        # Adiciona pontos como separador de milhares
+        str_inteira = f"{parte_inteira:,}".replace(",", ".")
+
+        # Monta resultado
+        resultado = f"{simbolo} {'-' if negativo else ''}{str_inteira},{parte_decimal:02d}"
+        return resultado
+
+    except (ValueError, TypeError, AttributeError, OverflowError):  # Melhoria 3: Exceções específicas
+        return f"{simbolo} {valor}"
+
+
+def fmt_moeda_series(serie: pd.Series, simbolo: str = "R$") -> pd.Series:
+    """
+    Versão vetorizada de fmt_moeda para uma coluna inteira.
+
+    Os caracteres de cada célula são escritos por aritmética numpy num buffer
+    de largura fixa (dígitos, pontos de milhar, vírgula e centavos) que depois
+    é lido como array de strings, sem chamada Python por célula. Mesmas
+    regras de fmt_moeda: vazio/NaN vira "R$ 0,00", negativo vira "R$ -1,00";
+    textos que não são número (e inf) caem em fmt_moeda célula a célula.
+
+    Args:
+        serie: Coluna com valores numéricos (ou textos numéricos)
+        simbolo: Símbolo da moeda (padrão: "R$")
+
+    Returns:
+        Series de strings (dtype object) com o mesmo índice
+
+    Examples:
+        >>> fmt_moeda_series(pd.Series([1234.56, -1000, None])).tolist()
+        ['R$ 1.234,56', 'R$ -1.000,00', 'R$ 0,00']
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        valores = serie.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+    n = len(valores)
+    finito = np.isfinite(valores)
+    centavos = np.zeros(n, dtype=np.int64)
+    centavos[finito] = np.round(np.abs(valores[finito]) * 100)
+    inteiro = centavos // 100
+    negativo = finito & (valores < 0)
+
+    # Quantidade de dígitos da parte inteira e largura com os pontos de milhar
+    digitos = np.ones(n, dtype=np.int64)
+    for limite in 10 ** np.arange(1, len(str(int(inteiro.max(initial=0)))), dtype=np.int64):
+        digitos += inteiro >= limite
+    largura_int = digitos + (digitos - 1) // 3
+
+    # Buffer UCS-4: cada linha vira uma string do dtype "U" (zeros finais são descartados)
+    prefixo = np.array([ord(c) for c in f"{simbolo} "], dtype=np.uint32)
+    largura = len(prefixo) + 1 + int(largura_int.max(initial=1)) + 3
+    buf = np.zeros((n, largura), dtype=np.uint32)
+    linhas = np.arange(n)
+    buf[:, :len(prefixo)] = prefixo
+    buf[negativo, len(prefixo)] = ord("-")
+
+    virgula = len(prefixo) + negativo + largura_int
+    resto = inteiro.copy()
+    for k in range(int(digitos.max(initial=1))):
+        ativo = k < digitos
+        pos = virgula[ativo] - 1 - k - k // 3
+        buf[linhas[ativo], pos] = ord("0") + resto[ativo] % 10
+        if k and k % 3 == 0:
+            buf[linhas[ativo], pos + 1] = ord(".")
+        resto //= 10
+    buf[linhas, virgula] = ord(",")
+    buf[linhas, virgula + 1] = ord("0") + (centavos % 100) // 10
+    buf[linhas, virgula + 2] = ord("0") + centavos % 10
+
+    resultado = pd.Series(buf.view(f"U{largura}").ravel().astype(object), index=serie.index)
+
+    # Texto não numérico e inf/-inf: mesma saída de fmt_moeda
+    if not finito.all():
+        vazio = serie.isna().to_numpy() | (serie.astype(str) == "").to_numpy()
+        pendentes = np.flatnonzero(~finito & ~vazio)
+        if len(pendentes):
+            resultado.iloc[pendentes] = [fmt_moeda(v, simbolo) for v in serie.iloc[pendentes]]
+    return resultado
+
+
+def safe_float(x: Union[int, float, str, None]) -> float:
+    """
+    Converte valor para float de forma segura (Melhoria 5).
+
+    Args:
+        x: Valor a ser convertido
+
+    Returns:
+        Valor como float, ou 0.0 se conversão falhar
+    """
+    if isinstance(x, (int, float)):
+        return float(x)
+    if x is None:
+        return 0.0
+    s = str(x).strip().replace("R$", "").replace(" ", "").replace(".", "").replace(",", ".")
+    try:
+        return float(s)
+    except (ValueError, TypeError, AttributeError):  # Melhoria 3: Exceções específicas
+        return 0.0
+
+
+def parse_moeda_series(serie: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de safe_float para uma coluna inteira.
+
+    Aceita os mesmos formatos ("R$ 1.234,56", números, vazios e lixo) usando
+    operações de string do pandas e máscaras numpy; só as células que a via vetorizada não
+    resolve (ex.: "1_000", None, NaN) passam por safe_float. Para os tipos que
+    vêm da planilha (texto, int, float) o resultado é idêntico ao de
+    serie.apply(safe_float).
+
+    Args:
+        serie: Coluna com valores brutos da planilha
+
+    Returns:
+        Series float64 com o mesmo índice
+
+    Examples:
+        >>> parse_moeda_series(pd.Series(["R$ 1.234,56", 10, "", "abc"])).tolist()
+        [1234.56, 10.0, 0.0, 0.0]
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+
+    bruto = serie.to_numpy(dtype=object)
+    tipo = pd.api.types.infer_dtype(bruto, skipna=False)
+    if tipo in ("integer", "floating", "mixed-integer-float", "boolean"):
+        return pd.Series(bruto.astype(float), index=serie.index)
+
+    if tipo == "string":
+        eh_texto = np.ones(len(bruto), dtype=bool)
+    else:
+        eh_texto = np.fromiter((type(x) is str for x in bruto), dtype=bool, count=len(bruto))
+
+    resultado = np.full(len(bruto), np.nan)
+    vazio = np.zeros(len(bruto), dtype=bool)
+
+    if not eh_texto.all():
+        outros = pd.Series(bruto[~eh_texto], dtype=object)
+        resultado[~eh_texto] = pd.to_numeric(outros, errors="coerce").to_numpy(dtype=float)
+
+    if eh_texto.any():
+        limpo = (
+            pd.Series(bruto[eh_texto], dtype="str")
+            .str.strip()
+            .str.replace("R$", "", regex=False)
+            .str.replace(" ", "", regex=False)
+            .str.replace(".", "", regex=False)
+            .str.replace(",", ".", regex=False)
+        )
+        valido = limpo.str.fullmatch(_RE_NUMERO).to_numpy(dtype=bool)
+        valores = np.full(len(limpo), np.nan)
+        valores[valido] = limpo.to_numpy(dtype=object)[valido].astype(float)
+        resultado[eh_texto] = valores
+        vazio[eh_texto] = (limpo == "").to_numpy(dtype=bool)
+        resultado[vazio] = 0.0
+
+    # Lixo, None/NaN e formatos que só float() entende: mesma regra de safe_float
+    pendentes = np.flatnonzero(np.isnan(resultado) & ~vazio)
+    if len(pendentes):
+        resultado[pendentes] = [safe_float(x) for x in bruto[pendentes]]
+    return pd.Series(resultado, index=serie.index)
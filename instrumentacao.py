@@ -0,0 +1,278 @@
+"""
+Instrumentação por rerun: tempo e memória por etapa, acertos de cache e uso da API.
+
+Barata o bastante para ficar ligada em produção: cada etapa custa dois
+perf_counter() e duas leituras de /proc/self/statm (RSS), sem tracemalloc.
+Cada rerun vira uma linha JSON no arquivo de log e alimenta os agregados do
+processo exibidos no painel de administração (resumo()).
+
+Uso no script:
+    iniciar_rerun(st.session_state)      # topo do script
+    definir_pagina(sel)                  # após o menu
+    with etapa("grafico_area"): ...      # ou @etapa("carga_dados")
+    registrar_cache("pdf", acerto=True)
+    finalizar_rerun(st.session_state)    # fim do script
+
+Um rerun interrompido (st.stop/st.rerun) é fechado no início do seguinte,
+com o tempo medido até a última etapa concluída.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, MutableMapping, Optional
+
+import limite_api
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PARÂMETROS
+# ==============================================================================
+INSTR_RERUNS_RETIDOS = 100              # Reruns recentes mantidos para o painel
+INSTR_LOG_MAX_BYTES = 20 * 1024 * 1024  # Acima disto o log é rotacionado (.1)
+
+_CHAVE_SESSAO = "_instrumentacao"
+_BYTES_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb() -> float:
+    """Memória residente do processo em MB (pico, fora do Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _BYTES_PAGINA / 1048576
+    except (OSError, ValueError, IndexError):
+        if resource is not None:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return 0.0
+
+
+class RegistroRerun:
+    """Medições de um rerun de uma sessão."""
+
+    __slots__ = ("sessao", "pagina", "ts", "inicio", "fim", "rss_inicio", "etapas", "caches", "api", "finalizado")
+
+    def __init__(self, sessao: str, api: limite_api.ContagemRerun):
+        self.sessao = sessao
+        self.pagina = ""
+        self.ts = datetime.now().isoformat(timespec="seconds")
+        self.inicio = time.perf_counter()
+        self.fim = self.inicio
+        self.rss_inicio = rss_mb()
+        self.etapas: Dict[str, Dict[str, float]] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.api = api
+        self.finalizado = False
+
+    def linha(self, interrompido: bool) -> Dict[str, Any]:
+        """Linha JSON do rerun."""
+        rss = rss_mb()
+        return {
+            "ts": self.ts,
+            "sessao": self.sessao,
+            "pagina": self.pagina,
+            "total_ms": round((self.fim - self.inicio) * 1000, 2),
+            "rss_mb": round(rss, 1),
+            "delta_rss_mb": round(rss - self.rss_inicio, 2),
+            "etapas": self.etapas,
+            "caches": self.caches,
+            "api": {"chamadas": self.api.chamadas, "espera_ms": round(self.api.espera_s * 1000, 1)},
+            "interrompido": interrompido,
+        }
+
+
+class Metricas:
+    """Agregados do processo: estatísticas por etapa, caches e reruns recentes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_log = threading.Lock()
+        self.caminho_log: Optional[str] = None
+        self.zerar()
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.etapas: Dict[str, Dict[str, float]] = {}
+            self.caches: Dict[str, Dict[str, int]] = {}
+            self.reruns: deque = deque(maxlen=INSTR_RERUNS_RETIDOS)
+
+    def configurar(self, caminho_log: Optional[str]) -> None:
+        """
+        Args:
+            caminho_log: Arquivo JSONL dos reruns (None ou "" desliga o log)
+        """
+        self.caminho_log = caminho_log or None
+
+    def registrar_etapa(self, nome: str, ms: float) -> None:
+        with self._lock:
+            e = self.etapas.get(nome)
+            if e is None:
+                e = self.etapas[nome] = {"n": 0, "total_ms": 0.0, "max_ms": 0.0, "ultimo_ms": 0.0}
+            e["n"] += 1
+            e["total_ms"] += ms
+            e["max_ms"] = max(e["max_ms"], ms)
+            e["ultimo_ms"] = ms
+
+    def registrar_cache(self, nome: str, acerto: bool) -> None:
+        with self._lock:
+            c = self.caches.setdefault(nome, {"acertos": 0, "faltas": 0})
+            c["acertos" if acerto else "faltas"] += 1
+
+    def registrar_rerun(self, linha: Dict[str, Any]) -> None:
+        with self._lock:
+            self.reruns.append(linha)
+        if self.caminho_log:
+            self._gravar(linha)
+
+    def _gravar(self, linha: Dict[str, Any]) -> None:
+        texto = json.dumps(linha, ensure_ascii=False, default=str) + "\n"
+        try:
+            with self._lock_log:
+                with open(self.caminho_log, "a", encoding="utf-8") as f:
+                    f.write(texto)
+                    tamanho = f.tell()
+                if tamanho > INSTR_LOG_MAX_BYTES:
+                    os.replace(self.caminho_log, self.caminho_log + ".1")
+        except OSError as e:  # Métrica nunca derruba a página
+            logger.warning(f"Falha ao gravar métricas em {self.caminho_log}: {e}")
+
+    def resumo(self) -> Dict[str, Any]:
+        """
+        Fotografia dos agregados para o painel.
+
+        Returns:
+            Dict com "etapas" (nome -> n, media_ms, max_ms, ultimo_ms),
+            "caches" (nome -> acertos, faltas, taxa) e "reruns" (linhas recentes)
+        """
+        with self._lock:
+            etapas = {
+                nome: {"n": e["n"], "media_ms": e["total_ms"] / e["n"], "max_ms": e["max_ms"], "ultimo_ms": e["ultimo_ms"]}
+                for nome, e in self.etapas.items()
+            }
+            caches = {
+                nome: dict(c, taxa=c["acertos"] / max(1, c["acertos"] + c["faltas"]))
+                for nome, c in self.caches.items()
+            }
+            return {"etapas": etapas, "caches": caches, "reruns": list(self.reruns)}
+
+
+# Instância do processo
+metricas = Metricas()
+
+_atual: ContextVar[Optional[RegistroRerun]] = ContextVar("instrumentacao_rerun", default=None)
+_faltas_thread = threading.local()  # Faltas de cache registradas por esta thread (consulta_cache)
+
+
+def iniciar_rerun(sessao: MutableMapping[str, Any]) -> RegistroRerun:
+    """
+    Abre o registro do rerun (e a contagem de chamadas do limite_api).
+
+    Args:
+        sessao: st.session_state (guarda o registro; fecha o anterior se ficou aberto)
+    """
+    anterior = sessao.get(_CHAVE_SESSAO)
+    if anterior is not None and not anterior.finalizado:
+        _fechar(anterior, interrompido=True)
+    sessao_id = anterior.sessao if anterior is not None else uuid.uuid4().hex[:8]
+    registro = RegistroRerun(sessao_id, limite_api.iniciar_rerun())
+    sessao[_CHAVE_SESSAO] = registro
+    _atual.set(registro)
+    return registro
+
+
+def definir_pagina(pagina: str) -> None:
+    """Atribui o rerun corrente (e suas chamadas ao Sheets) à página."""
+    registro = _atual.get()
+    if registro is not None:
+        registro.pagina = pagina
+    limite_api.definir_pagina(pagina)
+
+
+def finalizar_rerun(sessao: MutableMapping[str, Any]) -> None:
+    """Fecha o registro do rerun corrente (fim do script)."""
+    registro = sessao.get(_CHAVE_SESSAO)
+    if registro is not None and not registro.finalizado:
+        registro.fim = time.perf_counter()
+        _fechar(registro, interrompido=False)
+
+
+def _fechar(registro: RegistroRerun, interrompido: bool) -> None:
+    registro.finalizado = True
+    linha = registro.linha(interrompido)
+    metricas.registrar_etapa("rerun_total", linha["total_ms"])
+    metricas.registrar_rerun(linha)
+
+
+def ultimo_rerun(sessao: MutableMapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """Linha do rerun anterior desta sessão (para o painel), se houver."""
+    sessao_id = getattr(sessao.get(_CHAVE_SESSAO), "sessao", None)
+    for linha in reversed(metricas.resumo()["reruns"]):
+        if linha["sessao"] == sessao_id:
+            return linha
+    return None
+
+
+@contextmanager
+def etapa(nome: str) -> Iterator[None]:
+    """
+    Mede tempo e variação de RSS do bloco (também serve como decorador).
+
+    Args:
+        nome: Nome da etapa no painel e no log
+    """
+    t0 = time.perf_counter()
+    m0 = rss_mb()
+    try:
+        yield
+    finally:
+        t1 = time.perf_counter()
+        ms = (t1 - t0) * 1000
+        metricas.registrar_etapa(nome, ms)
+        registro = _atual.get()
+        if registro is not None:
+            e = registro.etapas.setdefault(nome, {"ms": 0.0, "delta_mb": 0.0})
+            e["ms"] = round(e["ms"] + ms, 2)
+            e["delta_mb"] = round(e["delta_mb"] + rss_mb() - m0, 2)
+            registro.fim = max(registro.fim, t1)
+
+
+def registrar_cache(nome: str, acerto: bool) -> None:
+    """
+    Conta um acerto ou uma falta de cache.
+
+    Args:
+        nome: Cache ("snapshot", "agregados", "pdf"...)
+        acerto: True se o valor veio do cache
+    """
+    metricas.registrar_cache(nome, acerto)
+    if not acerto:
+        _faltas_thread.__dict__[nome] = _faltas_thread.__dict__.get(nome, 0) + 1
+    registro = _atual.get()
+    if registro is not None:
+        c = registro.caches.setdefault(nome, {"acertos": 0, "faltas": 0})
+        c["acertos" if acerto else "faltas"] += 1
+
+
+@contextmanager
+def consulta_cache(nome: str) -> Iterator[None]:
+    """
+    Consulta a um cache do Streamlit cuja função registra a própria falta.
+
+    O corpo da função cacheada chama registrar_cache(nome, acerto=False); se
+    nenhuma falta for registrada durante o bloco, conta-se um acerto.
+    """
+    antes = _faltas_thread.__dict__.get(nome, 0)
+    yield
+    if _faltas_thread.__dict__.get(nome, 0) == antes:
+        registrar_cache(nome, acerto=True)
@@ -0,0 +1,311 @@
+"""
+Limite de chamadas à API do Google Sheets e contabilidade de uso.
+
+Todas as requisições do gspread passam por `HTTPClientLimitado` (informado em
+gspread.authorize), que:
+
+- retira um token de um balde compartilhado pelo processo antes de cada
+  chamada. Leituras interativas têm prioridade: as gravações em lote (fila de
+  gravação) só usam o balde acima de uma reserva e cedem a vez a quem está
+  esperando com prioridade maior (até COTA_ESPERA_MAX_LOTE_S, para não
+  ficarem paradas com a cota sempre disputada);
+- esvazia o balde ao receber 429, desacelerando todas as sessões juntas;
+- contabiliza cada chamada por rerun, por página, por operação do
+  repositório e por tipo de endpoint (resumo()).
+
+A página e a operação correntes vêm de ContextVars: iniciar_rerun() no topo
+do script, definir_pagina() após o menu e operacao() nos métodos do
+repositório.
+
+O gspread só é importado quando HTTPClientLimitado é pedido (get_conn):
+o SQLite e as páginas que não tocam a planilha não pagam o import.
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PARÂMETROS DA COTA
+# ==============================================================================
+# Cota padrão do Sheets: 60 requisições/minuto por usuário (a conta de serviço
+# é um único usuário para todas as sessões)
+COTA_CHAMADAS_MINUTO = 60
+COTA_RAJADA = 20                # Chamadas seguidas permitidas com o balde cheio
+COTA_RESERVA_INTERATIVA = 5     # Tokens que as gravações em lote não podem consumir
+COTA_ESPERA_MAX_LOTE_S = 30.0   # Gravação em lote esperando mais que isto disputa como interativa
+COTA_ALERTA_RERUN = 30          # Rerun com mais chamadas que isto gera aviso no log
+CONTABILIDADE_RERUNS_RETIDOS = 200
+
+PRIORIDADE_INTERATIVA = 0       # Leituras e gravações que o usuário está aguardando
+PRIORIDADE_LOTE = 1             # Gravações em segundo plano (fila de gravação)
+
+SEM_PAGINA = "(segundo plano)"
+
+
+# ==============================================================================
+# BALDE DE TOKENS
+# ==============================================================================
+class BaldeTokens:
+    """Token bucket com prioridades, compartilhado por todas as threads do processo."""
+
+    def __init__(
+        self,
+        por_minuto: float = COTA_CHAMADAS_MINUTO,
+        rajada: int = COTA_RAJADA,
+        reserva: int = COTA_RESERVA_INTERATIVA,
+    ):
+        self._cond = threading.Condition()
+        self._esperando = [0, 0]  # Threads aguardando, por prioridade
+        self.configurar(por_minuto, rajada, reserva)
+        self._tokens = float(self.rajada)
+        self._ultimo = time.monotonic()
+
+    def configurar(self, por_minuto: float, rajada: int, reserva: int) -> None:
+        """
+        Ajusta a cota (ex.: a partir de st.secrets).
+
+        Args:
+            por_minuto: Chamadas por minuto repostas no balde
+            rajada: Capacidade do balde
+            reserva: Tokens reservados para chamadas interativas
+        """
+        with self._cond:
+            self.taxa = max(por_minuto, 1e-6) / 60.0
+            self.rajada = max(1, int(rajada))
+            self.reserva = max(0, min(int(reserva), self.rajada - 1))
+            self._cond.notify_all()
+
+    def _repor(self) -> None:
+        agora = time.monotonic()
+        self._tokens = min(self.rajada, self._tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def adquirir(self, prioridade: int = PRIORIDADE_INTERATIVA) -> float:
+        """
+        Retira um token, aguardando se preciso.
+
+        Args:
+            prioridade: PRIORIDADE_INTERATIVA ou PRIORIDADE_LOTE
+
+        Returns:
+            Segundos aguardados
+        """
+        inicio = time.monotonic()
+        with self._cond:
+            self._esperando[prioridade] += 1
+            try:
+                while True:
+                    self._repor()
+                    efetiva = prioridade
+                    if time.monotonic() - inicio > COTA_ESPERA_MAX_LOTE_S:
+                        efetiva = PRIORIDADE_INTERATIVA  # Envelhecimento: evita inanição do lote
+                    piso = 1 if efetiva == PRIORIDADE_INTERATIVA else 1 + self.reserva
+                    if self._tokens >= piso and not any(self._esperando[:efetiva]):
+                        self._tokens -= 1
+                        break
+                    self._cond.wait(max((piso - self._tokens) / self.taxa, 0.05))
+            finally:
+                self._esperando[prioridade] -= 1
+                self._cond.notify_all()
+        return time.monotonic() - inicio
+
+    def esvaziar(self) -> None:
+        """Zera o balde (o servidor respondeu 429: a cota do minuto acabou)."""
+        with self._cond:
+            self._repor()
+            self._tokens = min(self._tokens, 0.0)
+
+
+# ==============================================================================
+# CONTABILIDADE
+# ==============================================================================
+class ContagemRerun:
+    """Chamadas de um rerun (atualizada ao vivo enquanto o script roda)."""
+
+    __slots__ = ("pagina", "chamadas", "espera_s", "inicio")
+
+    def __init__(self, pagina: str = ""):
+        self.pagina = pagina
+        self.chamadas = 0
+        self.espera_s = 0.0
+        self.inicio = time.time()
+
+
+class Contabilidade:
+    """Totais de chamadas do processo por página, operação e tipo de endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.total = 0
+            self.erros_429 = 0
+            self.espera_s = 0.0
+            self.por_pagina: Counter = Counter()
+            self.por_operacao: Counter = Counter()
+            self.por_tipo: Counter = Counter()
+            self.reruns: deque = deque(maxlen=CONTABILIDADE_RERUNS_RETIDOS)
+
+    def registrar(self, tipo: str, espera_s: float, status: Optional[int]) -> None:
+        contagem = _rerun.get()
+        pagina = contagem.pagina if contagem is not None and contagem.pagina else SEM_PAGINA
+        with self._lock:
+            self.total += 1
+            self.espera_s += espera_s
+            self.erros_429 += status == 429
+            self.por_pagina[pagina] += 1
+            self.por_operacao[_operacao.get()] += 1
+            self.por_tipo[tipo] += 1
+            if contagem is not None:
+                contagem.chamadas += 1
+                contagem.espera_s += espera_s
+                alerta = contagem.chamadas == COTA_ALERTA_RERUN
+            else:
+                alerta = False
+        if alerta:
+            logger.warning(f"Rerun da página '{pagina}' já fez {COTA_ALERTA_RERUN} chamadas ao Sheets")
+
+    def novo_rerun(self, contagem: ContagemRerun) -> None:
+        with self._lock:
+            self.reruns.append(contagem)
+
+    def resumo(self) -> Dict[str, Any]:
+        """
+        Fotografia dos contadores.
+
+        Returns:
+            Dict com "total", "erros_429", "espera_s", "por_pagina",
+            "por_operacao", "por_tipo" (dicts nome -> chamadas) e "reruns"
+            (lista de (página, chamadas, espera_s) dos reruns recentes que
+            chamaram a API)
+        """
+        with self._lock:
+            return {
+                "total": self.total,
+                "erros_429": self.erros_429,
+                "espera_s": self.espera_s,
+                "por_pagina": dict(self.por_pagina),
+                "por_operacao": dict(self.por_operacao),
+                "por_tipo": dict(self.por_tipo),
+                "reruns": [(c.pagina, c.chamadas, c.espera_s) for c in self.reruns if c.chamadas],
+            }
+
+
+# Instâncias do processo (o HTTPClient é criado pelo gspread, sem parâmetros extras)
+balde = BaldeTokens()
+contabilidade = Contabilidade()
+
+_rerun: ContextVar[Optional[ContagemRerun]] = ContextVar("limite_api_rerun", default=None)
+_operacao: ContextVar[str] = ContextVar("limite_api_operacao", default="outros")
+_prioridade: ContextVar[int] = ContextVar("limite_api_prioridade", default=PRIORIDADE_INTERATIVA)
+
+
+def iniciar_rerun(pagina: str = "") -> ContagemRerun:
+    """Abre a contagem do rerun corrente (chamar no topo do script)."""
+    contagem = ContagemRerun(pagina)
+    _rerun.set(contagem)
+    contabilidade.novo_rerun(contagem)
+    return contagem
+
+
+def definir_pagina(pagina: str) -> None:
+    """Atribui as chamadas seguintes do rerun corrente à página informada."""
+    contagem = _rerun.get()
+    if contagem is not None:
+        contagem.pagina = pagina
+
+
+@contextmanager
+def operacao(nome: Optional[str] = None, prioridade: Optional[int] = None) -> Iterator[None]:
+    """
+    Rotula as chamadas feitas dentro do bloco (também serve como decorador).
+
+    Args:
+        nome: Operação contabilizada (None mantém a atual)
+        prioridade: Prioridade no balde (None mantém a atual)
+    """
+    tokens = []
+    if nome is not None:
+        tokens.append((_operacao, _operacao.set(nome)))
+    if prioridade is not None:
+        tokens.append((_prioridade, _prioridade.set(prioridade)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def tipo_chamada(metodo: str, url: str) -> str:
+    """Tipo do endpoint para a contabilidade ("values:batchGet", "batchUpdate", "drive"...)."""
+    partes = urlparse(url)
+    if "drive" in partes.netloc or "/drive/" in partes.path:
+        return "drive"
+    ultimo = partes.path.rstrip("/").rsplit("/", 1)[-1]
+    if ":" in ultimo:
+        acao = ultimo.rsplit(":", 1)[-1]
+        return f"values:{acao}" if "/values" in partes.path else acao
+    if "/values/" in partes.path:
+        return f"values.{metodo.lower()}"
+    return metodo.lower()
+
+
+def chamada_limitada(tipo: str, requisicao: Callable[[], Any]) -> Any:
+    """
+    Executa uma requisição passando pelo balde de tokens e pela contabilidade.
+
+    Args:
+        tipo: Tipo do endpoint (tipo_chamada)
+        requisicao: Função que faz a chamada (levanta exceção com .response em erro HTTP)
+
+    Returns:
+        Retorno de requisicao()
+    """
+    espera = balde.adquirir(_prioridade.get())
+    status = None
+    try:
+        resposta = requisicao()
+        status = getattr(resposta, "status_code", 200)
+        return resposta
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status == 429:
+            balde.esvaziar()
+        raise
+    finally:
+        contabilidade.registrar(tipo, espera, status)
+
+
+def _criar_http_client() -> type:
+    """Subclasse do HTTPClient do gspread (importado só aqui) que passa por chamada_limitada()."""
+    from gspread.http_client import HTTPClient
+
+    class HTTPClientLimitado(HTTPClient):
+        """HTTPClient do gspread que passa pelo balde de tokens e contabiliza cada chamada."""
+
+        def request(self, method: str, endpoint: str, *args: Any, **kwargs: Any):
+            return chamada_limitada(
+                tipo_chamada(method, endpoint),
+                lambda: super(HTTPClientLimitado, self).request(method, endpoint, *args, **kwargs),
+            )
+
+    HTTPClientLimitado.__qualname__ = "HTTPClientLimitado"
+    return HTTPClientLimitado
+
+
+def __getattr__(nome: str) -> Any:
+    """`limite_api.HTTPClientLimitado` criado no primeiro acesso (PEP 562)."""
+    if nome == "HTTPClientLimitado":
+        classe = _criar_http_client()
+        globals()[nome] = classe
+        return classe
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
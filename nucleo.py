@@ -0,0 +1,665 @@
+"""
+Núcleo compartilhado pelas páginas do GESTOR PRO.
+
+Helpers de formulário e validação, cache de PDFs, conexão com o
+repositório, fila de gravação e o snapshot de dados do processo. Como
+módulo importado, é carregado uma vez por processo: os reruns do app.py
+não redefinem estas funções. O gspread (get_conn) e o ReportLab
+(gerar_pdf_cacheado) só são importados quando usados.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import pandas as pd
+import streamlit as st
+
+from agregados import AgregadosDashboard
+from esquema import normalizar_financeiro, normalizar_obras
+from fila_escrita import FilaEscrita
+from formatacao import parse_moeda_series
+from instrumentacao import etapa, registrar_cache
+from limite_api import balde, operacao
+from snapshot_dados import ABAS, ArquivoSnapshot, SnapshotDados
+from storage import FIN_COLS, OBRAS_COLS, Repositorio, SheetsRepositorio, SQLiteRepositorio
+from versao_compartilhada import VersaoCompartilhada
+
+logger = logging.getLogger(__name__)
+
+# Copy-on-write (padrão no pandas 3): filtros e seleções sobre o snapshot
+# compartilhado não copiam dados até alguém escrever neles
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# ==============================================================================
+# CONSTANTES CENTRALIZADAS (Melhoria 4)
+# ==============================================================================
+# Status de obras, categorias e formas de pagamento: esquema.py (STATUS_OBRA, CATS, PAGAMENTOS)
+
+# Cache de PDFs gerados (LRU por conteúdo, compartilhado pelo processo)
+PDF_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Snapshot de dados compartilhado entre sessões
+SNAPSHOT_TTL_S = 120            # Idade em que o snapshot vence (a thread recarrega antes: snapshot_dados.py)
+SNAPSHOT_VERSOES_RETIDAS = 2    # Versões mantidas para sessões que ainda não recarregaram
+
+# Fila de gravação (write-behind)
+FILA_STATUS_INTERVALO_S = 3     # Atualização do indicador da fila na barra lateral
+
+# Defaults para formulários (Melhoria 6); callables são avaliados a cada uso
+# (o módulo vive o processo inteiro, "hoje" não pode ficar fixo na importação)
+DEFAULTS_FIN = {
+    "data": date.today,
+    "tipo": "Saída (Despesa)",
+    "cat": "",
+    "obra": "",
+    "pag": "",
+    "valor": 0.0,
+    "desc": "",
+    "forn": ""
+}
+
+DEFAULTS_OBRA = {
+    "nome": "",
+    "end": "",
+    "area_c": 0.0,
+    "area_t": 0.0,
+    "quartos": 0,
+    "status": "Projeto",
+    "custo": 0.0,
+    "vgv": 0.0,
+    "prazo": "",
+    "data": date.today
+}
+
+# ==============================================================================
+# 1. FUNÇÕES HELPERS (Melhorias 3, 5, 6)
+# ==============================================================================
+
+def check_password(input_pwd: str, stored_pwd: str) -> bool:
+    """
+    Compara senhas de forma segura contra timing attacks (Melhoria 1).
+
+    Args:
+        input_pwd: Senha fornecida pelo usuário
+        stored_pwd: Senha armazenada nos secrets
+
+    Returns:
+        True se as senhas coincidirem, False caso contrário
+    """
+    return hmac.compare_digest(input_pwd, stored_pwd)
+
+
+def reset_form_state(prefix: str, defaults: Dict[str, Any]) -> None:
+    """
+    Reseta o estado do formulário para valores padrão (Melhoria 6).
+
+    Args:
+        prefix: Prefixo das chaves no session_state (ex: "k_fin", "k_ob")
+        defaults: Dicionário com valores padrão (callables são chamados)
+    """
+    for key, value in defaults.items():
+        st.session_state[f"{prefix}_{key}"] = value() if callable(value) else value
+
+
+def init_session_state_defaults(prefix: str, defaults: Dict[str, Any]) -> None:
+    """
+    Inicializa valores padrão no session_state se não existirem (Melhoria 6).
+
+    Args:
+        prefix: Prefixo das chaves (ex: "k_fin")
+        defaults: Dicionário com valores padrão (callables são chamados)
+    """
+    for key, value in defaults.items():
+        state_key = f"{prefix}_{key}"
+        if state_key not in st.session_state:
+            st.session_state[state_key] = value() if callable(value) else value
+
+
+def clear_data_cache(full_resync: bool = False, abas: Optional[List[str]] = None) -> None:
+    """
+    Invalida os dados da sessão e pede uma versão nova ao snapshot (Melhoria 6).
+
+    Por padrão a próxima leitura é incremental (só linhas novas/alteradas).
+    Só as abas informadas são relidas; os demais caches do processo (PDFs,
+    agregados de outras versões, st.cache_data) não são tocados.
+
+    Args:
+        full_resync: Se True, força download completo das abas (sem delta) em
+            todas as réplicas: o pedido vai junto com a versão nova
+        abas: Abas alteradas (None: todas)
+    """
+    if "versao_dados" in st.session_state:
+        del st.session_state["versao_dados"]
+    # A próxima leitura (desta ou de outra sessão nova) recebe a versão nova
+    nova_versao_dados(abas, completo=full_resync)
+
+
+def generate_unique_id(existing_ids: pd.Series) -> int:
+    """
+    Gera um ID único baseado em timestamp para evitar colisões em concorrência (Melhoria 9).
+
+    Em vez de usar max(ID) + 1 que pode colidir se dois usuários adicionarem ao mesmo tempo,
+    usa timestamp em milissegundos que é praticamente único.
+
+    Args:
+        existing_ids: Series com IDs existentes (para fallback)
+
+    Returns:
+        ID único como inteiro
+    """
+    # Usa timestamp em milissegundos (últimos 9 dígitos para manter compatibilidade)
+    timestamp_id = int(datetime.now().timestamp() * 1000) % 1_000_000_000
+
+    # Verifica se já existe (improvável, mas seguro)
+    if not existing_ids.empty:
+        existing_set = set(existing_ids.dropna().astype(int).tolist())
+        while timestamp_id in existing_set:
+            timestamp_id += 1
+
+    return timestamp_id
+
+
+def normalize_string(value: Union[str, None]) -> str:
+    """
+    Normaliza string removendo espaços extras (Melhoria 9).
+
+    Args:
+        value: String a ser normalizada
+
+    Returns:
+        String normalizada ou string vazia se None
+    """
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def validate_lancamento(
+    obra: str,
+    categoria: str,
+    tipo: str,
+    descricao: str,
+    valor: float,
+    fornecedor: str = ""
+) -> Tuple[bool, List[str]]:
+    """
+    Valida dados de um lançamento financeiro (Melhoria 10).
+
+    Args:
+        obra: Nome da obra vinculada
+        categoria: Categoria do lançamento
+        tipo: Tipo (Entrada/Saída)
+        descricao: Descrição do lançamento
+        valor: Valor do lançamento
+        fornecedor: Nome do fornecedor (obrigatório se categoria = Material)
+
+    Returns:
+        Tupla com (is_valid: bool, erros: List[str])
+    """
+    erros = []
+
+    if not normalize_string(obra):
+        erros.append("Selecione a Obra Vinculada.")
+    if not normalize_string(categoria):
+        erros.append("Selecione a Categoria.")
+    if not normalize_string(tipo):
+        erros.append("Selecione o Tipo.")
+    if not normalize_string(descricao):
+        erros.append("A Descrição é obrigatória.")
+    if valor <= 0:
+        erros.append("O Valor deve ser maior que zero.")
+    if normalize_string(categoria) == "Material" and not normalize_string(fornecedor):
+        erros.append("Para categoria 'Material', o campo Fornecedor é obrigatório.")
+
+    return (len(erros) == 0, erros)
+
+
+def validate_obra(
+    nome: str,
+    endereco: str,
+    prazo: str,
+    vgv: float,
+    custo: float,
+    area_const: float,
+    area_terr: float
+) -> Tuple[bool, List[str]]:
+    """
+    Valida dados de uma obra (Melhoria 10).
+
+    Args:
+        nome: Nome do empreendimento
+        endereco: Endereço da obra
+        prazo: Prazo de entrega
+        vgv: Valor Geral de Vendas
+        custo: Custo previsto
+        area_const: Área construída
+        area_terr: Área do terreno
+
+    Returns:
+        Tupla com (is_valid: bool, erros: List[str])
+    """
+    erros = []
+
+    nome_norm = normalize_string(nome)
+    if not nome_norm:
+        erros.append("O 'Nome do Empreendimento' é obrigatório.")
+    elif len(nome_norm) < 3:
+        erros.append("O 'Nome do Empreendimento' deve ter pelo menos 3 caracteres.")
+
+    if not normalize_string(endereco):
+        erros.append("O 'Endereço' é obrigatório.")
+    if not normalize_string(prazo):
+        erros.append("O 'Prazo' é obrigatório.")
+    if vgv <= 0:
+        erros.append("O 'Valor de Venda (VGV)' deve ser maior que zero.")
+    if custo <= 0:
+        erros.append("O 'Orçamento Previsto' deve ser maior que zero.")
+    if area_const <= 0 and area_terr <= 0:
+        erros.append("Preencha ao menos a Área Construída ou do Terreno.")
+
+    return (len(erros) == 0, erros)
+
+
+# ==============================================================================
+# 2. MOTOR PDF (ENTERPRISE V5) - ver relatorio_pdf.py
+# ==============================================================================
+@st.cache_resource
+def get_pdf_cache() -> Dict[str, Any]:
+    """Cache LRU de PDFs (chave de conteúdo -> bytes), limitado a PDF_CACHE_MAX_BYTES."""
+    return {"lock": threading.Lock(), "itens": OrderedDict(), "bytes": 0}
+
+
+def _hash_df(df: Optional[pd.DataFrame]) -> str:
+    """Hash estável do conteúdo de um DataFrame (colunas + valores, sem índice)."""
+    if df is None or df.empty:
+        return "vazio"
+    h = hashlib.sha256("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def gerar_pdf_cacheado(
+    cache: Dict[str, Any],
+    escopo: str,
+    periodo: str,
+    vgv: float,
+    custos: float,
+    lucro: float,
+    roi: float,
+    df_cat: Optional[pd.DataFrame],
+    df_lanc: Optional[pd.DataFrame],
+    emitido_em: datetime
+) -> bytes:
+    """
+    Retorna o PDF do cache ou gera com gerar_pdf_empresarial e armazena.
+
+    A chave combina escopo, período, métricas, emissão (ao minuto, como no
+    rodapé) e o hash das tabelas; o item menos usado é descartado ao exceder
+    PDF_CACHE_MAX_BYTES.
+
+    Args:
+        cache: Estrutura retornada por get_pdf_cache()
+        emitido_em: Data/hora de emissão impressa no rodapé
+        (demais): mesmos argumentos de gerar_pdf_empresarial
+
+    Returns:
+        Bytes do PDF
+    """
+    chave = hashlib.sha256("|".join([
+        str(escopo), str(periodo), f"{vgv:.2f}", f"{custos:.2f}", f"{lucro:.2f}", f"{roi:.4f}",
+        emitido_em.strftime("%Y-%m-%d %H:%M"), _hash_df(df_cat), _hash_df(df_lanc)
+    ]).encode()).hexdigest()
+
+    with cache["lock"]:
+        if chave in cache["itens"]:
+            cache["itens"].move_to_end(chave)
+            registrar_cache("pdf", acerto=True)
+            return cache["itens"][chave]
+
+    registrar_cache("pdf", acerto=False)
+    from relatorio_pdf import gerar_pdf_empresarial  # Só no primeiro PDF do processo
+
+    with etapa("pdf"):
+        pdf = gerar_pdf_empresarial(
+            escopo, periodo, vgv, custos, lucro, roi, df_cat, df_lanc, emitido_em=emitido_em
+        )
+
+    with cache["lock"]:
+        if chave not in cache["itens"] and len(pdf) <= PDF_CACHE_MAX_BYTES:
+            cache["itens"][chave] = pdf
+            cache["bytes"] += len(pdf)
+            while cache["bytes"] > PDF_CACHE_MAX_BYTES:
+                _, antigo = cache["itens"].popitem(last=False)
+                cache["bytes"] -= len(antigo)
+    return pdf
+
+
+def preparar_extrato_pdf(df: pd.DataFrame) -> pd.DataFrame:
+    """Seleciona as colunas do extrato do PDF, ordenadas da data mais recente."""
+    cols_pdf = ["Data", "Categoria", "Descrição", "Valor"]
+    return df.reindex(columns=cols_pdf, fill_value="").sort_values("Data", ascending=False)
+
+
+def gerar_pdf_sob_demanda(
+    cache: Dict[str, Any],
+    escopo: str,
+    periodo: str,
+    vgv: float,
+    custos: Optional[float],
+    lucro: float,
+    roi: float,
+    df_base: pd.DataFrame,
+    com_categorias: bool = True,
+    df_cat: Optional[pd.DataFrame] = None
+) -> bytes:
+    """
+    Prepara as tabelas do relatório e gera (ou reaproveita) o PDF.
+
+    Passado ao st.download_button como callable (via functools.partial), só
+    roda quando o usuário clica em baixar; reruns não tocam o ReportLab.
+
+    Args:
+        cache: Estrutura retornada por get_pdf_cache()
+        escopo, periodo, vgv, lucro, roi: ver gerar_pdf_empresarial
+        custos: Total de custos; se None, soma a coluna Valor do extrato
+        df_base: Lançamentos do escopo (já filtrados)
+        com_categorias: Inclui a tabela de distribuição por categoria
+        df_cat: Distribuição por categoria já calculada (evita novo groupby)
+
+    Returns:
+        Bytes do PDF
+    """
+    if df_cat is None:
+        df_cat = df_base.groupby("Categoria", as_index=False, observed=True)["Valor"].sum() if com_categorias and not df_base.empty else pd.DataFrame()
+    df_pdf = preparar_extrato_pdf(df_base)
+    if custos is None:
+        custos = float(parse_moeda_series(df_pdf["Valor"]).sum())
+    emitido_em = datetime.now().replace(second=0, microsecond=0)  # Um instante só: rodapé e chave do cache
+    return gerar_pdf_cacheado(cache, escopo, periodo, vgv, custos, lucro, roi, df_cat, df_pdf, emitido_em)
+
+
+# ==============================================================================
+# 3. DADOS E CONEXÃO (Melhoria 1, 2, 3)
+# ==============================================================================
+@st.cache_resource
+def get_conn():
+    """
+    Obtém conexão com Google Sheets (com cache).
+
+    Todas as chamadas passam pelo limite de cota de limite_api, configurável
+    em st.secrets["sheets"] (chamadas_por_minuto, rajada, reserva). O gspread
+    e o oauth2client são importados aqui, no primeiro acesso à planilha.
+    """
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    from limite_api import HTTPClientLimitado
+
+    cota = st.secrets.get("sheets", {})
+    balde.configurar(
+        cota.get("chamadas_por_minuto", balde.taxa * 60),
+        cota.get("rajada", balde.rajada),
+        cota.get("reserva", balde.reserva),
+    )
+    creds = json.loads(st.secrets["gcp_service_account"]["json_content"], strict=False)
+    with operacao("conectar"):
+        db = gspread.authorize(
+            ServiceAccountCredentials.from_json_keyfile_dict(
+                creds,
+                ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+            ),
+            http_client=HTTPClientLimitado,
+        ).open("GestorObras_DB")
+    return db
+
+
+@st.cache_resource
+def get_repo() -> Repositorio:
+    """
+    Repositório de dados do processo, conforme st.secrets["storage"].
+
+    engine = "sheets" (padrão) usa o Google Sheets; engine = "sqlite" usa o
+    arquivo local indicado em path (base primária local ou benchmark offline);
+    engine = "emulador" usa o Sheets emulado em memória (emulador_sheets.py),
+    com latencia_s, jitter_s, prob_429 e cota_por_minuto opcionais. No Sheets
+    e no emulador, leitura_tipada = false volta a ler o texto formatado.
+    """
+    cfg = st.secrets.get("storage", {})
+    engine = cfg.get("engine", "sheets")
+    tipada = bool(cfg.get("leitura_tipada", True))
+    if engine == "sqlite":
+        return SQLiteRepositorio(cfg.get("path", "gestor_obras.db"))
+    if engine == "emulador":
+        from emulador_sheets import PlanilhaEmulada
+
+        return SheetsRepositorio(PlanilhaEmulada(
+            {"Obras": [OBRAS_COLS], "Financeiro": [FIN_COLS]},
+            latencia_s=float(cfg.get("latencia_s", 0.0)),
+            jitter_s=float(cfg.get("jitter_s", 0.0)),
+            prob_429=float(cfg.get("prob_429", 0.0)),
+            cota_por_minuto=cfg.get("cota_por_minuto"),
+            limitar=True,
+        ), leitura_tipada=tipada)
+    return SheetsRepositorio(get_conn(), leitura_tipada=tipada)
+
+
+@st.cache_resource
+def get_fila() -> FilaEscrita:
+    """
+    Fila de gravação do processo (fila_escrita.py), com diário em st.secrets["storage"]["fila"].
+
+    Cada lote gravado avança a versão dos dados; sessões com gravações
+    pendentes recarregam quando elas são concluídas (indicador_fila).
+    """
+    caminho = st.secrets.get("storage", {}).get("fila", "gestor_obras_fila.db")
+    return FilaEscrita(caminho, get_repo(), ao_gravar=get_snapshot_dados().nova_versao)
+
+
+def enfileirar_escrita(op: str, payload: Any) -> None:
+    """Registra uma gravação na fila e a associa à sessão (para recarregar quando concluir)."""
+    seq = get_fila().enfileirar(op, payload)
+    st.session_state.setdefault("escritas_pendentes", []).append(seq)
+
+
+def conferir_escritas_pendentes() -> bool:
+    """
+    Retira da sessão as gravações já concluídas pela fila.
+
+    Returns:
+        True se alguma concluiu (a sessão passa a carregar a versão nova dos dados)
+    """
+    pendentes = st.session_state.get("escritas_pendentes")
+    if not pendentes:
+        return False
+    fila = get_fila()
+    restantes = [seq for seq in pendentes if not fila.concluida(seq)]
+    st.session_state["escritas_pendentes"] = restantes
+    if len(restantes) == len(pendentes):
+        return False
+    # A gravação pode ter sido enviada por outra réplica (diário compartilhado)
+    get_snapshot_dados().sincronizar()
+    st.session_state.pop("versao_dados", None)
+    return True
+
+
+def erros_planilha() -> Tuple[type, ...]:
+    """
+    Exceções do gspread para um `except` (Melhoria 3), sem importar o gspread.
+
+    Enquanto o gspread não foi importado nenhuma exceção dele pode ter sido
+    levantada: a tupla vazia não captura nada e o `except Exception` seguinte
+    trata o erro.
+    """
+    gspread = sys.modules.get("gspread")
+    return (gspread.exceptions.GSpreadException,) if gspread is not None else ()
+
+
+def verificar_schema(repo: Repositorio) -> None:
+    """Garante o schema do Financeiro (o repositório só consulta a planilha uma vez por processo)."""
+    try:
+        repo.garantir_schema()
+    except erros_planilha() as e:  # Melhoria 3: Exceção específica
+        logger.warning(f"Falha ao garantir schema: {e}")
+
+
+@etapa("carga_dados")
+def fetch_data_from_google(
+    repo: Optional[Repositorio] = None,
+    abas: Optional[FrozenSet[str]] = None,
+    completo: bool = False
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """
+    Busca dados do repositório com LIMPEZA de STRINGS (Melhoria 5).
+
+    Chamada uma vez por versão dos dados pelo SnapshotDados (na primeira
+    carga ou na thread de atualização); erros sobem para quem chamou (o
+    snapshot anterior continua servido, nunca tabelas vazias de uma falha).
+
+    Args:
+        repo: Repositório (None usa get_repo(); a thread de atualização informa)
+        abas: Abas a ler (None: as duas); as demais voltam None
+        completo: Ignora a marca d'água e relê as abas inteiras (releitura
+            por idade do snapshot: capta edições feitas direto na planilha)
+
+    Returns:
+        Tupla com (DataFrame de obras, DataFrame financeiro)
+    """
+    try:
+        repo = repo if repo is not None else get_repo()
+
+        # Schema conferido uma vez por processo (storage._schemas_verificados)
+        verificar_schema(repo)
+
+        # Schema fixo (esquema.py): categóricas já sem espaços, ID int32, Valor float64
+        if abas is None or set(ABAS) <= abas:
+            # As duas abas numa leitura só (no Sheets: um values_batch_get tipado)
+            bruto_o, bruto_f = repo.carregar_tudo(forcar_completo=completo)
+            return normalizar_obras(bruto_o), normalizar_financeiro(bruto_f)
+        brutos = repo.carregar_abas(tuple(a for a in ABAS if a in abas), forcar_completo=completo)
+        return (
+            normalizar_obras(brutos["Obras"]) if "Obras" in brutos else None,
+            normalizar_financeiro(brutos["Financeiro"]) if "Financeiro" in brutos else None,
+        )
+
+    except erros_planilha() as e:  # Melhoria 3
+        logger.error(f"GSpread error: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        raise
+
+
+@st.cache_resource
+def get_snapshot_dados() -> SnapshotDados:
+    """
+    Snapshot de dados do processo (snapshot_dados.py), com a thread de atualização.
+
+    O repositório é resolvido aqui, na thread do script: a thread de
+    atualização só chama fetch_data_from_google com ele.
+
+    A cópia em disco para partidas a quente fica no diretório
+    st.secrets["storage"]["snapshot"]; no Sheets o padrão é
+    "gestor_obras_snapshot", nos demais engines (base local ou em memória)
+    fica desligada. snapshot = "" desliga.
+
+    Com várias réplicas, st.secrets["storage"]["versao_compartilhada"] é o
+    arquivo SQLite com a versão comum a elas (versao_compartilhada.py): uma
+    escrita em qualquer réplica invalida o snapshot em todas e, com o
+    diretório da cópia em disco também comum, só uma relê o Sheets. Padrão
+    "gestor_obras_versao.db"; desligado no emulador (dados só deste
+    processo). versao_compartilhada = "" desliga.
+    """
+    cfg = st.secrets.get("storage", {})
+    engine = cfg.get("engine", "sheets")
+    diretorio = cfg.get("snapshot", "gestor_obras_snapshot" if engine == "sheets" else "")
+    versao = cfg.get("versao_compartilhada", "gestor_obras_versao.db" if engine != "emulador" else "")
+    return SnapshotDados(
+        partial(fetch_data_from_google, get_repo()),
+        SNAPSHOT_TTL_S,
+        SNAPSHOT_VERSOES_RETIDAS,
+        arquivo=ArquivoSnapshot(diretorio) if diretorio else None,
+        compartilhado=VersaoCompartilhada(versao) if versao else None,
+    )
+
+
+def nova_versao_dados(abas: Optional[List[str]] = None, completo: bool = False) -> int:
+    """Avança a versão dos dados após uma escrita; a thread relê as abas alteradas (None: todas), por completo se pedido."""
+    return get_snapshot_dados().nova_versao(abas, completo=completo)
+
+
+def obter_snapshot(versao_sessao: Optional[int] = None) -> Tuple[int, pd.DataFrame, pd.DataFrame]:
+    """
+    Snapshot somente leitura dos dados, compartilhado por todas as sessões.
+
+    A sessão guarda só o número da versão. Enquanto essa versão estiver retida
+    (SNAPSHOT_VERSOES_RETIDAS), a sessão continua nela e uma edição em
+    andamento não muda sob o usuário; senão recebe a versão publicada mais
+    nova, sem esperar o repositório (SnapshotDados.obter). Os DataFrames são
+    compartilhados: páginas não devem alterá-los in-place.
+
+    Args:
+        versao_sessao: Versão registrada na sessão (None para sessão nova)
+
+    Returns:
+        Tupla (versão, df_obras, df_fin)
+    """
+    return get_snapshot_dados().obter(versao_sessao)
+
+
+def snapshot_da_sessao() -> Tuple[int, pd.DataFrame, pd.DataFrame]:
+    """
+    Snapshot da sessão, registrando a versão em st.session_state["versao_dados"].
+
+    Se a sessão pediu versão nova e recebeu uma defasada (a thread ainda está
+    recarregando), fica aguardando: conferir_snapshot_novo() a leva para a
+    versão seguinte assim que for publicada.
+
+    Returns:
+        Tupla (versão, df_obras, df_fin)
+    """
+    dados = get_snapshot_dados()
+    pedida = st.session_state.get("versao_dados")
+    versao, df_o, df_f = dados.obter(pedida)
+    st.session_state["versao_dados"] = versao
+    status = dados.status()
+    if versao != pedida and (status["atualizando"] or status["vencido"]):
+        st.session_state["aguardando_versao"] = versao
+    return versao, df_o, df_f
+
+
+def conferir_snapshot_novo() -> bool:
+    """
+    Libera a sessão que aguardava dados quando a versão seguinte é publicada.
+
+    Returns:
+        True se a sessão deve recarregar (passa a ler a versão publicada)
+    """
+    aguardando = st.session_state.get("aguardando_versao")
+    if aguardando is None:
+        return False
+    publicada = get_snapshot_dados().publicada
+    if publicada is None or publicada <= aguardando:
+        return False
+    del st.session_state["aguardando_versao"]
+    st.session_state.pop("versao_dados", None)
+    return True
+
+
+@st.cache_resource(max_entries=SNAPSHOT_VERSOES_RETIDAS)
+def get_agregados(versao: int, _df_obras: pd.DataFrame, _df_fin: pd.DataFrame) -> AgregadosDashboard:
+    """
+    Agregados do Dashboard de uma versão dos dados, compartilhados entre sessões.
+
+    A chave é só a versão (os DataFrames com "_" não entram no hash), então
+    trocar o escopo ou dar rerun não recalcula nada até a próxima escrita.
+    """
+    registrar_cache("agregados", acerto=False)
+    return AgregadosDashboard(_df_obras, _df_fin)
@@ -0,0 +1,6 @@
+"""
+Páginas do GESTOR PRO, uma por módulo, cada uma com render().
+
+O app.py importa só o módulo da página selecionada (PAGINAS): dependências
+de uma página (plotly no Dashboard) não pesam na partida das outras.
+"""
@@ -0,0 +1,173 @@
+"""
+Página Dashboard: indicadores, gráficos e relatório PDF do escopo escolhido.
+
+O plotly.express só é importado aqui, na primeira vez que a página abre.
+"""
+from datetime import date
+from functools import partial
+from typing import List
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from agregados import ESCOPO_TODAS
+from formatacao import fmt_moeda_series
+from instrumentacao import consulta_cache, etapa
+from nucleo import clear_data_cache, gerar_pdf_sob_demanda, get_agregados, get_pdf_cache
+from tema import COR_PRIMARIA
+
+
+def render(versao_dados: int, df_obras: pd.DataFrame, df_fin: pd.DataFrame, lista_obras: List[str]) -> None:
+    """
+    Desenha a página (chamada pelo app.py a cada rerun com a página selecionada).
+
+    Args:
+        versao_dados: Versão do snapshot da sessão (chave dos agregados)
+        df_obras: Snapshot de Obras (somente leitura)
+        df_fin: Snapshot do Financeiro (somente leitura)
+        lista_obras: Nomes das obras, ordenados
+    """
+    c_tit, c_sel, c_btn = st.columns([1.5, 2, 1])
+    with c_tit:
+        st.title("Visão Geral")
+    with c_sel:
+        if lista_obras:
+            opcoes = [ESCOPO_TODAS] + lista_obras
+            escopo = st.selectbox("Escopo", opcoes, label_visibility="collapsed")
+        else:
+            st.warning("Cadastre uma obra.")
+            st.stop()
+    with c_btn:
+        if st.button("🔄 Atualizar Dados", use_container_width=True):
+            clear_data_cache(full_resync=True)  # Ressincronização completa
+            st.rerun()
+
+    # Agregados da versão atual dos dados: trocar o escopo é só consulta
+    with etapa("dashboard_agregados"), consulta_cache("agregados"):
+        agregados = get_agregados(versao_dados, df_obras, df_fin)
+        visao = agregados.escopo(escopo)
+    df_show = visao["lancamentos"]
+
+    # -------------------------
+    # Escopo
+    # -------------------------
+    if escopo == ESCOPO_TODAS:
+        vgv_total = agregados.vgv_total
+        label_btn_pdf = "⬇️ BAIXAR PDF (PORTFÓLIO CONSOLIDADO)"
+
+        # Vendidas (para Lucro/ROI)
+        sold_names = agregados.obras_vendidas
+        vgv_sold = agregados.vgv_vendidas
+
+        custos_total = visao["custos"]
+        custos_sold = agregados.custos_vendidas
+
+        lucro_sold = float(vgv_sold - custos_sold)
+        roi_sold = (lucro_sold / custos_sold * 100) if custos_sold > 0 else 0.0
+
+        perc_total = (custos_total / vgv_total * 100) if vgv_total > 0 else 0.0
+
+        vgv_fmt, custos_fmt, lucro_fmt = fmt_moeda_series(pd.Series([vgv_total, custos_total, lucro_sold]))
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("VGV Total", vgv_fmt)
+        k2.metric("Custos Totais", custos_fmt, delta=f"{perc_total:.1f}%", delta_color="inverse")
+
+        if sold_names:
+            k3.metric("Lucro (Vendidas)", lucro_fmt)
+            k4.metric("ROI (Vendidas)", f"{roi_sold:.1f}%")
+        else:
+            k3.metric("Lucro (Vendidas)", "—")
+            k4.metric("ROI (Vendidas)", "—")
+            st.caption("ℹ️ Lucro/ROI só aparecem para obras com **Status = 'Vendida'**.")
+
+        # métricas para PDF
+        vgv = vgv_total
+        custos = custos_total
+        lucro = vgv - custos
+        roi = (lucro / custos * 100) if custos > 0 else 0.0
+
+    else:
+        row = df_obras[df_obras["Cliente"] == escopo].iloc[0]
+        status_obra = str(row.get("Status", "")).strip()
+        vgv = float(row["Valor Total"]) if "Valor Total" in row else 0.0
+
+        label_btn_pdf = f"⬇️ BAIXAR RELATÓRIO PDF: {escopo.upper()}"
+
+        custos = visao["custos"]
+        lucro = float(vgv - custos)
+        roi = (lucro / custos * 100) if custos > 0 else 0.0
+        perc = (custos / vgv * 100) if vgv > 0 else 0.0
+
+        is_vendida = status_obra.lower() == "vendida"
+
+        vgv_fmt, custos_fmt, lucro_fmt = fmt_moeda_series(pd.Series([vgv, custos, lucro]))
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("VGV", vgv_fmt)
+        k2.metric("Custos", custos_fmt, delta=f"{perc:.1f}%", delta_color="inverse")
+
+        if is_vendida:
+            k3.metric("Lucro", lucro_fmt)
+            k4.metric("ROI", f"{roi:.1f}%")
+        else:
+            k3.metric("Status", status_obra if status_obra else "—")
+            k4.metric("Lucro / ROI", "—")
+            st.caption("ℹ️ Para obras **não vendidas**, Lucro e ROI ficam ocultos e só aparecem quando **Status = 'Vendida'**.")
+
+    # -------------------------
+    # Gráficos
+    # -------------------------
+    g1, g2 = st.columns([2, 1])
+
+    with g1:
+        st.subheader("Evolução de Custos")
+        if not df_show.empty:
+            with etapa("grafico_area"):
+                fig = px.area(visao["evolucao"], x="Data_DT", y="Acumulado", color_discrete_sequence=[COR_PRIMARIA])
+                fig.update_layout(plot_bgcolor="white", margin=dict(t=10, l=10, r=10, b=10), height=300)
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Sem despesas registradas para o escopo selecionado.")
+
+    with g2:
+        st.subheader("Categorias")
+        if not df_show.empty:
+            df_cat = visao["categorias"]
+            with etapa("grafico_pizza"):
+                fig2 = px.pie(df_cat, values="Valor", names="Categoria", hole=0.6, color_discrete_sequence=px.colors.qualitative.Bold)
+                fig2.update_layout(showlegend=False, margin=dict(t=0, l=0, r=0, b=0), height=200)
+                st.plotly_chart(fig2, use_container_width=True)
+
+            st.dataframe(
+                df_cat.sort_values("Valor", ascending=False).head(3),
+                use_container_width=True,
+                hide_index=True,
+                column_config={"Valor": st.column_config.NumberColumn(format="R$ %.2f")}
+            )
+        else:
+            st.info("Sem dados")
+
+    # -------------------------
+    # PDF
+    # -------------------------
+    st.markdown("---")
+
+    if not df_show.empty:
+        # Geração sob demanda: o PDF só é montado no clique (e reaproveitado do cache)
+        pdf_data = partial(
+            gerar_pdf_sob_demanda, get_pdf_cache(),
+            escopo, visao["periodo"], vgv, custos, lucro, roi,
+            df_show, df_cat=visao["categorias"]
+        )
+
+        st.download_button(
+            label=label_btn_pdf,
+            data=pdf_data,
+            file_name=f"Relatorio_{escopo}_{date.today()}.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
+    else:
+        st.info("Sem lançamentos no escopo para gerar relatório.")
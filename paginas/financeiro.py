@@ -0,0 +1,335 @@
+"""
+Página Financeiro: novo lançamento, consulta com filtros, edição/exclusão
+em lote e extrato em PDF.
+"""
+import logging
+from datetime import date
+from functools import partial
+from typing import List
+
+import pandas as pd
+import streamlit as st
+
+from edicao import diff_financeiro, normalizar_comparacao, preparar_edicao_financeiro
+from esquema import CATS, PAGAMENTOS
+from fila_escrita import OP_FINANCEIRO, OP_LANCAMENTO
+from formatacao import fmt_moeda, fmt_moeda_series
+from instrumentacao import etapa
+from nucleo import (
+    DEFAULTS_FIN, check_password, enfileirar_escrita, erros_planilha, generate_unique_id,
+    gerar_pdf_sob_demanda, get_pdf_cache, get_repo, init_session_state_defaults,
+    normalize_string, reset_form_state, validate_lancamento
+)
+
+logger = logging.getLogger(__name__)
+
+
+def render(versao_dados: int, df_obras: pd.DataFrame, df_fin: pd.DataFrame, lista_obras: List[str]) -> None:
+    """
+    Desenha a página (chamada pelo app.py a cada rerun com a página selecionada).
+
+    Args:
+        versao_dados: Versão do snapshot da sessão (chave dos agregados)
+        df_obras: Snapshot de Obras (somente leitura)
+        df_fin: Snapshot do Financeiro (somente leitura)
+        lista_obras: Nomes das obras, ordenados
+    """
+    st.title("Financeiro")
+
+    # Melhoria 6: Usando função helper para reset
+    if st.session_state.get("sucesso_fin"):
+        st.success("✅ Lançamento registrado! A gravação aparece na barra lateral.", icon="✅")
+        reset_form_state("k_fin", DEFAULTS_FIN)
+        st.session_state["sucesso_fin"] = False
+
+    # Melhoria 6: Inicialização centralizada
+    init_session_state_defaults("k_fin", DEFAULTS_FIN)
+
+    with st.expander("Novo Lançamento", expanded=True):
+        with st.form("ffin", clear_on_submit=False):
+
+            c_row1_1, c_row1_2, c_row1_3 = st.columns([1, 1, 1])
+            with c_row1_1:
+                dt = st.date_input("Data", value=st.session_state.k_fin_data, key="k_fin_data")
+            with c_row1_2:
+                tp = st.selectbox("Tipo", ["Saída (Despesa)", "Entrada"], key="k_fin_tipo")
+            with c_row1_3:
+                vl = st.number_input("Valor R$ *", min_value=0.0, format="%.2f", step=100.0, value=st.session_state.k_fin_valor, key="k_fin_valor_input")
+
+            c_row2_1, c_row2_2, c_row2_3 = st.columns([1, 1, 1])
+            with c_row2_1:
+                opcoes_obras = [""] + lista_obras
+                ob = st.selectbox("Obra *", opcoes_obras, key="k_fin_obra")
+            with c_row2_2:
+                opcoes_cats = [""] + CATS
+                ct = st.selectbox("Categoria *", opcoes_cats, key="k_fin_cat")
+            with c_row2_3:
+                opcoes_pag = [""] + PAGAMENTOS
+                pg = st.selectbox("Forma de Pagamento *", opcoes_pag, key="k_fin_pag")
+
+            c_row3_1, c_row3_2 = st.columns([1, 1])
+            with c_row3_1:
+                fn = st.text_input("Fornecedor", value=st.session_state.k_fin_forn, key="k_fin_forn", placeholder="Obrigatório se Categoria = Material")
+            with c_row3_2:
+                dc = st.text_input("Descrição *", value=st.session_state.k_fin_desc, key="k_fin_desc", placeholder="Detalhes do gasto")
+
+            # Melhoria 7: Validação inline
+            if ct == "Material" and not fn:
+                st.caption("⚠️ Fornecedor é obrigatório para categoria 'Material'")
+
+            st.write("")
+            submitted_fin = st.form_submit_button("Salvar Lançamento", use_container_width=True)
+
+            if submitted_fin:
+                st.session_state.k_fin_valor = vl
+
+                # Melhoria 10: Validação centralizada
+                is_valid, erros = validate_lancamento(
+                    obra=ob,
+                    categoria=ct,
+                    tipo=tp,
+                    descricao=dc,
+                    valor=vl,
+                    fornecedor=fn
+                )
+
+                # Validação adicional: Forma de pagamento
+                if not pg or pg == "":
+                    erros.append("Selecione a Forma de Pagamento.")
+
+                if erros:
+                    st.error("⚠️ Atenção:")
+                    for e in erros:
+                        st.caption(f"- {e}")
+                else:
+                    try:
+                        repo = get_repo()
+
+                        repo.garantir_schema()  # Sem custo após a primeira conferência do processo
+
+                        # Melhoria 9: Geração de ID único baseado em timestamp
+                        if not df_fin.empty and "ID" in df_fin.columns:
+                            ids_exist = pd.to_numeric(df_fin["ID"], errors="coerce").fillna(0)
+                            new_id = generate_unique_id(ids_exist)
+                        else:
+                            new_id = generate_unique_id(pd.Series())
+
+                        # Gravação em segundo plano: o formulário volta na hora
+                        enfileirar_escrita(OP_LANCAMENTO, [
+                            new_id,
+                            dt.strftime("%Y-%m-%d"),
+                            tp,
+                            ct.strip(),
+                            dc.strip(),
+                            float(vl),
+                            ob.strip(),
+                            fn.strip(),
+                            pg.strip()
+                        ])
+
+                        st.session_state["sucesso_fin"] = True
+                        st.rerun()
+                    except erros_planilha() as e:  # Melhoria 3
+                        logger.error(f"Erro GSpread ao salvar: {e}")
+                        st.error(f"Erro ao salvar: {e}")
+                    except Exception as e:
+                        logger.error(f"Erro ao salvar lançamento: {e}")
+                        st.error(f"Erro: {e}")
+
+    st.markdown("---")
+    st.markdown("### 🔍 Consultar Lançamentos")
+
+    if not df_fin.empty:
+        df_view = df_fin  # Filtros geram novos frames; o snapshot compartilhado não é alterado
+
+        with st.expander("Filtros de Busca", expanded=True):
+            c_filter1, c_filter2 = st.columns(2)
+
+            with c_filter1:
+                opcoes_filtro_obra = ["Todas as Obras"] + lista_obras
+                filtro_obra = st.selectbox("Filtrar por Obra", options=opcoes_filtro_obra)
+
+            with c_filter2:
+                opcoes_filtro_cat = ["Todas as Categorias"] + CATS
+                filtro_cat = st.selectbox("Filtrar por Categoria", options=opcoes_filtro_cat)
+
+        if filtro_obra != "Todas as Obras":
+            df_view = df_view[df_view["Obra Vinculada"] == str(filtro_obra).strip()]  # Categórica: compara códigos
+
+        if filtro_cat != "Todas as Categorias":
+            df_view = df_view[df_view["Categoria"] == str(filtro_cat).strip()]
+
+        total_filtrado = df_view["Valor"].sum()
+        count_filtrado = len(df_view)
+
+        st.caption(f"Exibindo **{count_filtrado}** lançamentos | Total Filtrado: **{fmt_moeda(total_filtrado)}**")
+
+        with etapa("editor_financeiro_prep"):
+            df_to_edit = preparar_edicao_financeiro(df_view)
+
+        st.info("🧾 **Como excluir:** marque **🗑️ Excluir?** na linha desejada e depois clique em **💾 SALVAR** (com senha).")
+
+        edited_df = st.data_editor(
+            df_to_edit,
+            use_container_width=True,
+            hide_index=True,
+            num_rows="fixed",
+            disabled=["ID"],
+            height=360,
+            column_config={
+                "ID": st.column_config.NumberColumn("#", width=55),
+                "Excluir": st.column_config.CheckboxColumn("🗑️ Excluir?", help="Marque para excluir e clique em SALVAR", width=90),
+                "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY", required=True, width=110),
+                "Tipo": st.column_config.SelectboxColumn("Tipo", options=["Saída (Despesa)", "Entrada"], required=True, width=140),
+                "Forma Pagamento": st.column_config.SelectboxColumn("Pagamento", options=[""] + PAGAMENTOS, required=False, width=160),
+                "Obra Vinculada": st.column_config.SelectboxColumn("Obra", options=[""] + lista_obras, required=True, width=220),
+                "Categoria": st.column_config.SelectboxColumn("Categoria", options=[""] + CATS, required=True, width=170),
+                "Fornecedor": st.column_config.TextColumn("Fornecedor", width=160),
+                "Descrição": st.column_config.TextColumn("Descrição", width="large", required=True),
+                "Valor": st.column_config.NumberColumn("Valor", format="R$ %.2f", min_value=0, width=120),
+            }
+        )
+
+        # RESUMO VISUAL
+        try:
+            total_atual = float(pd.to_numeric(edited_df["Valor"], errors="coerce").fillna(0.0).sum())
+            marcados = int(edited_df["Excluir"].astype(bool).sum())
+            valor_marcado = float(pd.to_numeric(edited_df.loc[edited_df["Excluir"] == True, "Valor"], errors="coerce").fillna(0.0).sum()) if marcados > 0 else 0.0
+            total_pos_excluir = total_atual - valor_marcado
+        except (ValueError, TypeError, KeyError):  # Melhoria 3
+            total_atual, marcados, valor_marcado, total_pos_excluir = 0.0, 0, 0.0, 0.0
+
+        with st.container(border=True):
+            st.markdown("#### 📌 Resumo da tabela (antes de salvar)")
+            total_fmt, marcado_fmt, pos_excluir_fmt = fmt_moeda_series(
+                pd.Series([total_atual, valor_marcado, total_pos_excluir])
+            )
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Total (Filtro)", total_fmt)
+            m2.metric("Marcados p/ excluir", f"{marcados}")
+            m3.metric("Valor a excluir", marcado_fmt)
+            m4.metric("Total após excluir", pos_excluir_fmt)
+
+        if marcados > 0:
+            st.warning(f"🗑️ Você marcou **{marcados}** lançamento(s) para exclusão. Ao salvar, eles serão removidos.", icon="⚠️")
+            st.markdown("##### 🗑️ Marcados para exclusão (prévia)")
+
+            cols_preview = ["ID", "Data", "Obra Vinculada", "Categoria", "Fornecedor", "Descrição", "Valor"]
+            df_del_preview = edited_df.loc[edited_df["Excluir"] == True, cols_preview]
+
+            def _style_del(_df):
+                return _df.style.apply(lambda row: ["background-color: #ffe3e3"] * len(row), axis=1)
+
+            st.dataframe(
+                _style_del(df_del_preview),
+                use_container_width=True,
+                hide_index=True,
+                height=200,
+                column_config={"Valor": st.column_config.NumberColumn(format="R$ %.2f")}
+            )
+
+        with etapa("comparacao_edicao"):
+            base_cmp = normalizar_comparacao(df_to_edit)
+            edit_cmp = normalizar_comparacao(edited_df)
+            has_changes = not edit_cmp.equals(base_cmp)
+
+        st.write("")
+        if has_changes:
+            with st.container(border=True):
+                c_alert, c_pwd, c_btn = st.columns([2, 1.5, 1])
+                with c_alert:
+                    st.warning("⚠️ Alterações pendentes (edição/exclusão). Confirme para salvar.", icon="⚠️")
+                with c_pwd:
+                    pwd_confirm = st.text_input("Senha", type="password", placeholder="Senha ADM", label_visibility="collapsed")
+                with c_btn:
+                    if st.button("💾 SALVAR", type="primary", use_container_width=True):
+                        # Melhoria 1: Comparação segura
+                        if not check_password(pwd_confirm, st.secrets["password"]):
+                            st.toast("Senha incorreta!", icon="⛔")
+                        else:
+                            erros = []
+                            for _, r in edited_df.iterrows():
+                                if bool(r.get("Excluir")):
+                                    continue
+
+                                # Melhoria 10: Validação centralizada
+                                row_id = int(r['ID'])
+                                obra = normalize_string(r.get("Obra Vinculada", ""))
+                                cat = normalize_string(r.get("Categoria", ""))
+                                desc = normalize_string(r.get("Descrição", ""))
+                                tp2 = normalize_string(r.get("Tipo", ""))
+                                val = float(pd.to_numeric(r.get("Valor", 0), errors="coerce") or 0)
+                                forn = normalize_string(r.get("Fornecedor", ""))
+
+                                is_valid, row_erros = validate_lancamento(
+                                    obra=obra,
+                                    categoria=cat,
+                                    tipo=tp2,
+                                    descricao=desc,
+                                    valor=val,
+                                    fornecedor=forn
+                                )
+
+                                # Adiciona ID da linha aos erros
+                                for err in row_erros:
+                                    erros.append(f"ID {row_id}: {err}")
+
+                            if erros:
+                                st.error("⚠️ Corrija antes de salvar:")
+                                for e in erros:
+                                    st.caption(f"- {e}")
+                            else:
+                                try:
+                                    repo = get_repo()
+
+                                    repo.garantir_schema()
+
+                                    # Só envia as linhas que realmente mudaram
+                                    atualizacoes, ids_del = diff_financeiro(edited_df, base_cmp, edit_cmp)
+
+                                    enfileirar_escrita(OP_FINANCEIRO, {"atualizacoes": atualizacoes, "exclusoes": ids_del})
+
+                                    st.toast(f"✅ Na fila de gravação: {len(atualizacoes)} atualizações • {len(ids_del)} exclusões", icon="✅")
+                                    st.rerun()
+
+                                except erros_planilha() as e:  # Melhoria 3
+                                    logger.error(f"Erro GSpread ao salvar Financeiro: {e}")
+                                    st.error(f"Erro ao salvar Financeiro: {e}")
+                                except Exception as e:
+                                    logger.error(f"Erro ao salvar Financeiro: {e}")
+                                    st.error(f"Erro ao salvar Financeiro: {e}")
+        else:
+            st.caption("💡 Edite a tabela acima. Marque 🗑️ para excluir. O botão SALVAR aparece automaticamente.")
+
+        st.write("")
+        st.markdown("---")
+
+        if not df_view.empty:
+            dmin = df_view["Data_DT"].min().strftime("%d/%m/%Y")
+            dmax = df_view["Data_DT"].max().strftime("%d/%m/%Y")
+            per_str = f"De {dmin} até {dmax}"
+
+            escopo_pdf = filtro_obra if filtro_obra != "Todas as Obras" else "Visão Geral (Filtro)"
+
+            # Geração sob demanda: o PDF só é montado no clique (e reaproveitado do cache)
+            pdf_data = partial(
+                gerar_pdf_sob_demanda, get_pdf_cache(),
+                escopo_pdf, per_str,
+                0.0,
+                None,
+                0.0,
+                0.0,
+                edited_df[edited_df["Excluir"] == False],
+                com_categorias=False
+            )
+
+            st.download_button(
+                label="⬇️ BAIXAR RELATÓRIO DA CONSULTA (PDF)",
+                data=pdf_data,
+                file_name=f"Extrato_{date.today()}.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+
+    else:
+        st.info("Nenhum lançamento registrado.")
@@ -0,0 +1,248 @@
+"""
+Página Obras: cadastro de empreendimentos e edição da carteira (com
+renomeação propagada aos lançamentos do Financeiro).
+"""
+import logging
+from typing import List
+
+import pandas as pd
+import streamlit as st
+
+from edicao import diff_obras, preparar_edicao_obras
+from esquema import STATUS_OBRA
+from fila_escrita import OP_OBRA, OP_OBRAS
+from formatacao import fmt_moeda
+from instrumentacao import etapa
+from nucleo import (
+    DEFAULTS_OBRA, check_password, enfileirar_escrita, erros_planilha, generate_unique_id,
+    init_session_state_defaults, reset_form_state, validate_obra
+)
+
+logger = logging.getLogger(__name__)
+
+
+def render(versao_dados: int, df_obras: pd.DataFrame, df_fin: pd.DataFrame, lista_obras: List[str]) -> None:
+    """
+    Desenha a página (chamada pelo app.py a cada rerun com a página selecionada).
+
+    Args:
+        versao_dados: Versão do snapshot da sessão (chave dos agregados)
+        df_obras: Snapshot de Obras (somente leitura)
+        df_fin: Snapshot do Financeiro (somente leitura)
+        lista_obras: Nomes das obras, ordenados
+    """
+    st.title("📂 Gestão de Incorporação e Obras")
+    st.markdown("---")
+
+    # Melhoria 6: Usando função helper para reset
+    if st.session_state.get("sucesso_obra"):
+        st.success("✅ Alterações registradas! A gravação aparece na barra lateral.", icon="🏡")
+        reset_form_state("k_ob", DEFAULTS_OBRA)
+        st.session_state["sucesso_obra"] = False
+
+    # Melhoria 6: Inicialização centralizada
+    init_session_state_defaults("k_ob", DEFAULTS_OBRA)
+
+    with st.expander("➕ Novo Cadastro (Clique para expandir)", expanded=False):
+        with st.form("f_obra_completa", clear_on_submit=False):
+            st.markdown("#### 1. Identificação")
+            c1, c2 = st.columns([3, 2])
+            with c1:
+                nome_obra = st.text_input(
+                    "Nome do Empreendimento *",
+                    placeholder="Ex: Res. Vila Verde - Casa 04",
+                    value=st.session_state.k_ob_nome,
+                    key="k_ob_nome"
+                )
+                # Melhoria 7: Validação inline
+                if nome_obra and len(nome_obra.strip()) < 3:
+                    st.caption("⚠️ Nome muito curto (mínimo 3 caracteres)")
+            with c2:
+                endereco = st.text_input(
+                    "Endereço *",
+                    placeholder="Rua, Bairro...",
+                    value=st.session_state.k_ob_end,
+                    key="k_ob_end"
+                )
+
+            st.markdown("#### 2. Características Físicas (Produto)")
+            c4, c5, c6, c7 = st.columns(4)
+            with c4:
+                area_const = st.number_input(
+                    "Área Construída (m²)",
+                    min_value=0.0,
+                    format="%.2f",
+                    value=st.session_state.k_ob_area_c,
+                    key="k_ob_area_c"
+                )
+            with c5:
+                area_terr = st.number_input(
+                    "Área Terreno (m²)",
+                    min_value=0.0,
+                    format="%.2f",
+                    value=st.session_state.k_ob_area_t,
+                    key="k_ob_area_t"
+                )
+            with c6:
+                quartos = st.number_input(
+                    "Qtd. Quartos",
+                    min_value=0,
+                    step=1,
+                    value=st.session_state.k_ob_quartos,
+                    key="k_ob_quartos"
+                )
+            with c7:
+                status = st.selectbox(
+                    "Fase Atual",
+                    STATUS_OBRA,  # Melhoria 4: Usando constante
+                    key="k_ob_status"
+                )
+
+            st.markdown("#### 3. Viabilidade Financeira e Prazos")
+            c8, c9, c10, c11 = st.columns(4)
+            with c8:
+                custo_previsto = st.number_input(
+                    "Orçamento (Custo) *",
+                    min_value=0.0,
+                    format="%.2f",
+                    step=1000.0,
+                    value=st.session_state.k_ob_custo,
+                    key="k_ob_custo_input"
+                )
+            with c9:
+                valor_venda = st.number_input(
+                    "VGV (Venda) *",
+                    min_value=0.0,
+                    format="%.2f",
+                    step=1000.0,
+                    value=st.session_state.k_ob_vgv,
+                    key="k_ob_vgv_input"
+                )
+            with c10:
+                data_inicio = st.date_input("Início da Obra", value=st.session_state.k_ob_data, key="k_ob_data")
+            with c11:
+                prazo_entrega = st.text_input(
+                    "Prazo / Entrega *",
+                    placeholder="Ex: dez/2025",
+                    value=st.session_state.k_ob_prazo,
+                    key="k_ob_prazo"
+                )
+
+            # Melhoria 7: Validação inline com feedback visual
+            if valor_venda > 0 and custo_previsto > 0:
+                margem_proj = ((valor_venda - custo_previsto) / custo_previsto) * 100
+                lucro_proj = valor_venda - custo_previsto
+
+                if margem_proj < 10:
+                    st.warning(f"⚠️ **Atenção:** Margem baixa ({margem_proj:.1f}%). Lucro projetado: {fmt_moeda(lucro_proj)}")
+                elif margem_proj < 20:
+                    st.info(f"💰 **Projeção:** Lucro de **{fmt_moeda(lucro_proj)}** (Margem: **{margem_proj:.1f}%**)")
+                else:
+                    st.success(f"✅ **Boa margem!** Lucro de **{fmt_moeda(lucro_proj)}** (Margem: **{margem_proj:.1f}%**)")
+            elif valor_venda > 0 or custo_previsto > 0:
+                st.caption("ℹ️ Preencha VGV e Custo para ver a projeção de margem")
+
+            st.markdown("---")
+            st.caption("(*) Campos Obrigatórios")
+            submitted = st.form_submit_button("✅ SALVAR PROJETO", use_container_width=True)
+
+            if submitted:
+                st.session_state.k_ob_custo = custo_previsto
+                st.session_state.k_ob_vgv = valor_venda
+
+                # Melhoria 10: Validação centralizada
+                is_valid, erros = validate_obra(
+                    nome=nome_obra,
+                    endereco=endereco,
+                    prazo=prazo_entrega,
+                    vgv=valor_venda,
+                    custo=custo_previsto,
+                    area_const=area_const,
+                    area_terr=area_terr
+                )
+
+                if erros:
+                    st.error("⚠️ Não foi possível salvar. Verifique os campos:")
+                    for e in erros:
+                        st.markdown(f"- {e}")
+                else:
+                    try:
+                        # Melhoria 9: Geração de ID único baseado em timestamp
+                        ids_existentes = pd.to_numeric(df_obras["ID"], errors="coerce").fillna(0)
+                        novo_id = generate_unique_id(ids_existentes)
+                        enfileirar_escrita(OP_OBRA, [
+                            novo_id, nome_obra.strip(), endereco.strip(), status, float(valor_venda),
+                            data_inicio.strftime("%Y-%m-%d"), prazo_entrega.strip(),
+                            float(area_const), float(area_terr), int(quartos), float(custo_previsto)
+                        ])
+
+                        st.session_state["sucesso_obra"] = True
+                        st.rerun()
+                    except erros_planilha() as e:  # Melhoria 3
+                        logger.error(f"Erro GSpread ao salvar obra: {e}")
+                        st.error(f"Erro no Google Sheets: {e}")
+                    except Exception as e:
+                        logger.error(f"Erro ao salvar obra: {e}")
+                        st.error(f"Erro no Google Sheets: {e}")
+
+    st.markdown("### 📋 Carteira de Obras")
+    if not df_obras.empty:
+        with etapa("editor_obras_prep"):
+            df_to_edit = preparar_edicao_obras(df_obras)
+
+        edited_df = st.data_editor(
+            df_to_edit,
+            use_container_width=True,
+            hide_index=True,
+            num_rows="fixed",
+            disabled=["ID"],
+            column_config={
+                "ID": st.column_config.NumberColumn("#", width=40),
+                "Cliente": st.column_config.TextColumn("Empreendimento", width="large", required=True),
+                "Status": st.column_config.SelectboxColumn("Fase", options=STATUS_OBRA, required=True, width="medium"),  # Melhoria 4
+                "Prazo": st.column_config.TextColumn("Entrega", width="small"),
+                "Valor Total": st.column_config.NumberColumn("VGV", format="R$ %.0f", min_value=0),
+                "Custo Previsto": st.column_config.NumberColumn("Custo", format="R$ %.0f", min_value=0),
+                "Area Construida": st.column_config.NumberColumn("Área", format="%.0f m²"),
+                "Area Terreno": st.column_config.NumberColumn("Terr.", format="%.0f m²"),
+                "Quartos": st.column_config.NumberColumn("Qts", min_value=0, step=1, width="small"),
+            }
+        )
+
+        st.write("")
+        has_changes = not edited_df.equals(df_to_edit)
+        if has_changes:
+            with st.container(border=True):
+                c_alert, c_pwd, c_btn = st.columns([2, 1.5, 1])
+                with c_alert:
+                    st.warning("⚠️ Alterações pendentes. Confirme para salvar.", icon="⚠️")
+                with c_pwd:
+                    pwd_confirm = st.text_input("Senha", type="password", placeholder="Senha ADM", label_visibility="collapsed")
+                with c_btn:
+                    if st.button("💾 SALVAR", type="primary", use_container_width=True):
+                        # Melhoria 1: Comparação segura
+                        if check_password(pwd_confirm, st.secrets["password"]):
+                            try:
+                                with st.spinner("Registrando alterações..."):
+                                    # Só as linhas efetivamente editadas são gravadas
+                                    atualizacoes, renomes = diff_obras(df_obras, df_to_edit, edited_df)
+
+                                    # Obras + renomeação no Financeiro numa única escrita (em segundo plano)
+                                    enfileirar_escrita(OP_OBRAS, {"atualizacoes": atualizacoes, "renomes": renomes})
+                                    if renomes:
+                                        st.toast("♻️ Lançamentos financeiros das obras renomeadas serão atualizados")
+
+                                    st.session_state["sucesso_obra"] = True
+                                    st.rerun()
+                            except erros_planilha() as e:  # Melhoria 3
+                                logger.error(f"Erro GSpread ao salvar obras: {e}")
+                                st.error(f"Erro ao salvar: {e}")
+                            except Exception as e:
+                                logger.error(f"Erro ao salvar obras: {e}")
+                                st.error(f"Erro ao salvar: {e}")
+                        else:
+                            st.toast("Senha incorreta!", icon="⛔")
+        else:
+            st.caption("💡 Edite diretamente na tabela acima. O botão de salvar aparecerá automaticamente.")
+    else:
+        st.info("Nenhuma obra cadastrada.")
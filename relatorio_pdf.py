@@ -0,0 +1,375 @@
+"""
+Motor de relatórios PDF (ReportLab) do GESTOR PRO.
+
+O ReportLab só é importado dentro das funções, na hora de gerar o relatório.
+Extratos acima de PDF_LINHAS_MODO_GRANDE lançamentos usam o modo de relatório
+grande: tabelas de uma página por bloco, com cabeçalho repetido, subtotal real
+da página e acumulado, geradas sob demanda durante o build (memória limitada).
+"""
+import io
+from datetime import date, datetime
+from itertools import chain, islice
+from typing import Any, Iterator, List, Optional
+
+import pandas as pd
+
+from formatacao import fmt_moeda, fmt_moeda_series, parse_moeda_series
+from tema import COR_PRIMARIA, COR_PRIMARIA_ESCURA, COR_SUCESSO, COR_FUNDO, COR_FUNDO_ESCURO, COR_CINZA_CLARO
+
+# Modo de relatório grande
+PDF_LINHAS_MODO_GRANDE = 1500   # A partir daqui o extrato é paginado em blocos
+PDF_ALTURA_LINHA = 14           # Altura fixa das linhas do extrato (pt) no modo grande
+PDF_MAX_CHARS_DESCRICAO = 55    # Descrição truncada para caber em uma linha (8 cm, fonte 8)
+
+COLS_EXTRATO = ["Data", "Categoria", "Descrição", "Valor"]
+
+
+class _StoryIncremental(list):
+    """
+    Lista de flowables que se reabastece de um gerador conforme o build consome.
+
+    O doc.build() consulta len() a cada flowable processado; quando restam
+    poucos itens, os próximos são gerados. Assim só alguns blocos do extrato
+    existem em memória ao mesmo tempo.
+    """
+
+    def __init__(self, iniciais: List[Any], gerador: Iterator[Any], lote: int = 4):
+        super().__init__(iniciais)
+        self._gerador = gerador
+        self._lote = lote
+
+    def __len__(self) -> int:
+        if self._gerador is not None and super().__len__() < 2:
+            novos = list(islice(self._gerador, self._lote))
+            if novos:
+                self.extend(novos)
+            else:
+                self._gerador = None
+        return super().__len__()
+
+
+def gerar_pdf_empresarial(
+    escopo: str,
+    periodo: str,
+    vgv: float,
+    custos: float,
+    lucro: float,
+    roi: float,
+    df_cat: Optional[pd.DataFrame],
+    df_lanc: Optional[pd.DataFrame],
+    modo_grande: Optional[bool] = None,
+    emitido_em: Optional[datetime] = None
+) -> bytes:
+    """
+    Gera relatório PDF empresarial (Melhoria 5: Type hints).
+
+    Args:
+        escopo: Nome da obra ou "Visão Geral"
+        periodo: String descrevendo o período
+        vgv: Valor Geral de Vendas
+        custos: Total de custos
+        lucro: Lucro calculado
+        roi: Retorno sobre investimento (%)
+        df_cat: DataFrame com categorias agregadas
+        df_lanc: DataFrame com lançamentos
+        modo_grande: Força (True) ou desliga (False) o extrato paginado em blocos;
+            None decide pelo tamanho (PDF_LINHAS_MODO_GRANDE)
+        emitido_em: Data/hora de emissão impressa no rodapé (None: agora)
+
+    Returns:
+        Bytes do PDF gerado
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_RIGHT
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether, PageBreak
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import cm
+
+    rodape_emissao = (emitido_em or datetime.now()).strftime("%d/%m/%Y às %H:%M")
+
+    class EnterpriseCanvas(canvas.Canvas):
+        """
+        Canvas com rodapé "Página X de Y" sem guardar o estado de cada página.
+
+        O rodapé é desenhado ao fechar cada página; o total Y é um Form XObject
+        referenciado por todas elas e definido uma única vez no save(), quando
+        o número de páginas já é conhecido.
+        """
+        FORM_TOTAL = "total_paginas"
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._emitido_em = rodape_emissao
+            self._paginas = 0
+
+        def showPage(self):
+            self._paginas += 1
+            self._draw_footer()
+            super().showPage()
+
+        def save(self):
+            self.beginForm(self.FORM_TOTAL)
+            self.setFillColor(colors.grey)
+            self.setFont("Helvetica", 8)
+            self.drawString(0, 0, str(self._paginas))
+            self.endForm()
+            super().save()
+
+        def _draw_footer(self):
+            width, height = A4
+            self.setStrokeColor(colors.lightgrey)
+            self.setLineWidth(0.5)
+            self.line(30, 50, width-30, 50)
+
+            self.setFillColor(colors.grey)
+            self.setFont("Helvetica", 8)
+            self.drawString(30, 35, "GESTOR PRO • Sistema Integrado de Gestão de Obras")
+            self.drawString(30, 25, "Relatório contábil individualizado.")
+
+            self.drawRightString(width-30, 35, f"Emitido em: {self._emitido_em}")
+
+            # Reserva espaço para até 5 dígitos do total, preenchido pelo form no save()
+            x_total = width - 30 - self.stringWidth("99999", "Helvetica", 8)
+            self.drawRightString(x_total, 25, f"Página {self.getPageNumber()} de ")
+            self.saveState()
+            self.translate(x_total, 25)
+            self.doForm(self.FORM_TOTAL)
+            self.restoreState()
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=60
+    )
+    story = []
+
+    styles = getSampleStyleSheet()
+    style_header_title = ParagraphStyle('HeadTitle', parent=styles['Normal'], fontSize=14, leading=16, textColor=colors.white, fontName='Helvetica-Bold')
+    style_header_sub = ParagraphStyle('HeadSub', parent=styles['Normal'], fontSize=9, leading=11, textColor=colors.whitesmoke)
+    style_h2 = ParagraphStyle('SecTitle', parent=styles['Heading2'], fontSize=11, textColor=colors.HexColor(COR_PRIMARIA_ESCURA), spaceBefore=15, spaceAfter=8, fontName='Helvetica-Bold')
+
+    if "Visão Geral" in str(escopo):
+        titulo_principal = "RELATÓRIO DE PORTFÓLIO (CONSOLIDADO)"
+    else:
+        titulo_principal = f"RELATÓRIO INDIVIDUAL: {str(escopo).upper()}"
+
+    header_content = [[Paragraph(titulo_principal, style_header_title), Paragraph(f"PERÍODO:<br/>{periodo}", style_header_sub)]]
+    t_header = Table(header_content, colWidths=[12*cm, 5*cm])
+    t_header.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,-1), colors.HexColor(COR_PRIMARIA)),
+        ('PADDING', (0,0), (-1,-1), 15),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+        ('ROUNDEDCORNERS', [4, 4, 4, 4]),
+    ]))
+    story.append(t_header)
+    story.append(Spacer(1, 15))
+
+    story.append(Paragraph("RESUMO FINANCEIRO", style_h2))
+    perc_gasto = (custos/vgv*100) if vgv > 0 else 0
+    resumo_data = [
+        ["ORÇAMENTO (VGV)", "GASTO TOTAL", "SALDO / LUCRO", "ROI", "CONSUMO"],
+        fmt_moeda_series(pd.Series([vgv, custos, lucro])).tolist() + [f"{roi:.1f}%", f"{perc_gasto:.1f}%"]
+    ]
+    t_resumo = Table(resumo_data, colWidths=[3.7*cm]*5)
+    t_resumo.setStyle(TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 7),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.grey),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTSIZE', (0,1), (-1,1), 10),
+        ('TEXTCOLOR', (0,1), (-1,1), colors.black),
+        ('BACKGROUND', (0,0), (-1,1), colors.HexColor(COR_FUNDO)),
+        ('BOX', (0,0), (-1,-1), 0.5, colors.lightgrey),
+        ('PADDING', (0,0), (-1,-1), 8),
+    ]))
+    story.append(t_resumo)
+    story.append(Spacer(1, 15))
+
+    if df_cat is not None and not df_cat.empty:
+        story.append(Paragraph("DISTRIBUIÇÃO POR CATEGORIA", style_h2))
+        df_c = df_cat.copy()
+        df_c["Valor"] = fmt_moeda_series(df_c["Valor"])
+        if custos > 0:
+            df_c["%"] = (df_cat["Valor"] / custos * 100).apply(lambda x: f"{x:.1f}%")
+        else:
+            df_c["%"] = "0,0%"
+        cat_data = [["CATEGORIA", "VALOR", "%"]] + df_c[["Categoria", "Valor", "%"]].values.tolist()
+        t_cat = Table(cat_data, colWidths=[10*cm, 4*cm, 3*cm], hAlign='LEFT')
+        t_cat.setStyle(TableStyle([
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0,0), (-1,0), 8),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('BACKGROUND', (0,0), (-1,0), colors.HexColor(COR_SUCESSO)),
+            ('ALIGN', (1,0), (-1,-1), 'RIGHT'),
+            ('GRID', (0,0), (-1,-1), 0.25, colors.lightgrey),
+            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.whitesmoke]),
+            ('PADDING', (0,0), (-1,-1), 6),
+        ]))
+        story.append(t_cat)
+        story.append(Spacer(1, 15))
+
+    tem_lancamentos = df_lanc is not None and not df_lanc.empty
+    if modo_grande is None:
+        modo_grande = tem_lancamentos and len(df_lanc) > PDF_LINHAS_MODO_GRANDE
+
+    blocos_extrato: Iterator[Any] = iter(())
+    if tem_lancamentos and modo_grande:
+        # Extrato começa em página nova; cada bloco ocupa exatamente uma página
+        story.append(PageBreak())
+        story.append(Paragraph("EXTRATO DE LANÇAMENTOS", style_h2))
+        altura_titulo = style_h2.spaceBefore + style_h2.leading + style_h2.spaceAfter
+        blocos_extrato = _blocos_extrato(df_lanc, doc.height - 12, altura_titulo)
+    elif tem_lancamentos:
+        story.append(Paragraph("EXTRATO DE LANÇAMENTOS", style_h2))
+        df_l = df_lanc.copy()
+        for c in COLS_EXTRATO:
+            if c not in df_l.columns:
+                df_l[c] = ""
+
+        df_l["Valor"] = fmt_moeda_series(df_l["Valor"])
+        data_lanc = [COLS_EXTRATO] + df_l[COLS_EXTRATO].values.tolist()
+        data_lanc.append(["", "", "TOTAL DO EXTRATO:", fmt_moeda(custos)])
+
+        t_lanc = Table(data_lanc, colWidths=[2.5*cm, 3.5*cm, 8*cm, 3*cm], repeatRows=1)
+        t_lanc.setStyle(TableStyle(_estilo_extrato(n_linhas_total=1)))
+        story.append(t_lanc)
+    else:
+        story.append(Paragraph("EXTRATO DE LANÇAMENTOS", style_h2))
+        story.append(Paragraph("Nenhum lançamento no período.", styles['Normal']))
+
+    fim_story = []
+    fim_story.append(Spacer(1, 25))
+
+    msg_total = "TOTAL ACUMULADO GASTO (ATÉ EMISSÃO)"
+    total_lbl = Paragraph(
+        f"<b>{msg_total}</b>",
+        ParagraphStyle('TLabel', parent=styles['Normal'], textColor=colors.black, fontSize=10, alignment=TA_RIGHT)
+    )
+    total_val = Paragraph(
+        f"<b>{fmt_moeda(custos)}</b>",
+        ParagraphStyle('TVal', parent=styles['Normal'], textColor=colors.white, fontSize=14, alignment=TA_RIGHT)
+    )
+
+    data_total = [[total_lbl, total_val]]
+    t_total = Table(data_total, colWidths=[12*cm, 5*cm])
+    t_total.setStyle(TableStyle([
+        ('BACKGROUND', (1,0), (1,0), colors.HexColor(COR_FUNDO_ESCURO)),
+        ('BACKGROUND', (0,0), (0,0), colors.white),
+        ('LINEBELOW', (0,0), (1,0), 2, colors.HexColor(COR_FUNDO_ESCURO)),
+        ('TOPPADDING', (0,0), (-1,-1), 12),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 12),
+        ('RIGHTPADDING', (0,0), (-1,-1), 10),
+        ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
+    ]))
+    fim_story.append(KeepTogether([t_total]))
+
+    fim_story.append(Spacer(1, 40))
+
+    sig_data = [
+        ["_______________________________________", "_______________________________________"],
+        ["GESTOR RESPONSÁVEL", "DIRETORIA FINANCEIRA"],
+        [f"Data: {date.today().strftime('%d/%m/%Y')}", "Data: ____/____/________"]
+    ]
+    t_sig = Table(sig_data, colWidths=[8.5*cm, 8.5*cm])
+    t_sig.setStyle(TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,1), (-1,-1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,1), (-1,-1), 8),
+        ('TEXTCOLOR', (0,1), (-1,-1), colors.grey),
+    ]))
+    fim_story.append(t_sig)
+
+    # No modo grande os blocos são gerados durante o build, não todos de uma vez
+    story = _StoryIncremental(story, chain(blocos_extrato, fim_story))
+    doc.build(story, canvasmaker=EnterpriseCanvas)
+    return buffer.getvalue()
+
+
+def _estilo_extrato(n_linhas_total: int) -> List[Any]:
+    """Estilo da tabela de extrato; as últimas n_linhas_total são linhas de total."""
+    from reportlab.lib import colors
+
+    ult = -n_linhas_total - 1
+    return [
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 8),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor(COR_PRIMARIA)),
+        ('FONTSIZE', (0,1), (-1,-1), 8),
+        ('ALIGN', (-1,0), (-1,-1), 'RIGHT'),
+        ('GRID', (0,0), (-1,ult), 0.25, colors.lightgrey),
+        ('ROWBACKGROUNDS', (0,1), (-1,ult), [colors.white, colors.whitesmoke]),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('FONTNAME', (0,ult+1), (-1,-1), 'Helvetica-Bold'),
+        ('BACKGROUND', (0,ult+1), (-1,-1), colors.HexColor(COR_CINZA_CLARO)),
+        ('TEXTCOLOR', (2,ult+1), (-1,-1), colors.black),
+        ('ALIGN', (2,ult+1), (2,-1), 'RIGHT'),
+        ('LINEABOVE', (0,ult+1), (-1,ult+1), 1, colors.black),
+    ]
+
+
+def _blocos_extrato(df_lanc: pd.DataFrame, altura_util: float, altura_titulo: float) -> Iterator[Any]:
+    """
+    Gera o extrato em blocos de uma página (modo de relatório grande).
+
+    Cada bloco é uma tabela com cabeçalho, as linhas da página, o subtotal da
+    página e o acumulado até ela. As linhas têm altura fixa e a descrição é
+    truncada, então a quantidade por página é conhecida sem medir o texto e o
+    ReportLab não precisa calcular o layout célula a célula.
+
+    Args:
+        df_lanc: Lançamentos do extrato
+        altura_util: Altura disponível no frame da página (pt)
+        altura_titulo: Espaço ocupado pelo título da seção na primeira página
+
+    Yields:
+        Tabelas (e quebras de página) prontas para o doc.build()
+    """
+    from reportlab.lib.units import cm
+    from reportlab.platypus import PageBreak, Table, TableStyle
+
+    n_fixas = 3  # cabeçalho + subtotal + acumulado
+    por_pagina = max(1, int(altura_util // PDF_ALTURA_LINHA) - n_fixas)
+    primeira = max(1, int((altura_util - altura_titulo) // PDF_ALTURA_LINHA) - n_fixas)
+
+    estilo = TableStyle(_estilo_extrato(n_linhas_total=2))
+    larguras = [2.5*cm, 3.5*cm, 8*cm, 3*cm]
+    total = len(df_lanc)
+    acumulado = 0.0
+    inicio = 0
+    tamanho = primeira
+
+    while inicio < total:
+        bloco = df_lanc.iloc[inicio:inicio + tamanho].reindex(columns=COLS_EXTRATO, fill_value="")
+        valores = parse_moeda_series(bloco["Valor"])
+        subtotal = float(valores.sum())
+        acumulado += subtotal
+
+        descricao = bloco["Descrição"].astype(str)
+        longas = descricao.str.len() > PDF_MAX_CHARS_DESCRICAO
+        descricao = descricao.where(~longas, descricao.str.slice(0, PDF_MAX_CHARS_DESCRICAO - 1) + "…")
+
+        # Valores da página + subtotal + acumulado formatados numa única passada
+        textos = fmt_moeda_series(pd.concat([valores, pd.Series([subtotal, acumulado])], ignore_index=True)).tolist()
+
+        linhas = [COLS_EXTRATO] + list(zip(
+            bloco["Data"].astype(str),
+            bloco["Categoria"].astype(str),
+            descricao,
+            textos[:-2],
+        ))
+        linhas.append(["", "", "SUBTOTAL (Página):", textos[-2]])
+        linhas.append(["", "", "ACUMULADO:", textos[-1]])
+
+        t = Table(linhas, colWidths=larguras, rowHeights=[PDF_ALTURA_LINHA] * len(linhas))
+        t.setStyle(estilo)
+        yield t
+
+        inicio += tamanho
+        tamanho = por_pagina
+        if inicio < total:
+            yield PageBreak()
@@ -0,0 +1,635 @@
+"""
+Snapshot dos dados do processo com atualização em segundo plano
+(stale-while-revalidate).
+
+As sessões recebem sempre o último snapshot bom, sem esperar o Google
+Sheets. Uma thread do processo recarrega as abas:
+
+- antes de o snapshot expirar (SNAPSHOT_ANTECEDENCIA_S antes do TTL),
+  enquanto houver sessões usando os dados: releitura completa
+  (forcar_completo), a que capta edições feitas direto na planilha;
+- logo após uma escrita (nova_versao), que avança a versão desejada; só as
+  abas alteradas são relidas, as demais vêm do snapshot anterior;
+- quando uma sessão recebe um snapshot vencido (processo ocioso).
+
+A troca é atômica: a versão nova só fica visível depois de carregada por
+inteiro. Em falha, o snapshot anterior continua servido e a thread tenta de
+novo com backoff. Só a primeira carga do processo (nenhum snapshot ainda)
+bloqueia quem pediu.
+
+Com um ArquivoSnapshot, a thread grava cada versão publicada em disco
+(Arrow IPC, uma tabela por aba). Na partida seguinte do processo a primeira
+sessão recebe essa cópia, lida por memory-map, e a thread a revalida contra
+o repositório em segundo plano.
+
+Com uma VersaoCompartilhada (versao_compartilhada.py), as versões são
+numeradas por um contador comum às réplicas: uma escrita em qualquer
+processo invalida o snapshot em todos. As abas alteradas por outra réplica
+são relidas por completo (o delta do repositório desta não vê edições de
+linhas que ela não gravou). Com o diretório da cópia em disco também comum,
+só a réplica que obtém a reserva relê o repositório; as demais adotam a
+cópia que ela grava.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from fila_escrita import espera_backoff
+from instrumentacao import registrar_cache
+from limite_api import PRIORIDADE_LOTE, operacao
+from versao_compartilhada import VersaoCompartilhada
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PARÂMETROS DA ATUALIZAÇÃO
+# ==============================================================================
+SNAPSHOT_ANTECEDENCIA_S = 20.0  # Recarrega este tempo antes de o snapshot expirar
+SNAPSHOT_OCIOSO_S = 600.0       # Sem acessos há mais que isto: para de recarregar por idade
+SNAPSHOT_VERIFICAR_S = 30.0     # Intervalo máximo entre verificações da thread
+SNAPSHOT_SINCRONIZAR_S = 1.0    # Com versão compartilhada: intervalo máximo entre consultas às outras réplicas
+SNAPSHOT_RESERVA_S = 120.0      # Validade da reserva de recarga (processo que cai no meio dela)
+SNAPSHOT_AGUARDAR_S = 0.5       # Outro processo está relendo: nova verificação da cópia em disco
+
+ABAS = ("Obras", "Financeiro")  # Ordem das tabelas do snapshot
+
+# Formato dos arquivos em disco: mudar quando o schema das tabelas (esquema.py)
+# mudar, para que cópias antigas sejam ignoradas em vez de servidas
+SNAPSHOT_FORMATO = 1
+
+Tabelas = Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]
+
+
+# ==============================================================================
+# CÓPIA EM DISCO (partida a quente)
+# ==============================================================================
+class ArquivoSnapshot:
+    """
+    Último snapshot bom em disco: um arquivo Arrow IPC por aba e um índice JSON.
+
+    As tabelas de cada gravação têm nomes próprios; o índice (atual.json) é
+    trocado por último, com os.replace, então quem lê nunca combina abas de
+    versões diferentes, mesmo com vários processos gravando no diretório.
+    O pyarrow só é importado aqui; sem ele a cópia em disco fica desligada.
+    """
+
+    INDICE = "atual.json"
+
+    def __init__(self, diretorio: str):
+        """
+        Args:
+            diretorio: Diretório dos arquivos (criado se não existir)
+        """
+        self.diretorio = diretorio
+        self._desligado = False
+
+    def _pyarrow(self) -> Any:
+        if self._desligado:
+            return None
+        try:
+            import pyarrow
+            import pyarrow.ipc  # noqa: F401
+            return pyarrow
+        except ImportError:
+            logger.warning("pyarrow não instalado: snapshot em disco desligado")
+            self._desligado = True
+            return None
+
+    def salvar(self, versao: int, df_o: pd.DataFrame, df_f: pd.DataFrame, lido_em: float) -> bool:
+        """
+        Grava o snapshot (substitui o anterior, se não for mais novo).
+
+        Args:
+            versao: Versão dos dados
+            df_o, df_f: Tabelas normalizadas
+            lido_em: Epoch da última leitura de todas as abas
+
+        Returns:
+            True se gravou
+        """
+        pa = self._pyarrow()
+        if pa is None:
+            return False
+        atual = self.indice()
+        if atual is not None and atual["versao"] > versao:
+            return False  # Outro processo já gravou uma versão mais nova
+        os.makedirs(self.diretorio, exist_ok=True)
+        tag = f"{versao}-{uuid.uuid4().hex[:8]}"
+        arquivos = {}
+        for aba, df in zip(ABAS, (df_o, df_f)):
+            nome = f"{aba.lower()}.{tag}.arrow"
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(os.path.join(self.diretorio, nome), "wb") as destino:
+                with pa.ipc.new_file(destino, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+            arquivos[aba] = nome
+        indice = {"formato": SNAPSHOT_FORMATO, "versao": versao, "lido_em": lido_em, "arquivos": arquivos}
+        temporario = os.path.join(self.diretorio, f"{self.INDICE}.{tag}")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(indice, f)
+        os.replace(temporario, os.path.join(self.diretorio, self.INDICE))
+        self._limpar(set(arquivos.values()))
+        return True
+
+    def indice(self) -> Optional[Dict[str, Any]]:
+        """
+        Índice do último snapshot gravado, sem ler as tabelas.
+
+        Returns:
+            Dict com "versao", "lido_em" (epoch) e "arquivos", ou None se não
+            há cópia (ou é de outro formato)
+        """
+        caminho = os.path.join(self.diretorio, self.INDICE)
+        try:
+            with open(caminho, encoding="utf-8") as f:
+                indice = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Índice do snapshot em disco ilegível, ignorado: {e}")
+            return None
+        if indice.get("formato") != SNAPSHOT_FORMATO:
+            logger.info("Snapshot em disco de outro formato: ignorado")
+            return None
+        return indice
+
+    def carregar(self) -> Optional[Tuple[int, pd.DataFrame, pd.DataFrame, float]]:
+        """
+        Lê o último snapshot gravado (memory-map).
+
+        Returns:
+            Tupla (versão, df_obras, df_fin, lido_em epoch), ou None se não há
+            cópia válida (ausente, de outro formato ou ilegível)
+        """
+        indice = self.indice()
+        if indice is None:
+            return None
+        pa = self._pyarrow()
+        if pa is None:
+            return None
+        try:
+            tabelas = []
+            for aba in ABAS:
+                with pa.memory_map(os.path.join(self.diretorio, indice["arquivos"][aba])) as origem:
+                    tabelas.append(pa.ipc.open_file(origem).read_all().to_pandas())
+            return int(indice["versao"]), tabelas[0], tabelas[1], float(indice["lido_em"])
+        except Exception as e:  # Cópia corrompida ou incompleta: segue sem ela
+            logger.warning(f"Snapshot em disco ilegível, ignorado: {e}")
+            return None
+
+    def _limpar(self, manter: set) -> None:
+        """Remove tabelas de gravações anteriores (as de outro processo gravando agora ficam)."""
+        limite = time.time() - 60
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(".arrow") and nome not in manter:
+                caminho = os.path.join(self.diretorio, nome)
+                try:
+                    if os.path.getmtime(caminho) < limite:
+                        os.remove(caminho)
+                except OSError:
+                    pass
+
+
+# ==============================================================================
+# SNAPSHOT
+# ==============================================================================
+class SnapshotDados:
+    """
+    Versões dos dados (df_obras, df_fin) compartilhadas pelas sessões do processo.
+
+    "versao" é a versão desejada (avança a cada escrita e a cada expiração);
+    "publicada" é a mais nova já carregada. Quando versao > publicada, a
+    thread está (ou vai estar) carregando a versão nova.
+    """
+
+    def __init__(
+        self,
+        carregar: Callable[[Optional[FrozenSet[str]], bool], Tabelas],
+        ttl_s: float,
+        retidas: int = 2,
+        antecedencia_s: float = SNAPSHOT_ANTECEDENCIA_S,
+        iniciar: bool = True,
+        arquivo: Optional[ArquivoSnapshot] = None,
+        compartilhado: Optional[VersaoCompartilhada] = None,
+    ):
+        """
+        Args:
+            carregar: Busca e normaliza as abas pedidas (None: todas), devolvendo
+                (df_obras, df_fin) com None nas não pedidas; levanta exceção em
+                falha. O segundo argumento pede leitura completa (sem delta)
+            ttl_s: Idade a partir da qual o snapshot é considerado vencido
+            retidas: Versões mantidas para sessões que ainda não recarregaram
+            antecedencia_s: Quanto antes do TTL a thread recarrega
+            iniciar: Se True, inicia a thread de atualização
+            arquivo: Cópia em disco para partidas a quente (None: desligada)
+            compartilhado: Versão comum às réplicas (None: versões só deste
+                processo); com arquivo num diretório comum, as réplicas
+                adotam a cópia em disco umas das outras em vez de reler
+        """
+        self.carregar = carregar
+        self.ttl_s = ttl_s
+        self.retidas = max(1, retidas)
+        self.antecedencia_s = min(antecedencia_s, ttl_s)
+        self.arquivo = arquivo
+        self._gravada: Optional[int] = None  # Versão já gravada em disco
+        self.compartilhado = compartilhado
+        self._sincronizada = 0  # Última versão compartilhada já consultada
+        self._dono = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"  # Identifica o processo na reserva
+        self._lock = threading.Lock()
+        self._carga = threading.Lock()  # Uma carga por vez (sessões e thread)
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._snapshots: "OrderedDict[int, Tuple[pd.DataFrame, pd.DataFrame, float]]" = OrderedDict()
+        self.versao = 0
+        self.publicada: Optional[int] = None
+        self.atualizando = False
+        self._pendentes: Optional[set] = set()  # Abas alteradas desde a última carga (None: todas)
+        self._completo = False  # A próxima carga das pendentes ignora o delta (forcar_completo)
+        self.ultimo_acesso = time.monotonic()
+        self.ultimo_erro: Optional[str] = None
+        self._falhas = 0
+        self._retomar_em = 0.0  # Após falha: sem novas tentativas antes disto (monotonic)
+        self._thread: Optional[threading.Thread] = None
+        if iniciar:
+            self.iniciar()
+
+    # --------------------------------------------------------------------------
+    # API pública
+    # --------------------------------------------------------------------------
+    def obter(self, versao_sessao: Optional[int] = None) -> Tuple[int, pd.DataFrame, pd.DataFrame]:
+        """
+        Snapshot somente leitura para uma sessão.
+
+        A sessão continua na sua versão enquanto ela estiver retida (uma
+        edição em andamento não muda sob o usuário). Senão recebe a versão
+        publicada mais nova, mesmo que vencida ou anterior a uma escrita (a
+        thread é acordada para recarregar). Só espera o repositório quando
+        ainda não há snapshot algum.
+
+        Args:
+            versao_sessao: Versão registrada na sessão (None para sessão nova)
+
+        Returns:
+            Tupla (versão, df_obras, df_fin)
+        """
+        with self._lock:
+            self.ultimo_acesso = time.monotonic()
+            if versao_sessao in self._snapshots:
+                df_o, df_f, _ = self._snapshots[versao_sessao]
+                registrar_cache("snapshot", acerto=True)
+                return versao_sessao, df_o, df_f
+            if self.publicada is not None:
+                df_o, df_f, _ = self._snapshots[self.publicada]
+                if self._defasado():
+                    self._acordar.set()
+                registrar_cache("snapshot", acerto=True)
+                return self.publicada, df_o, df_f
+
+        with self._carga:  # Primeira carga: as demais sessões aguardam e reaproveitam
+            with self._lock:
+                if self.publicada is not None:
+                    df_o, df_f, _ = self._snapshots[self.publicada]
+                    registrar_cache("snapshot", acerto=True)
+                    return self.publicada, df_o, df_f
+            self.sincronizar()  # Parte da versão mais nova entre as réplicas
+            with self._lock:
+                versao = self.versao
+                self._pendentes = set()  # A primeira carga lê todas as abas, por completo
+                self._completo = False
+            copia = self.arquivo.carregar() if self.arquivo is not None else None
+            if copia is not None:
+                return self._restaurar(*copia)
+            registrar_cache("snapshot", acerto=False)
+            df_o, df_f = self.carregar(None, True)
+            self._publicar(versao, df_o, df_f)
+        if self.arquivo is not None:
+            self._acordar.set()  # A thread grava a cópia em disco
+        return versao, df_o, df_f
+
+    def nova_versao(self, abas: Optional[Iterable[str]] = None, completo: bool = False) -> int:
+        """
+        Avança a versão desejada após uma escrita e acorda a thread para recarregar.
+
+        Args:
+            abas: Abas alteradas (None: todas); só elas são relidas
+            completo: Relê as abas por completo, sem delta (ressincronização
+                pedida pelo usuário, releitura por idade)
+
+        Returns:
+            Nova versão
+        """
+        if self.compartilhado is not None:
+            # A versão vem do contador comum (com o pedido de releitura
+            # completa, que vale para todas as réplicas); sincronizar
+            # incorpora junto as escritas concorrentes de outras réplicas
+            versao = self.compartilhado.avancar(abas, completo=completo, dono=self._dono)
+            self.sincronizar()
+            self._acordar.set()
+            return versao
+        with self._lock:
+            if abas is None or self._pendentes is None:
+                self._pendentes = None
+            else:
+                self._pendentes.update(abas)
+            self._completo = self._completo or completo
+            self.versao += 1
+            versao = self.versao
+        self._acordar.set()
+        return versao
+
+    def sincronizar(self) -> bool:
+        """
+        Incorpora as escritas das outras réplicas (versão compartilhada).
+
+        As abas alteradas nas versões posteriores à publicada passam a
+        pendentes e a versão desejada avança até a mais nova entre as réplicas.
+        Se alguma foi alterada por outra réplica (ou a releitura completa foi
+        pedida), a próxima carga ignora o delta.
+
+        Returns:
+            True se há versão nova a carregar (sempre False sem versão compartilhada)
+        """
+        if self.compartilhado is None:
+            return False
+        with self._lock:
+            desde = max(self._sincronizada, self.publicada or 0)
+        atual, abas, completo = self.compartilhado.alteracoes(desde, self._dono)
+        with self._lock:
+            self._sincronizada = max(self._sincronizada, atual)
+            if abas is None or abas:  # Versões só com o número reservado não pedem recarga
+                if abas is None or self._pendentes is None:
+                    self._pendentes = None
+                else:
+                    self._pendentes.update(abas)
+                self._completo = self._completo or completo
+                self.versao = max(self.versao, atual)
+            return self.publicada is not None and self.publicada < self.versao
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Resumo do snapshot para a interface.
+
+        Returns:
+            Dict com "versao", "publicada", "carregado_em" (epoch da última
+            releitura completa do snapshot publicado, None se nenhum),
+            "idade_s", "vencido", "atualizando" e "ultimo_erro"
+        """
+        with self._lock:
+            idade = self._idade()
+            return {
+                "versao": self.versao,
+                "publicada": self.publicada,
+                "carregado_em": time.time() - idade if idade is not None else None,
+                "idade_s": idade,
+                "vencido": idade is not None and idade >= self.ttl_s,
+                "atualizando": self.atualizando or (self.publicada is not None and self.publicada < self.versao),
+                "ultimo_erro": self.ultimo_erro,
+            }
+
+    def atualizar(self, forcar: bool = False) -> Optional[float]:
+        """
+        Recarrega e publica uma versão nova, se preciso (a thread chama em laço).
+
+        Args:
+            forcar: Recarrega mesmo com o snapshot em dia
+
+        Returns:
+            Segundos até a próxima atualização prevista (None se nada previsto)
+        """
+        with self._carga:
+            if self.compartilhado is None:
+                return self._recarregar(forcar)
+            self.sincronizar()
+            with self._lock:
+                if self.publicada is None:
+                    return None
+                espera = max(self._espera(), self._retomar_em - time.monotonic())
+                if not forcar and espera > 0:
+                    return espera if self._ativo() else None
+            if self.arquivo is None:
+                # Sem cópia comum ninguém adota a releitura desta réplica: a
+                # recarga por idade só reserva um número de versão, sem fazer
+                # as demais relerem também
+                with self._lock:
+                    por_idade = self.publicada >= self.versao
+                if por_idade:
+                    versao = self.compartilhado.avancar((), dono=self._dono)
+                    with self._lock:
+                        self.versao = max(self.versao, versao)
+                return self._recarregar(forcar)
+            if not forcar and self._adotar():
+                return self._proxima()
+            # Uma réplica relê por vez; as demais adotam a cópia que ela grava
+            if not self.compartilhado.reservar(self._dono, SNAPSHOT_RESERVA_S):
+                return SNAPSHOT_AGUARDAR_S
+            try:
+                self.sincronizar()
+                if not forcar and self._adotar():  # Gravada entre a verificação e a reserva
+                    return self._proxima()
+                with self._lock:
+                    por_idade = self.publicada >= self.versao
+                if por_idade:
+                    # Versão nova em todas as réplicas: adotam a releitura completa desta
+                    self.nova_versao(completo=True)
+                espera = self._recarregar(forcar)
+                self._gravar()
+                return espera
+            finally:
+                self.compartilhado.liberar(self._dono)
+
+    def iniciar(self) -> None:
+        """Inicia a thread de atualização."""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._laco, name="snapshot-dados", daemon=True)
+            self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None) -> None:
+        """Encerra a thread de atualização (o snapshot publicado continua servido)."""
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # --------------------------------------------------------------------------
+    # Internos (_idade, _ativo, _defasado e _espera são chamados com self._lock)
+    # --------------------------------------------------------------------------
+    def _idade(self) -> Optional[float]:
+        if self.publicada is None:
+            return None
+        return time.monotonic() - self._snapshots[self.publicada][2]
+
+    def _ativo(self) -> bool:
+        """Houve acesso recente (vale a pena recarregar antes de vencer)."""
+        return time.monotonic() - self.ultimo_acesso < SNAPSHOT_OCIOSO_S
+
+    def _defasado(self) -> bool:
+        """Há escrita não refletida ou o snapshot já venceu."""
+        idade = self._idade()
+        return self.publicada is not None and (self.publicada < self.versao or idade >= self.ttl_s)
+
+    def _espera(self) -> float:
+        """Segundos até a recarga antecipada (0: recarregar já)."""
+        if self.publicada is None or self._defasado():
+            return 0.0
+        return max(0.0, self.ttl_s - self.antecedencia_s - self._idade())
+
+    def _publicar(self, versao: int, df_o: pd.DataFrame, df_f: pd.DataFrame, lido_em: Optional[float] = None) -> None:
+        """Torna a versão carregada visível para as sessões (troca atômica)."""
+        with self._lock:
+            self._snapshots[versao] = (df_o, df_f, time.monotonic() if lido_em is None else lido_em)
+            self._snapshots.move_to_end(versao)
+            while len(self._snapshots) > self.retidas:
+                self._snapshots.popitem(last=False)
+            self.publicada = max(versao, self.publicada if self.publicada is not None else versao)
+
+    def _restaurar(
+        self, versao: int, df_o: pd.DataFrame, df_f: pd.DataFrame, lido_em: float
+    ) -> Tuple[int, pd.DataFrame, pd.DataFrame]:
+        """
+        Publica a cópia do disco na partida e marca o que a thread deve revalidar.
+
+        Sem versão compartilhada, a cópia é de outra execução: relê tudo. Com
+        ela, só as abas alteradas pelas réplicas depois da cópia (ou tudo, se
+        a cópia já venceu ou o contador é mais antigo que ela).
+        """
+        if self.compartilhado is not None:
+            atual, pendentes, completo = self.compartilhado.alteracoes(versao, self._dono)
+            if versao > atual:  # Contador recriado: a numeração da cópia não vale mais
+                versao = atual
+                atual = self.compartilhado.avancar(completo=True, dono=self._dono)
+                pendentes, completo = None, True
+        self._publicar_copia(versao, df_o, df_f, lido_em)
+        with self._lock:
+            if self.compartilhado is None:
+                self.versao = max(self.versao, versao) + 1
+                self._pendentes = None
+            elif pendentes is None or pendentes:
+                self.versao = max(self.versao, atual)
+                self._pendentes = None if pendentes is None else set(pendentes)
+                self._completo = completo
+        self._acordar.set()
+        registrar_cache("snapshot_disco", acerto=True)
+        logger.info(f"Snapshot: versão {versao} restaurada do disco, revalidando em segundo plano")
+        return versao, df_o, df_f
+
+    def _publicar_copia(self, versao: int, df_o: pd.DataFrame, df_f: pd.DataFrame, lido_em: float) -> None:
+        """Publica uma cópia lida do disco (já gravada: a thread não a regrava)."""
+        # A idade continua contando da leitura feita por quem gravou a cópia
+        self._publicar(versao, df_o, df_f, time.monotonic() - max(0.0, time.time() - lido_em))
+        with self._lock:
+            self._gravada = versao
+
+    def _adotar(self) -> bool:
+        """
+        Publica a cópia em disco gravada por outra réplica, se ela cobre a versão desejada.
+
+        Returns:
+            True se adotou (nenhuma leitura do repositório é necessária)
+        """
+        if self.arquivo is None:
+            return False
+        indice = self.arquivo.indice()
+        with self._lock:
+            if indice is None or indice["versao"] < self.versao or indice["versao"] <= self.publicada:
+                return False
+        copia = self.arquivo.carregar()
+        if copia is None:
+            return False
+        versao = copia[0]
+        self._publicar_copia(*copia)
+        with self._lock:
+            if versao >= self.versao:
+                self._pendentes = set()
+                self._completo = False
+        registrar_cache("snapshot_compartilhado", acerto=True)
+        return True
+
+    def _proxima(self) -> float:
+        """Segundos até a próxima atualização (0: há versão nova a carregar)."""
+        with self._lock:
+            return 0.0 if self._defasado() else self._espera()
+
+    def _gravar(self) -> None:
+        """Grava em disco a versão publicada, se ainda não gravada (só a thread chama)."""
+        with self._lock:
+            if self.arquivo is None or self.publicada is None or self.publicada == self._gravada:
+                return
+            versao = self.publicada
+            df_o, df_f, lido_em = self._snapshots[versao]
+            lido_em = time.time() - (time.monotonic() - lido_em)
+        try:
+            self.arquivo.salvar(versao, df_o, df_f, lido_em)
+        except Exception as e:  # Disco cheio, sem permissão...: segue só em memória
+            logger.warning(f"Snapshot: falha ao gravar em disco: {e}")
+        self._gravada = versao  # Em falha também: tenta de novo só na próxima versão
+
+    def _recarregar(self, forcar: bool) -> Optional[float]:
+        """Recarrega do repositório, se preciso (chamado com self._carga)."""
+        with self._lock:
+            if self.publicada is None:
+                return None  # A primeira carga é feita por quem pede (obter)
+            espera = max(self._espera(), self._retomar_em - time.monotonic())
+            if not forcar and espera > 0:
+                return espera if self._ativo() else None
+            if self.publicada >= self.versao:
+                self.versao += 1  # Recarga por idade: versão nova para a releitura completa
+            # Perto de vencer (ou forçada) relê todas as abas por completo: o
+            # delta só vê linhas novas e as gravadas por este processo, não
+            # células editadas direto na planilha. Após escritas, só as abas
+            # alteradas, pelo delta
+            por_idade = forcar or self._idade() >= self.ttl_s - self.antecedencia_s
+            abas = None if por_idade or self._pendentes is None else frozenset(self._pendentes)
+            completo = por_idade or self._completo
+            self._pendentes = set()
+            self._completo = False
+            versao = self.versao
+            anterior = self._snapshots[self.publicada]
+            self.atualizando = True
+        try:
+            # Ninguém está esperando esta leitura: cede a cota às leituras interativas
+            with operacao(prioridade=PRIORIDADE_LOTE):
+                tabelas = self.carregar(abas, completo)
+            df_o, df_f = (novo if novo is not None else antigo for novo, antigo in zip(tabelas, anterior))
+            # A idade conta da última releitura completa de todas as abas (só ela capta edições externas)
+            lido_em = None if completo and abas is None else anterior[2]
+        except Exception as e:
+            with self._lock:  # As abas desta carga continuam pendentes
+                self._pendentes = None if abas is None or self._pendentes is None else self._pendentes | abas
+                self._completo = self._completo or completo
+            self._falhas += 1
+            self.ultimo_erro = f"{type(e).__name__}: {e}"
+            espera = espera_backoff(self._falhas)
+            self._retomar_em = time.monotonic() + espera
+            logger.warning(f"Snapshot: falha ao atualizar, servindo o anterior; nova tentativa em {espera:.1f}s ({e})")
+            return espera
+        finally:
+            with self._lock:
+                self.atualizando = False
+        self._falhas = 0
+        self.ultimo_erro = None
+        self._publicar(versao, df_o, df_f, lido_em)
+        return self._proxima()
+
+    def _laco(self) -> None:
+        while not self._parar.is_set():
+            try:
+                espera = self.atualizar()
+                if espera != 0.0:
+                    self._gravar()  # Sem outra carga na frente: grava a versão publicada
+            except Exception as e:  # Falha inesperada: não derruba a thread
+                logger.error(f"Snapshot: erro na thread de atualização: {e}")
+                espera = SNAPSHOT_VERIFICAR_S
+            if espera == 0.0:
+                continue
+            # Com versão compartilhada, consulta as outras réplicas com mais frequência
+            maximo = SNAPSHOT_VERIFICAR_S if self.compartilhado is None else SNAPSHOT_SINCRONIZAR_S
+            self._acordar.wait(maximo if espera is None else min(espera, maximo))
+            self._acordar.clear()
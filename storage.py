@@ -0,0 +1,1240 @@
+"""
+Camada de armazenamento do GESTOR PRO.
+
+O app fala apenas com a interface `Repositorio`. Há dois motores:
+
+- `SheetsRepositorio`: Google Sheets (planilha "GestorObras_DB"), com
+  sincronização incremental, leitura das duas abas numa única requisição
+  (carregar_tudo) e escritas em lote;
+- `SQLiteRepositorio`: arquivo SQLite local, indexado por ID, Data e
+  Obra Vinculada. Serve como base primária local, réplica de leitura ou
+  para benchmarks offline sem a latência do Sheets.
+"""
+import functools
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from limite_api import operacao
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SCHEMA DAS ABAS
+# ==============================================================================
+OBRAS_COLS = [
+    "ID", "Cliente", "Endereço", "Status", "Valor Total",
+    "Data Início", "Prazo", "Area Construida", "Area Terreno",
+    "Quartos", "Custo Previsto"
+]
+
+FIN_COLS = ["ID", "Data", "Tipo", "Categoria", "Descrição", "Valor", "Obra Vinculada", "Fornecedor", "Forma Pagamento"]
+
+# Sincronização incremental das abas. O delta não tem marcador de alteração:
+# só capta linhas anexadas, IDs desconhecidos e linhas gravadas por este
+# processo (marcar_alterados). Células editadas direto na planilha só aparecem
+# numa leitura completa: a do snapshot ao vencer (forcar_completo, a cada
+# SNAPSHOT_TTL_S no app) ou, para quem nunca força, após SYNC_FULL_INTERVAL_S.
+SYNC_FULL_INTERVAL_S = 900      # Teto sem leitura completa para quem não passa forcar_completo
+SYNC_DELTA_MAX_FRACAO = 0.5     # Acima desta fração de linhas a buscar, baixa a aba inteira
+
+# Leitura tipada (UNFORMATTED_VALUE): números chegam como números e datas como
+# número de série (dias desde 30/12/1899), sem texto formatado para reinterpretar
+LEITURA_TIPADA = {"valueRenderOption": "UNFORMATTED_VALUE", "dateTimeRenderOption": "SERIAL_NUMBER"}
+_LEITURA_TIPADA_WS = {"value_render_option": "UNFORMATTED_VALUE", "date_time_render_option": "SERIAL_NUMBER"}
+COLS_DATA = ["Data", "Data Início"]  # Vêm como datetime64 na leitura tipada
+_EPOCA_SHEETS = pd.Timestamp("1899-12-30")
+
+# Schemas já conferidos neste processo: (id da planilha, aba, colunas exigidas).
+# Compartilhado entre sessões e repositórios; o lock serializa a migração.
+_schemas_verificados: set = set()
+_lock_schemas = threading.Lock()
+
+
+# ==============================================================================
+# LEITURAS COALESCIDAS (single-flight)
+# ==============================================================================
+class VooUnico:
+    """
+    Uma execução por chave em andamento: chamadas concorrentes com a mesma
+    chave aguardam a que já está em voo e recebem o mesmo resultado (ou exceção).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._voos: Dict[Hashable, Dict[str, Any]] = {}
+        self.coalescidas = 0
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Executa funcao() ou aguarda a execução em andamento com a mesma chave.
+
+        Args:
+            chave: Identifica chamadas equivalentes (ex.: planilha + método)
+            funcao: Chamada a executar
+
+        Returns:
+            Tupla (resultado, True se esta chamada executou; False se aguardou outra)
+        """
+        with self._lock:
+            voo = self._voos.get(chave)
+            lider = voo is None
+            if lider:
+                voo = self._voos[chave] = {"pronto": threading.Event(), "resultado": None, "erro": None}
+            else:
+                self.coalescidas += 1
+        if not lider:
+            voo["pronto"].wait()
+            if voo["erro"] is not None:
+                raise voo["erro"]
+            return voo["resultado"], False
+        try:
+            voo["resultado"] = funcao()
+        except BaseException as e:
+            voo["erro"] = e
+            raise
+        finally:
+            with self._lock:
+                self._voos.pop(chave, None)
+            voo["pronto"].set()
+        return voo["resultado"], True
+
+
+# Leituras em andamento do processo, por planilha (compartilhado entre repositórios)
+_voos = VooUnico()
+
+
+def _copia_rasa(valor: Any) -> Any:
+    """DataFrames próprios para quem recebeu o resultado de outra chamada (sem copiar os dados)."""
+    if isinstance(valor, pd.DataFrame):
+        return valor.copy(deep=False)
+    if isinstance(valor, tuple):
+        return tuple(_copia_rasa(v) for v in valor)
+    return valor
+
+
+def voo_unico(metodo: Callable) -> Callable:
+    """
+    Decorador das leituras do SheetsRepositorio: uma leitura por planilha e
+    método em andamento; as chamadas concorrentes (várias sessões ao mesmo
+    tempo) aguardam e recebem o mesmo resultado, sem novas requisições.
+    """
+    @functools.wraps(metodo)
+    def envolvido(self, *args: Any, **kwargs: Any) -> Any:
+        chave = (getattr(self.db, "id", id(self.db)), metodo.__name__, args, tuple(sorted(kwargs.items())))
+        resultado, executou = _voos.executar(chave, lambda: metodo(self, *args, **kwargs))
+        return resultado if executou else _copia_rasa(resultado)
+    return envolvido
+
+
+# ==============================================================================
+# INTERFACE
+# ==============================================================================
+class Repositorio(ABC):
+    """
+    Interface de acesso aos dados de Obras e Financeiro.
+
+    Os registros são identificados pelo ID; cada motor decide como localizá-los.
+    Os DataFrames retornados são "brutos" (equivalentes a get_all_records());
+    a conversão de tipos fica a cargo do app.
+    """
+
+    @abstractmethod
+    def garantir_schema(self) -> None:
+        """Garante que o Financeiro tenha ID e todas as colunas de FIN_COLS."""
+
+    @abstractmethod
+    def carregar_obras(self, forcar_completo: bool = False) -> pd.DataFrame:
+        """Retorna os registros da aba Obras."""
+
+    @abstractmethod
+    def carregar_financeiro(self, forcar_completo: bool = False) -> pd.DataFrame:
+        """Retorna os registros da aba Financeiro."""
+
+    def carregar_tudo(self, forcar_completo: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Retorna (obras, financeiro); motores remotos leem as duas abas de uma vez."""
+        return self.carregar_obras(forcar_completo), self.carregar_financeiro(forcar_completo)
+
+    def carregar_abas(self, nomes: Tuple[str, ...], forcar_completo: bool = False) -> Dict[str, pd.DataFrame]:
+        """Retorna {aba: registros} só das abas pedidas ("Obras", "Financeiro")."""
+        carregar = {"Obras": self.carregar_obras, "Financeiro": self.carregar_financeiro}
+        return {nome: carregar[nome](forcar_completo) for nome in nomes}
+
+    @abstractmethod
+    def adicionar_obra(self, valores: List[Any]) -> None:
+        """Acrescenta uma obra (valores na ordem de OBRAS_COLS)."""
+
+    @abstractmethod
+    def adicionar_lancamento(self, valores: List[Any]) -> None:
+        """Acrescenta um lançamento (valores na ordem de FIN_COLS)."""
+
+    def adicionar_obras(self, linhas: List[List[Any]]) -> None:
+        """Acrescenta várias obras de uma vez (padrão: uma a uma)."""
+        for valores in linhas:
+            self.adicionar_obra(valores)
+
+    def adicionar_lancamentos(self, linhas: List[List[Any]]) -> None:
+        """Acrescenta vários lançamentos de uma vez (padrão: um a um)."""
+        for valores in linhas:
+            self.adicionar_lancamento(valores)
+
+    @abstractmethod
+    def ids_existentes(self, aba: str, ids: List[Any]) -> set:
+        """
+        IDs, dentre os informados, que já estão gravados.
+
+        Usado pela fila de gravação para não duplicar uma inclusão reenviada
+        depois de uma falha ambígua (ex.: timeout após o servidor gravar).
+
+        Args:
+            aba: "Obras" ou "Financeiro"
+            ids: IDs a verificar
+
+        Returns:
+            Conjunto com os IDs encontrados (normalizados como str)
+        """
+
+    @abstractmethod
+    def salvar_financeiro(
+        self,
+        atualizacoes: Dict[int, Dict[str, Any]],
+        exclusoes: List[int]
+    ) -> Tuple[int, int]:
+        """
+        Aplica edições e exclusões de lançamentos.
+
+        Args:
+            atualizacoes: {ID: {coluna: valor}} com o registro completo
+            exclusoes: IDs a excluir
+
+        Returns:
+            Tupla (atualizados, excluídos)
+        """
+
+    @abstractmethod
+    def salvar_obras(
+        self,
+        atualizacoes: Dict[int, Dict[str, Any]],
+        renomes: Dict[str, str]
+    ) -> int:
+        """
+        Aplica edições de obras e propaga renomeações para "Obra Vinculada".
+
+        Args:
+            atualizacoes: {ID: {coluna: valor}} com o registro completo
+            renomes: {nome antigo: nome novo}
+
+        Returns:
+            Quantidade de lançamentos renomeados
+        """
+
+    def invalidar(self, aba: Optional[str] = None) -> None:
+        """Descarta caches internos do motor (padrão: nada a fazer)."""
+
+
+# ==============================================================================
+# MOTOR GOOGLE SHEETS
+# ==============================================================================
+def _celula(valor: Any) -> Dict[str, Any]:
+    """Célula no formato do updateCells (número ou texto)."""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return {"userEnteredValue": {"numberValue": valor}}
+    return {"userEnteredValue": {"stringValue": str(valor)}}
+
+
+def plano_migracao_financeiro(
+    header: List[str],
+    n_linhas: int,
+    required_cols: List[str],
+    sheet_id: int,
+    n_colunas_grade: int
+) -> List[Dict[str, Any]]:
+    """
+    Requisições de batchUpdate que levam a aba Financeiro ao schema exigido.
+
+    Sem coluna ID: insere a coluna A com IDs sequenciais (1..n) nas linhas
+    existentes. Colunas que faltam entram no fim do cabeçalho (as células
+    abaixo ficam em branco, sem precisar gravá-las).
+
+    Args:
+        header: Cabeçalho atual (linha 1)
+        n_linhas: Linhas de dados existentes
+        required_cols: Colunas obrigatórias
+        sheet_id: sheetId da aba
+        n_colunas_grade: Colunas da grade da aba (ws.col_count)
+
+    Returns:
+        Lista de requisições (vazia se o schema já está completo)
+    """
+    requests = []
+    deslocamento = 0
+    if "ID" not in header:
+        deslocamento = 1
+        requests.append({
+            "insertDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": 0, "endIndex": 1},
+                "inheritFromBefore": False,
+            }
+        })
+        requests.append({
+            "updateCells": {
+                "rows": [{"values": [_celula(v)]} for v in ["ID"] + list(range(1, n_linhas + 1))],
+                "fields": "userEnteredValue",
+                "start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": 0},
+            }
+        })
+
+    faltando = [c for c in required_cols if c not in header and c != "ID"]
+    if faltando:
+        primeira = len(header) + deslocamento
+        extra = primeira + len(faltando) - (n_colunas_grade + deslocamento)
+        if extra > 0:
+            requests.append({"appendDimension": {"sheetId": sheet_id, "dimension": "COLUMNS", "length": extra}})
+        requests.append({
+            "updateCells": {
+                "rows": [{"values": [_celula(c) for c in faltando]}],
+                "fields": "userEnteredValue",
+                "start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": primeira},
+            }
+        })
+    return requests
+
+
+def ensure_financeiro_schema(ws_fin, required_cols: List[str]) -> bool:
+    """
+    Migração segura: garante ID e colunas novas sem quebrar base antiga (Melhoria 5).
+
+    Uma leitura (cabeçalho e coluna A, que dá o número de linhas de dados) e,
+    só se faltar algo, uma gravação (batchUpdate com todas as alterações).
+
+    Args:
+        ws_fin: Worksheet do gspread para aba Financeiro
+        required_cols: Lista de colunas obrigatórias
+
+    Returns:
+        True se a aba foi alterada
+    """
+    cabecalho, coluna_a = ws_fin.batch_get(["1:1", "A2:A"])
+    header = [str(h).strip() for h in cabecalho[0]] if cabecalho else []
+
+    requests = plano_migracao_financeiro(header, len(coluna_a), required_cols, ws_fin.id, ws_fin.col_count)
+    if not requests:
+        return False
+
+    logger.info(f"Migrando schema da aba {ws_fin.title}: {len(requests)} alteração(ões)")
+    ws_fin.spreadsheet.batch_update({"requests": requests})
+    return True
+
+
+def _chave_id(valor: Any) -> str:
+    """Normaliza o valor da coluna ID para uso como chave ("12", 12 e 12.0 -> "12")."""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def _letra_coluna(col: int) -> str:
+    """Converte índice de coluna (1-based) na letra A1 correspondente (1 -> A, 27 -> AA)."""
+    letras = ""
+    while col > 0:
+        col, resto = divmod(col - 1, 26)
+        letras = chr(ord("A") + resto) + letras
+    return letras
+
+
+def _agrupar_linhas_contiguas(linhas: List[int]) -> List[Tuple[int, int]]:
+    """
+    Agrupa números de linha em intervalos contíguos.
+
+    Examples:
+        >>> _agrupar_linhas_contiguas([2, 3, 4, 8, 10, 11])
+        [(2, 4), (8, 8), (10, 11)]
+    """
+    intervalos: List[Tuple[int, int]] = []
+    for linha in sorted(set(linhas)):
+        if intervalos and linha == intervalos[-1][1] + 1:
+            intervalos[-1] = (intervalos[-1][0], linha)
+        else:
+            intervalos.append((linha, linha))
+    return intervalos
+
+
+def _normalizar_linha(valores: List[Any], n_cols: int, tipada: bool = False) -> List[Any]:
+    """
+    Ajusta a linha ao tamanho do cabeçalho.
+
+    Na leitura formatada converte números como get_all_records(); na tipada
+    os valores já vêm com o tipo da célula.
+    """
+    linha = list(valores[:n_cols]) + [""] * max(0, n_cols - len(valores))
+    if tipada:
+        return linha
+    from gspread.utils import numericise_all  # Só o motor Sheets chega aqui; o SQLite não carrega o gspread
+
+    return numericise_all(linha, default_blank="")
+
+
+def _coluna_data(valores: np.ndarray) -> np.ndarray:
+    """
+    Coluna de datas da leitura tipada como datetime64.
+
+    Células de data chegam como número de série; datas gravadas como texto
+    (o app grava RAW "AAAA-MM-DD") são convertidas pelo pandas; vazio/lixo -> NaT.
+    """
+    eh_numero = np.fromiter(
+        (type(v) in (int, float) for v in valores), dtype=bool, count=len(valores)
+    )
+    datas = np.full(len(valores), np.datetime64("NaT"), dtype="datetime64[ns]")
+    if eh_numero.any():
+        dias = pd.to_timedelta(valores[eh_numero].astype(float), unit="D")
+        datas[eh_numero] = (_EPOCA_SHEETS + dias).to_numpy()
+    texto = ~eh_numero & (valores != "")
+    if texto.any():
+        datas[texto] = pd.to_datetime(pd.Series(valores[texto]).astype(str), errors="coerce").to_numpy()
+    return datas
+
+
+def _tabela_tipada(header: List[str], valores: List[List[Any]]) -> pd.DataFrame:
+    """
+    DataFrame de uma aba lida com LEITURA_TIPADA, montado coluna a coluna.
+
+    Colunas só com números viram int64/float64 (parse_moeda_series não
+    precisa olhar célula por célula), as de COLS_DATA viram datetime64 e o
+    resto fica como veio (texto, ou números misturados com vazios).
+
+    Args:
+        header: Cabeçalho da aba
+        valores: Linhas de dados já com o tamanho do cabeçalho
+
+    Returns:
+        DataFrame com as colunas de header
+    """
+    if len(set(header)) != len(header):
+        return pd.DataFrame(valores, columns=header)
+    colunas = list(zip(*valores)) if valores else [()] * len(header)
+    dados = {}
+    for nome, coluna in zip(header, colunas):
+        arr = np.array(coluna, dtype=object)
+        if nome in COLS_DATA:
+            dados[nome] = _coluna_data(arr)
+            continue
+        tipo = pd.api.types.infer_dtype(arr, skipna=False)
+        if tipo == "integer":
+            arr = arr.astype(np.int64)
+        elif tipo in ("floating", "mixed-integer-float"):
+            arr = arr.astype(float)
+        dados[nome] = arr
+    return pd.DataFrame(dados, columns=header)
+
+
+def _faixa_aba(nome: str) -> str:
+    """Aba inteira em notação A1 ("'Obras'")."""
+    return "'" + nome.replace("'", "''") + "'"
+
+
+def _estado_de_linhas(todos: List[List[Any]], tipada: bool) -> Dict[str, Any]:
+    """Marca d'água de uma leitura completa (cabeçalho + linhas, como a API devolve)."""
+    header = list(todos[0]) if todos else []
+    valores = [_normalizar_linha(r, len(header), tipada) for r in todos[1:]]
+    return _montar_estado(header, valores, completo_em=time.time(), tipada=tipada)
+
+
+def _montar_estado(header: List[str], valores: List[List[Any]], completo_em: float, tipada: bool = False) -> Dict[str, Any]:
+    """Monta a marca d'água de uma aba a partir das linhas de dados (sem cabeçalho)."""
+    ids: Optional[List[str]] = None
+    linhas: Dict[str, List[Any]] = {}
+
+    if "ID" in header:
+        idx = header.index("ID")
+        chaves = [_chave_id(v[idx]) for v in valores]
+        # Só é possível sincronizar por delta com IDs preenchidos e únicos
+        if "" not in chaves and len(set(chaves)) == len(chaves):
+            ids = chaves
+            linhas = dict(zip(chaves, valores))
+
+    return {
+        "header": header,
+        "id_col": header.index("ID") + 1 if "ID" in header else None,
+        "ids": ids,
+        "linhas": linhas,
+        "valores": valores,
+        "alteradas": set(),
+        "completo_em": completo_em,
+        "sincronizado_em": time.time(),
+        "tipada": tipada,
+    }
+
+
+def _sincronizar_completo(ws, tipada: bool = False) -> Dict[str, Any]:
+    """Baixa a aba inteira (1 chamada) e reconstrói a marca d'água."""
+    todos = ws.get_all_values(**(_LEITURA_TIPADA_WS if tipada else {}))
+    return _estado_de_linhas(todos, tipada)
+
+
+def _faixas_conferencia(estado: Dict[str, Any]) -> List[str]:
+    """Faixas (relativas à aba) com o cabeçalho e a coluna de IDs, lidas a cada delta."""
+    letra_id = _letra_coluna(estado["id_col"])
+    return ["1:1", f"{letra_id}2:{letra_id}"]
+
+
+def _planejar_delta(
+    estado: Dict[str, Any],
+    cabecalho: List[List[Any]],
+    coluna_ids: List[List[Any]]
+) -> Optional[Tuple[List[str], List[str], List[Tuple[int, int]]]]:
+    """
+    Decide, pelo cabeçalho e pela coluna de IDs atuais, quais linhas buscar.
+
+    Returns:
+        (header, ids, intervalos de linhas a buscar), ou None quando o delta
+        não é confiável (cabeçalho mudou, IDs vazios/duplicados ou mudança grande)
+    """
+    header = list(cabecalho[0]) if cabecalho else []
+    if header != estado["header"]:
+        return None
+
+    ids = [_chave_id(r[0]) if r else "" for r in coluna_ids]
+    if "" in ids or len(set(ids)) != len(ids):
+        return None
+
+    linhas = estado["linhas"]
+    alteradas = estado["alteradas"]
+    buscar = [i + 2 for i, k in enumerate(ids) if k not in linhas or k in alteradas]
+    if buscar and len(buscar) > len(ids) * SYNC_DELTA_MAX_FRACAO:
+        return None
+    return header, ids, _agrupar_linhas_contiguas(buscar)
+
+
+def _faixas_linhas(header: List[str], intervalos: List[Tuple[int, int]]) -> List[str]:
+    """Faixas (relativas à aba) das linhas a buscar, uma por intervalo contíguo."""
+    ultima_col = _letra_coluna(len(header))
+    return [f"A{ini}:{ultima_col}{fim}" for ini, fim in intervalos]
+
+
+def _aplicar_delta(
+    estado: Dict[str, Any],
+    plano: Tuple[List[str], List[str], List[Tuple[int, int]]],
+    blocos: List[List[List[Any]]]
+) -> Dict[str, Any]:
+    """Novo estado com as linhas buscadas (blocos, na ordem dos intervalos) e as já conhecidas."""
+    header, ids, intervalos = plano
+    tipada = estado["tipada"]
+    novas: Dict[str, List[Any]] = {}
+    for (ini, fim), bloco in zip(intervalos, blocos):
+        bloco = list(bloco)
+        for offset, linha in enumerate(range(ini, fim + 1)):
+            bruto = bloco[offset] if offset < len(bloco) else []
+            novas[ids[linha - 2]] = _normalizar_linha(bruto, len(header), tipada)
+
+    linhas = estado["linhas"]
+    valores = [novas[k] if k in novas else linhas[k] for k in ids]
+    return _montar_estado(header, valores, completo_em=estado["completo_em"], tipada=tipada)
+
+
+def _sincronizar_delta(ws, estado: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Sincroniza só as linhas novas ou alteradas desde a última leitura.
+
+    Lê cabeçalho e coluna de IDs numa única chamada; linhas removidas saem do
+    cache, linhas com ID desconhecido ou marcado como alterado são buscadas em
+    um único batch_get agrupado por intervalos contíguos.
+
+    Args:
+        ws: Worksheet do gspread
+        estado: Marca d'água atual da aba
+
+    Returns:
+        Novo estado, ou None quando o delta não é confiável (exige leitura completa)
+    """
+    cabecalho, coluna_ids = ws.batch_get(_faixas_conferencia(estado))
+    plano = _planejar_delta(estado, cabecalho, coluna_ids)
+    if plano is None:
+        return None
+
+    blocos = []
+    if plano[2]:
+        # Mesmo modo de leitura da carga completa: as linhas do cache não misturam tipos
+        blocos = ws.batch_get(_faixas_linhas(plano[0], plano[2]), **(_LEITURA_TIPADA_WS if estado["tipada"] else {}))
+    return _aplicar_delta(estado, plano, blocos)
+
+
+def _valores_lote(resposta: Dict[str, Any]) -> List[List[List[Any]]]:
+    """Valores de cada faixa de um values_batch_get, na ordem pedida."""
+    return [faixa.get("values", []) for faixa in resposta.get("valueRanges", [])]
+
+
+class LocalizadorLinhas:
+    """
+    Índice ID -> número da linha de uma aba, usado pelas escritas.
+
+    Guarda o cabeçalho e o ID de cada linha na ordem da planilha (posição i é
+    a linha i + 2). É montado de graça a partir da sincronização ou com uma
+    leitura da coluna ID, atualizado após inclusões e exclusões feitas pelo
+    app e conferido antes do uso (ver SheetsRepositorio._localizar).
+    """
+
+    def __init__(self, header: List[str], ids: List[str]):
+        """
+        Args:
+            header: Cabeçalho da aba (precisa conter "ID")
+            ids: ID normalizado (_chave_id) de cada linha de dados, em ordem
+        """
+        self.header = list(header)
+        self.col_id = self.header.index("ID") + 1
+        self.ids = list(ids)
+        self._indexar()
+
+    def _indexar(self) -> None:
+        self.linha_por_id: Dict[str, int] = {}
+        for pos, chave in enumerate(self.ids):
+            if chave:
+                self.linha_por_id.setdefault(chave, pos + 2)  # mesmo critério do find(): primeira ocorrência
+
+    def anexar(self, id_registro: Any, linha: int) -> bool:
+        """
+        Registra uma linha incluída no fim da aba.
+
+        Returns:
+            False se a linha não é a seguinte à última conhecida (índice deve ser refeito)
+        """
+        if linha < len(self.ids) + 2:
+            return False
+        self.ids.extend([""] * (linha - len(self.ids) - 2))
+        chave = _chave_id(id_registro)
+        self.ids.append(chave)
+        self.linha_por_id.setdefault(chave, linha)
+        return True
+
+    def remover(self, linhas: List[int]) -> None:
+        """Remove linhas excluídas; as de baixo sobem, como na planilha."""
+        fora = {l - 2 for l in linhas}
+        self.ids = [k for pos, k in enumerate(self.ids) if pos not in fora]
+        self._indexar()
+
+
+def _ler_localizador(ws, header: Optional[List[str]] = None) -> Optional[LocalizadorLinhas]:
+    """
+    Monta o localizador lendo cabeçalho e coluna ID (1 chamada se o cabeçalho é conhecido).
+
+    Returns:
+        LocalizadorLinhas, ou None se a aba não tem coluna ID
+    """
+    if header is None or "ID" not in header:
+        header = ws.row_values(1)
+        if "ID" not in header:
+            return None
+    letra = _letra_coluna(header.index("ID") + 1)
+    cabecalho, coluna = ws.batch_get(["1:1", f"{letra}2:{letra}"])
+    header = list(cabecalho[0]) if cabecalho else []
+    if "ID" not in header:
+        return None
+    if _letra_coluna(header.index("ID") + 1) != letra:
+        return _ler_localizador(ws, header)  # coluna ID mudou de lugar entre as leituras
+    return LocalizadorLinhas(header, [_chave_id(r[0]) if r else "" for r in coluna])
+
+
+def _conferir_localizador(ws, loc: LocalizadorLinhas, linhas: Dict[str, int]) -> bool:
+    """
+    Confere, num único batch_get, o cabeçalho e as células de ID das linhas a escrever.
+
+    Args:
+        ws: Worksheet do gspread
+        loc: Localizador em memória
+        linhas: {ID normalizado: linha} a conferir
+
+    Returns:
+        True se o cabeçalho e todos os IDs estão onde o localizador diz
+    """
+    letra = _letra_coluna(loc.col_id)
+    intervalos = _agrupar_linhas_contiguas(list(linhas.values()))
+    blocos = ws.batch_get(["1:1"] + [f"{letra}{ini}:{letra}{fim}" for ini, fim in intervalos])
+    if (list(blocos[0][0]) if blocos[0] else []) != loc.header:
+        return False
+
+    lido: Dict[int, str] = {}
+    for (ini, fim), bloco in zip(intervalos, blocos[1:]):
+        bloco = list(bloco)
+        for offset, linha in enumerate(range(ini, fim + 1)):
+            lido[linha] = _chave_id(bloco[offset][0]) if offset < len(bloco) and bloco[offset] else ""
+    return all(lido.get(linha) == chave for chave, linha in linhas.items())
+
+
+def _linha_anexada(resposta: Any) -> Optional[int]:
+    """Primeira linha gravada por append_rows, lida de updates.updatedRange ("'Aba'!A12:I14")."""
+    try:
+        faixa = resposta["updates"]["updatedRange"].split("!")[-1].split(":")[0]
+        return int("".join(ch for ch in faixa if ch.isdigit()))
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def excluir_linhas_em_lote(ws, linhas: List[int]) -> None:
+    """
+    Exclui linhas numa única requisição, agrupando-as em intervalos contíguos.
+
+    Os intervalos são enviados de baixo para cima para que a exclusão de um
+    não desloque os índices dos seguintes.
+
+    Args:
+        ws: Worksheet do gspread
+        linhas: Números das linhas (1-based) a excluir
+    """
+    if not linhas:
+        return
+
+    requests = [
+        {
+            "deleteDimension": {
+                "range": {"sheetId": ws.id, "dimension": "ROWS", "startIndex": ini - 1, "endIndex": fim}
+            }
+        }
+        for ini, fim in reversed(_agrupar_linhas_contiguas(linhas))
+    ]
+    ws.spreadsheet.batch_update({"requests": requests})
+
+
+class SheetsRepositorio(Repositorio):
+    """
+    Motor Google Sheets.
+
+    Mantém, por processo, a marca d'água da sincronização incremental de cada
+    aba (cabeçalho, ordem dos IDs e linhas já baixadas), os IDs marcados como
+    alterados pelas escritas do próprio app e o localizador ID -> linha usado
+    para escrever sem varrer a coluna ID.
+
+    Com leitura_tipada (padrão) as abas são lidas com LEITURA_TIPADA: números
+    e datas chegam tipados e o DataFrame é montado por coluna (_tabela_tipada),
+    sem reinterpretar o texto formatado pelo locale da planilha.
+    """
+
+    def __init__(self, db, leitura_tipada: bool = True):
+        """
+        Args:
+            db: Spreadsheet do gspread já autenticado
+            leitura_tipada: Lê valores não formatados (False: texto formatado, como get_all_records())
+        """
+        self.db = db
+        self.leitura_tipada = leitura_tipada
+        self._lock = threading.Lock()
+        self._abas: Dict[str, Any] = {}
+        self._estados: Dict[str, Dict[str, Any]] = {}
+        self._localizadores: Dict[str, LocalizadorLinhas] = {}
+
+    def _ws(self, nome: str):
+        """
+        Worksheet por nome, evitando repetir a busca de metadados a cada chamada.
+
+        A primeira busca traz todas as abas numa só chamada (worksheets()): as
+        leituras vão pela planilha (carregar_tudo) e não buscam abas, então a
+        aba que ainda não foi pedida não custa outra chamada na primeira gravação.
+        """
+        if nome not in self._abas:
+            self._abas.update({ws.title: ws for ws in self.db.worksheets()})
+            if nome not in self._abas:
+                self._abas[nome] = self.db.worksheet(nome)  # Levanta WorksheetNotFound
+        return self._abas[nome]
+
+    @operacao("garantir_schema")
+    def garantir_schema(self) -> None:
+        """Confere o schema uma vez por planilha e processo (as sessões seguintes não chamam a API)."""
+        chave = (getattr(self.db, "id", None), "Financeiro", tuple(FIN_COLS))
+        if chave in _schemas_verificados:
+            return
+        with _lock_schemas:
+            if chave in _schemas_verificados:
+                return
+            if ensure_financeiro_schema(self._ws("Financeiro"), FIN_COLS):
+                self.invalidar("Financeiro")
+            _schemas_verificados.add(chave)
+
+    def _sincronizar(self, nome: str, forcar_completo: bool) -> pd.DataFrame:
+        """
+        Retorna os registros da aba usando sincronização incremental.
+
+        Faz leitura completa na primeira vez, quando forçado, quando a aba não
+        tem IDs válidos ou a cada SYNC_FULL_INTERVAL_S. Nos demais casos busca
+        apenas o delta, que não vê células editadas direto na planilha: quem
+        precisa delas (a releitura por idade do snapshot) passa forcar_completo.
+
+        Returns:
+            DataFrame equivalente a pd.DataFrame(ws.get_all_records())
+        """
+        ws = self._ws(nome)
+        with self._lock:
+            estado = self._estados.get(nome)
+            novo = None
+            if not self._exige_completo(estado, forcar_completo):
+                novo = _sincronizar_delta(ws, estado)
+            if novo is None:
+                novo = _sincronizar_completo(ws, self.leitura_tipada)
+            self._guardar_estado(nome, novo)
+        return self._tabela(novo)
+
+    def _exige_completo(self, estado: Optional[Dict[str, Any]], forcar_completo: bool) -> bool:
+        """Se a próxima leitura da aba tem de ser completa (sem marca d'água válida para o delta)."""
+        return (
+            forcar_completo
+            or estado is None
+            or estado["ids"] is None
+            or estado["tipada"] != self.leitura_tipada
+            or time.time() - estado["completo_em"] >= SYNC_FULL_INTERVAL_S
+        )
+
+    def _guardar_estado(self, nome: str, novo: Dict[str, Any]) -> None:
+        """Registra a marca d'água nova (chamar com self._lock)."""
+        self._estados[nome] = novo
+
+        # A leitura já trouxe a ordem dos IDs: o localizador das escritas sai de graça
+        if novo["id_col"] is not None:
+            ids = novo["ids"]
+            if ids is None:
+                ids = [_chave_id(v[novo["id_col"] - 1]) for v in novo["valores"]]
+            self._localizadores[nome] = LocalizadorLinhas(novo["header"], ids)
+
+    @staticmethod
+    def _tabela(estado: Dict[str, Any]) -> pd.DataFrame:
+        """DataFrame da aba a partir da marca d'água."""
+        if estado["tipada"]:
+            return _tabela_tipada(estado["header"], estado["valores"])
+        return pd.DataFrame(estado["valores"], columns=estado["header"])
+
+    @operacao("carregar_tudo")
+    @voo_unico
+    def carregar_tudo(self, forcar_completo: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Obras e Financeiro lidos juntos (ver _carregar_lote).
+
+        Args:
+            forcar_completo: Ignora a marca d'água e relê as duas abas
+
+        Returns:
+            Tupla (obras, financeiro), como carregar_obras() e carregar_financeiro()
+        """
+        tabelas = self._carregar_lote(("Obras", "Financeiro"), forcar_completo)
+        return tabelas["Obras"], tabelas["Financeiro"]
+
+    @operacao("carregar_abas")
+    @voo_unico
+    def carregar_abas(self, nomes: Tuple[str, ...], forcar_completo: bool = False) -> Dict[str, pd.DataFrame]:
+        return self._carregar_lote(tuple(nomes), forcar_completo)
+
+    def _carregar_lote(self, nomes: Tuple[str, ...], forcar_completo: bool) -> Dict[str, pd.DataFrame]:
+        """
+        Abas lidas juntas, em values_batch_get da planilha.
+
+        Uma requisição traz as abas que precisam de leitura completa (por
+        nome, sem buscar os metadados das abas) e o cabeçalho + coluna de IDs
+        das que têm marca d'água; só se houver linhas novas/alteradas (ou um
+        delta não confiável) vem uma segunda, com as linhas de todas as abas.
+
+        Args:
+            nomes: Abas a ler
+            forcar_completo: Ignora a marca d'água e relê as abas
+
+        Returns:
+            Dict {aba: DataFrame}, como carregar_obras() e carregar_financeiro()
+        """
+        params = LEITURA_TIPADA if self.leitura_tipada else None
+        with self._lock:
+            estados = {n: self._estados.get(n) for n in nomes}
+            completas = [n for n in nomes if self._exige_completo(estados[n], forcar_completo)]
+            deltas = [n for n in nomes if n not in completas]
+
+            faixas = [_faixa_aba(n) for n in completas] + [
+                f"{_faixa_aba(n)}!{f}" for n in deltas for f in _faixas_conferencia(estados[n])
+            ]
+            resposta = _valores_lote(self.db.values_batch_get(faixas, params=params))
+            for nome in completas:
+                self._guardar_estado(nome, _estado_de_linhas(resposta.pop(0), self.leitura_tipada))
+            planos = {n: _planejar_delta(estados[n], resposta.pop(0), resposta.pop(0)) for n in deltas}
+
+            refazer = [n for n in deltas if planos[n] is None]
+            aplicar = [n for n in deltas if planos[n] is not None]
+            faixas = [_faixa_aba(n) for n in refazer] + [
+                f"{_faixa_aba(n)}!{f}" for n in aplicar for f in _faixas_linhas(planos[n][0], planos[n][2])
+            ]
+            resposta = _valores_lote(self.db.values_batch_get(faixas, params=params)) if faixas else []
+            for nome in refazer:
+                self._guardar_estado(nome, _estado_de_linhas(resposta.pop(0), self.leitura_tipada))
+            for nome in aplicar:
+                n_blocos = len(planos[nome][2])
+                blocos, resposta = resposta[:n_blocos], resposta[n_blocos:]
+                self._guardar_estado(nome, _aplicar_delta(estados[nome], planos[nome], blocos))
+
+            return {n: self._tabela(self._estados[n]) for n in nomes}
+
+    @operacao("carregar_obras")
+    @voo_unico
+    def carregar_obras(self, forcar_completo: bool = False) -> pd.DataFrame:
+        return self._sincronizar("Obras", forcar_completo)
+
+    @operacao("carregar_financeiro")
+    @voo_unico
+    def carregar_financeiro(self, forcar_completo: bool = False) -> pd.DataFrame:
+        return self._sincronizar("Financeiro", forcar_completo)
+
+    @operacao("adicionar_obra")
+    def adicionar_obra(self, valores: List[Any]) -> None:
+        self._anexar("Obras", [valores])
+
+    @operacao("adicionar_lancamento")
+    def adicionar_lancamento(self, valores: List[Any]) -> None:
+        self._anexar("Financeiro", [valores])
+
+    @operacao("adicionar_obras")
+    def adicionar_obras(self, linhas: List[List[Any]]) -> None:
+        self._anexar("Obras", linhas)
+
+    @operacao("adicionar_lancamentos")
+    def adicionar_lancamentos(self, linhas: List[List[Any]]) -> None:
+        self._anexar("Financeiro", linhas)
+
+    def _anexar(self, nome: str, linhas: List[List[Any]]) -> None:
+        """values:append (1 chamada, sem buscar a aba) + registro das linhas novas no localizador (sem leitura extra)."""
+        if not linhas:
+            return
+        resposta = self.db.values_append(_faixa_aba(nome), params={"valueInputOption": "RAW"}, body={"values": linhas})
+        primeira = _linha_anexada(resposta)
+        with self._lock:
+            loc = self._localizadores.get(nome)
+            if loc is None:
+                return
+            for offset, valores in enumerate(linhas):
+                if primeira is None or loc.col_id > len(valores) or not loc.anexar(valores[loc.col_id - 1], primeira + offset):
+                    self._localizadores.pop(nome, None)
+                    return
+
+    @operacao("ids_existentes")
+    def ids_existentes(self, aba: str, ids: List[Any]) -> set:
+        _, linhas = self._localizar(aba, list(ids))
+        return set(linhas)
+
+    def _localizar(self, nome: str, ids: List[Any]) -> Tuple[Optional[LocalizadorLinhas], Dict[str, int]]:
+        """
+        Linhas dos IDs pedidos, com custo O(1) em chamadas à API.
+
+        Usa o localizador em memória e confere, num único batch_get, o
+        cabeçalho e só as células de ID das linhas envolvidas. Se algo não
+        bate (edição externa, linha inserida/removida fora do app) ou falta um
+        ID, refaz o índice com uma leitura da coluna ID.
+
+        Args:
+            nome: Nome da aba
+            ids: IDs dos registros a localizar
+
+        Returns:
+            Tupla (localizador, {ID normalizado: linha}); IDs inexistentes ficam de fora
+        """
+        ws = self._ws(nome)
+        chaves = [_chave_id(i) for i in ids]
+        with self._lock:
+            loc = self._localizadores.get(nome)
+
+        if loc is not None and all(k in loc.linha_por_id for k in chaves):
+            linhas = {k: loc.linha_por_id[k] for k in chaves}
+            if _conferir_localizador(ws, loc, linhas):
+                return loc, linhas
+
+        estado = self._estados.get(nome)
+        loc = _ler_localizador(ws, loc.header if loc is not None else (estado or {}).get("header"))
+        with self._lock:
+            if loc is None:
+                self._localizadores.pop(nome, None)
+                return None, {}
+            self._localizadores[nome] = loc
+        return loc, {k: loc.linha_por_id[k] for k in chaves if k in loc.linha_por_id}
+
+    @operacao("salvar_financeiro")
+    def salvar_financeiro(
+        self,
+        atualizacoes: Dict[int, Dict[str, Any]],
+        exclusoes: List[int]
+    ) -> Tuple[int, int]:
+        ws_fin = self._ws("Financeiro")
+
+        # Localizador conferido num único batch_get (cabeçalho + células de ID envolvidas)
+        loc, linha_por_id = self._localizar("Financeiro", list(atualizacoes) + list(exclusoes))
+        if loc is None:
+            # Falha permanente: a fila mantém a operação com estado "erro" em vez de descartá-la
+            raise ValueError("Aba Financeiro sem coluna ID: edições e exclusões não podem ser localizadas")
+        headers_fin = loc.header
+
+        rows_del = [linha_por_id[_chave_id(i)] for i in exclusoes if _chave_id(i) in linha_por_id]
+
+        updates = []
+        ids_upd = []
+        for idv, registro in atualizacoes.items():
+            row_num = linha_por_id.get(_chave_id(idv))
+            if not row_num:
+                continue
+            updates.append({"range": f"A{row_num}:{_letra_coluna(len(headers_fin))}{row_num}", "values": [[registro.get(h, "") for h in headers_fin]]})
+            ids_upd.append(idv)
+
+        # Atualizações antes das exclusões: os números de linha ainda são válidos
+        if updates:
+            ws_fin.batch_update(updates)
+        excluir_linhas_em_lote(ws_fin, rows_del)
+        if rows_del:
+            with self._lock:
+                loc.remover(rows_del)
+
+        self.marcar_alterados("Financeiro", ids_upd)
+        return len(updates), len(rows_del)
+
+    @operacao("salvar_obras")
+    def salvar_obras(
+        self,
+        atualizacoes: Dict[int, Dict[str, Any]],
+        renomes: Dict[str, str]
+    ) -> int:
+        ws = self._ws("Obras")
+        loc, linha_por_id = self._localizar("Obras", list(atualizacoes))
+        if loc is None and atualizacoes:
+            raise ValueError("Aba Obras sem coluna ID: edições não podem ser localizadas")
+
+        dados_lote = []
+        ids_alt = []
+        for id_obra, registro in atualizacoes.items():
+            row_num = linha_por_id.get(_chave_id(id_obra))
+            if not row_num:
+                continue
+            dados_lote.append({
+                "range": f"'{ws.title}'!A{row_num}:K{row_num}",
+                "values": [[registro.get(c, "") for c in OBRAS_COLS]],
+            })
+            ids_alt.append(id_obra)
+
+        # Propaga renomeações para "Obra Vinculada" no mesmo lote
+        n_renomeados = 0
+        if renomes:
+            ws_fin = self._ws("Financeiro")
+            loc_fin = self._localizadores.get("Financeiro")
+            headers_fin = loc_fin.header if loc_fin is not None else ws_fin.row_values(1)
+            col_idx_fin = headers_fin.index("Obra Vinculada") + 1 if "Obra Vinculada" in headers_fin else 6
+
+            # Cabeçalho conferido e coluna "Obra Vinculada" lidos juntos (1 chamada)
+            letra_fin = _letra_coluna(col_idx_fin)
+            cabecalho, coluna = ws_fin.batch_get(["1:1", f"{letra_fin}2:{letra_fin}"])
+            if (list(cabecalho[0]) if cabecalho else []) != headers_fin:
+                headers_fin = list(cabecalho[0]) if cabecalho else []
+                col_idx_fin = headers_fin.index("Obra Vinculada") + 1 if "Obra Vinculada" in headers_fin else 6
+                letra_fin = _letra_coluna(col_idx_fin)
+                coluna = ws_fin.batch_get([f"{letra_fin}2:{letra_fin}"])[0]
+
+            novo_por_linha = {
+                row_num: renomes[str(r[0]).strip()]
+                for row_num, r in enumerate(coluna, start=2)
+                if r and str(r[0]).strip() in renomes
+            }
+            n_renomeados = len(novo_por_linha)
+
+            for ini, fim in _agrupar_linhas_contiguas(list(novo_por_linha)):
+                # Divide o intervalo contíguo onde o novo nome muda
+                bloco_ini = ini
+                for r in range(ini, fim + 1):
+                    if r == fim or novo_por_linha[r + 1] != novo_por_linha[r]:
+                        dados_lote.append({
+                            "range": f"'{ws_fin.title}'!{letra_fin}{bloco_ini}:{letra_fin}{r}",
+                            "values": [[novo_por_linha[r]]] * (r - bloco_ini + 1),
+                        })
+                        bloco_ini = r + 1
+
+        # Obras + Financeiro numa única requisição
+        if dados_lote:
+            self.db.values_batch_update({"valueInputOption": "RAW", "data": dados_lote})
+
+        if n_renomeados:
+            self.invalidar("Financeiro")
+        self.marcar_alterados("Obras", ids_alt)
+        return n_renomeados
+
+    def marcar_alterados(self, aba: str, ids: List[Any]) -> None:
+        """
+        Marca IDs editados pelo app para serem relidos na próxima sincronização.
+
+        Args:
+            aba: Nome da aba ("Obras" ou "Financeiro")
+            ids: IDs dos registros alterados
+        """
+        with self._lock:
+            estado = self._estados.get(aba)
+            if estado is not None:
+                estado["alteradas"].update(_chave_id(i) for i in ids)
+
+    def invalidar(self, aba: Optional[str] = None) -> None:
+        """
+        Descarta a marca d'água, forçando leitura completa (fallback do delta).
+
+        Args:
+            aba: Nome da aba; se None, invalida todas
+        """
+        with self._lock:
+            if aba is None:
+                self._estados.clear()
+                self._localizadores.clear()
+            else:
+                self._estados.pop(aba, None)
+                self._localizadores.pop(aba, None)
+
+
+# ==============================================================================
+# MOTOR SQLITE LOCAL
+# ==============================================================================
+_SQL_TIPOS = {
+    "ID": "INTEGER PRIMARY KEY",
+    "Valor Total": "REAL",
+    "Custo Previsto": "REAL",
+    "Area Construida": "REAL",
+    "Area Terreno": "REAL",
+    "Quartos": "INTEGER",
+    "Valor": "REAL",
+}
+
+_TABELAS = {"obras": OBRAS_COLS, "financeiro": FIN_COLS}
+
+
+def _q(nome: str) -> str:
+    """Cita identificador SQL (as colunas têm espaços e acentos)."""
+    return '"' + nome.replace('"', '""') + '"'
+
+
+class SQLiteRepositorio(Repositorio):
+    """
+    Motor SQLite local (uma tabela por aba, mesmas colunas do Sheets).
+
+    Índices em ID (chave primária), Data e Obra Vinculada. Cada operação abre
+    a própria conexão, então a instância pode ser compartilhada entre sessões.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Args:
+            caminho: Caminho do arquivo .db (criado se não existir)
+        """
+        self.caminho = caminho
+        self.garantir_schema()
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            yield con
+            con.commit()
+        finally:
+            con.close()
+
+    def garantir_schema(self) -> None:
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            for tabela, cols in _TABELAS.items():
+                defs = ", ".join(f"{_q(c)} {_SQL_TIPOS.get(c, 'TEXT')}" for c in cols)
+                con.execute(f"CREATE TABLE IF NOT EXISTS {tabela} ({defs})")
+            con.execute(f"CREATE INDEX IF NOT EXISTS ix_fin_data ON financeiro ({_q('Data')})")
+            con.execute(f"CREATE INDEX IF NOT EXISTS ix_fin_obra ON financeiro ({_q('Obra Vinculada')})")
+
+    def _carregar(self, tabela: str) -> pd.DataFrame:
+        cols = _TABELAS[tabela]
+        with self._conectar() as con:
+            df = pd.read_sql_query(f"SELECT {', '.join(_q(c) for c in cols)} FROM {tabela}", con)
+        # Mesma convenção do get_all_records(): célula vazia -> ""
+        texto = [c for c in cols if c not in _SQL_TIPOS]
+        df[texto] = df[texto].astype(object).where(df[texto].notna(), "")
+        return df
+
+    def carregar_obras(self, forcar_completo: bool = False) -> pd.DataFrame:
+        return self._carregar("obras")
+
+    def carregar_financeiro(self, forcar_completo: bool = False) -> pd.DataFrame:
+        return self._carregar("financeiro")
+
+    def _inserir(self, tabela: str, linhas: List[List[Any]]) -> None:
+        cols = _TABELAS[tabela]
+        sql = f"INSERT INTO {tabela} ({', '.join(_q(c) for c in cols)}) VALUES ({', '.join('?' * len(cols))})"
+        with self._conectar() as con:
+            con.executemany(sql, linhas)
+
+    def adicionar_obra(self, valores: List[Any]) -> None:
+        self._inserir("obras", [valores])
+
+    def adicionar_lancamento(self, valores: List[Any]) -> None:
+        self._inserir("financeiro", [valores])
+
+    def adicionar_obras(self, linhas: List[List[Any]]) -> None:
+        self._inserir("obras", linhas)
+
+    def adicionar_lancamentos(self, linhas: List[List[Any]]) -> None:
+        self._inserir("financeiro", linhas)
+
+    def ids_existentes(self, aba: str, ids: List[Any]) -> set:
+        tabela = {"Obras": "obras", "Financeiro": "financeiro"}[aba]
+        chaves = [_chave_id(i) for i in ids]
+        if not chaves:
+            return set()
+        with self._conectar() as con:
+            achados = con.execute(
+                f"SELECT ID FROM {tabela} WHERE CAST(ID AS TEXT) IN ({', '.join('?' * len(chaves))})", chaves
+            ).fetchall()
+        return {_chave_id(r[0]) for r in achados}
+
+    def _atualizar(self, con: sqlite3.Connection, tabela: str, atualizacoes: Dict[int, Dict[str, Any]]) -> int:
+        cols = [c for c in _TABELAS[tabela] if c != "ID"]
+        sql = f"UPDATE {tabela} SET {', '.join(f'{_q(c)} = ?' for c in cols)} WHERE ID = ?"
+        cur = con.executemany(sql, [[r.get(c, "") for c in cols] + [int(i)] for i, r in atualizacoes.items()])
+        return cur.rowcount
+
+    def salvar_financeiro(
+        self,
+        atualizacoes: Dict[int, Dict[str, Any]],
+        exclusoes: List[int]
+    ) -> Tuple[int, int]:
+        with self._conectar() as con:
+            n_upd = self._atualizar(con, "financeiro", atualizacoes) if atualizacoes else 0
+            cur = con.executemany("DELETE FROM financeiro WHERE ID = ?", [(int(i),) for i in exclusoes])
+            n_del = cur.rowcount if exclusoes else 0
+        return n_upd, n_del
+
+    def salvar_obras(
+        self,
+        atualizacoes: Dict[int, Dict[str, Any]],
+        renomes: Dict[str, str]
+    ) -> int:
+        with self._conectar() as con:
+            if atualizacoes:
+                self._atualizar(con, "obras", atualizacoes)
+            n_renomeados = 0
+            for antigo, novo in renomes.items():
+                cur = con.execute(
+                    f"UPDATE financeiro SET {_q('Obra Vinculada')} = ? WHERE TRIM({_q('Obra Vinculada')}) = ?",
+                    (novo, antigo)
+                )
+                n_renomeados += cur.rowcount
+        return n_renomeados
+
+    def importar(self, df_obras: pd.DataFrame, df_fin: pd.DataFrame) -> None:
+        """
+        Substitui o conteúdo local pelos registros informados (ex.: cópia do Sheets).
+
+        Útil para montar uma réplica de leitura ou uma base para benchmark offline.
+
+        Args:
+            df_obras: Registros brutos de Obras
+            df_fin: Registros brutos do Financeiro
+        """
+        with self._conectar() as con:
+            for tabela, df in (("obras", df_obras), ("financeiro", df_fin)):
+                cols = _TABELAS[tabela]
+                df = df.reindex(columns=cols)
+                df["ID"] = pd.to_numeric(df["ID"], errors="coerce")  # ID inválido -> gerado pelo SQLite
+                con.execute(f"DELETE FROM {tabela}")
+                con.executemany(
+                    f"INSERT OR REPLACE INTO {tabela} ({', '.join(_q(c) for c in cols)}) "
+                    f"VALUES ({', '.join('?' * len(cols))})",
+                    df.astype(object).where(df.notna(), None).values.tolist()
+                )
@@ -0,0 +1,10 @@
+"""
+Cores do tema, compartilhadas entre a interface (CSS) e os relatórios PDF.
+"""
+COR_PRIMARIA = "#2D6A4F"
+COR_PRIMARIA_ESCURA = "#1B4332"
+COR_SUCESSO = "#40916C"
+COR_FUNDO = "#F8F9FA"
+COR_FUNDO_ESCURO = "#1A1C1E"
+COR_CINZA_CLARO = "#e9ecef"
+COR_CINZA_MEDIO = "#adb5bd"
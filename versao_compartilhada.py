@@ -0,0 +1,167 @@
+"""
+Versão dos dados compartilhada entre processos (réplicas atrás de um balanceador).
+
+Um arquivo SQLite guarda:
+
+- o contador de versões: cada escrita, em qualquer processo, grava uma
+  versão nova com as abas alteradas e o processo que gravou; os demais
+  leem as versões posteriores à sua e sabem o que recarregar (sincronizar).
+  Abas alteradas por outro processo são relidas por completo: o delta do
+  SheetsRepositorio só vê as linhas que o próprio processo gravou;
+- a reserva de recarga: só o processo que a obtém relê o Google Sheets; os
+  demais aguardam e adotam a cópia em disco que ele grava (ArquivoSnapshot
+  num diretório comum), então as leituras não crescem com o número de réplicas.
+
+O SnapshotDados usa só avancar, atual, alteracoes, reservar e liberar: outro
+armazenamento (ex.: Redis com INCR e SET NX PX) pode substituir esta classe.
+"""
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import FrozenSet, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PARÂMETROS
+# ==============================================================================
+VERSOES_MANTIDAS = 1000  # Versões com as abas alteradas; processo mais atrasado relê tudo
+
+
+class VersaoCompartilhada:
+    """Contador de versões e reserva de recarga num arquivo SQLite comum aos processos."""
+
+    def __init__(self, caminho: str):
+        """
+        Args:
+            caminho: Arquivo SQLite (criado se não existir)
+        """
+        self.caminho = caminho
+        self._criar_schema()
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+        try:
+            yield con
+        finally:
+            con.close()
+
+    def _criar_schema(self) -> None:
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS versoes ("
+                "versao INTEGER PRIMARY KEY AUTOINCREMENT, abas TEXT, criado_em REAL NOT NULL, "
+                "dono TEXT, completo INTEGER NOT NULL DEFAULT 0)"
+            )
+            colunas = {linha[1] for linha in con.execute("PRAGMA table_info(versoes)")}
+            for coluna, tipo in (("dono", "TEXT"), ("completo", "INTEGER NOT NULL DEFAULT 0")):
+                if coluna not in colunas:  # Arquivo criado antes destas colunas
+                    try:
+                        con.execute(f"ALTER TABLE versoes ADD COLUMN {coluna} {tipo}")
+                    except sqlite3.OperationalError:  # Outro processo acabou de adicionar
+                        pass
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS reserva ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), dono TEXT NOT NULL, expira_em REAL NOT NULL)"
+            )
+
+    # --------------------------------------------------------------------------
+    # Contador de versões
+    # --------------------------------------------------------------------------
+    def avancar(self, abas: Optional[Iterable[str]] = None, completo: bool = False, dono: Optional[str] = None) -> int:
+        """
+        Registra uma versão nova (após uma escrita ou antes de reler tudo).
+
+        Args:
+            abas: Abas alteradas (None: todas; vazio: só reserva um número,
+                nenhuma réplica recarrega)
+            completo: As réplicas relêem as abas por completo, sem delta
+            dono: Processo que gravou (as abas alteradas por outro são relidas por completo)
+
+        Returns:
+            Número da versão nova (crescente entre todos os processos)
+        """
+        texto = None if abas is None else json.dumps(sorted(abas))
+        with self._conectar() as con:
+            versao = con.execute(
+                "INSERT INTO versoes (abas, criado_em, dono, completo) VALUES (?, ?, ?, ?)",
+                (texto, time.time(), dono, int(completo)),
+            ).lastrowid
+            con.execute("DELETE FROM versoes WHERE versao <= ?", (versao - VERSOES_MANTIDAS,))
+        return versao
+
+    def atual(self) -> int:
+        """Versão mais nova registrada (0 se nenhuma)."""
+        with self._conectar() as con:
+            return con.execute("SELECT COALESCE(MAX(versao), 0) FROM versoes").fetchone()[0]
+
+    def alteracoes(self, desde: int, dono: Optional[str] = None) -> Tuple[int, Optional[FrozenSet[str]], bool]:
+        """
+        Abas alteradas nas versões posteriores a uma versão.
+
+        Args:
+            desde: Última versão já conhecida pelo processo
+            dono: Processo que pergunta (suas próprias escritas dispensam releitura completa)
+
+        Returns:
+            Tupla (versão atual, abas alteradas, completo); abas é None quando
+            alguma versão releu tudo ou as versões seguintes a "desde" já foram
+            descartadas; completo indica que as abas devem ser relidas sem
+            delta (pedido explícito ou escrita de outro processo)
+        """
+        with self._conectar() as con:
+            linhas = con.execute(
+                "SELECT versao, abas, dono, completo FROM versoes WHERE versao > ?", (desde,)
+            ).fetchall()
+            if not linhas:
+                return desde, frozenset(), False
+            primeira = con.execute("SELECT MIN(versao) FROM versoes").fetchone()[0]
+        atual = max(linha[0] for linha in linhas)
+        if primeira > desde + 1:
+            return atual, None, True
+        abas: Optional[set] = set()
+        completo = False
+        for _, texto, autor, pedido in linhas:
+            alteradas = None if texto is None else json.loads(texto)
+            if alteradas == []:
+                continue  # Só reservou um número de versão
+            completo = completo or bool(pedido) or autor != dono
+            abas = None if alteradas is None or abas is None else abas | set(alteradas)
+        return atual, None if abas is None else frozenset(abas), completo
+
+    # --------------------------------------------------------------------------
+    # Reserva de recarga
+    # --------------------------------------------------------------------------
+    def reservar(self, dono: str, duracao_s: float) -> bool:
+        """
+        Tenta obter a reserva de recarga (uma por vez entre os processos).
+
+        Args:
+            dono: Identificador do processo
+            duracao_s: Validade da reserva (queda do processo no meio da recarga)
+
+        Returns:
+            True se a reserva é do dono (obtida agora ou renovada)
+        """
+        agora = time.time()
+        with self._conectar() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                linha = con.execute("SELECT dono, expira_em FROM reserva WHERE id = 1").fetchone()
+                if linha is not None and linha[0] != dono and linha[1] > agora:
+                    return False
+                con.execute(
+                    "INSERT OR REPLACE INTO reserva (id, dono, expira_em) VALUES (1, ?, ?)", (dono, agora + duracao_s)
+                )
+                return True
+            finally:
+                con.execute("COMMIT")
+
+    def liberar(self, dono: str) -> None:
+        """Libera a reserva, se ainda for do dono."""
+        with self._conectar() as con:
+            con.execute("DELETE FROM reserva WHERE id = 1 AND dono = ?", (dono,))